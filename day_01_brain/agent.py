@@ -1,4 +1,5 @@
-from typing import Literal
+from typing import Callable, Literal
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, START, END
 from .state import AgentState, InputState, OutputState
 
@@ -72,18 +73,30 @@ def validation_node(state: AgentState):
 def route_by_intent(state: AgentState) -> Literal["explain", "quiz", "flashcards", "study_plan"]:
     return state["intent"]
 
+# --- async twins ---
+
+def with_async(node: Callable[[AgentState], dict]) -> RunnableLambda:
+    # under ainvoke / astream langgraph hands a sync node to the loop's thread
+    # executor; the placeholders do no I/O, so their async twin just runs them
+    # on the event loop. a node that makes an llm call later gets its own
+    # async twin awaiting the model's ainvoke (see day_08_memory/agent.py).
+    async def anode(state: AgentState):
+        return node(state)
+
+    return RunnableLambda(node, afunc=anode, name=node.__name__)
+
 # --- graph construction ---
 
 workflow = StateGraph(AgentState, input=InputState, output=OutputState)
 
 # add nodes
-workflow.add_node("planner", planner_node)
-workflow.add_node("retriever", retrieval_node)
-workflow.add_node("explain", explanation_node)
-workflow.add_node("quiz", quiz_node)
-workflow.add_node("flashcards", flashcard_node)
-workflow.add_node("study_plan", study_plan_node)
-workflow.add_node("validate", validation_node)
+workflow.add_node("planner", with_async(planner_node))
+workflow.add_node("retriever", with_async(retrieval_node))
+workflow.add_node("explain", with_async(explanation_node))
+workflow.add_node("quiz", with_async(quiz_node))
+workflow.add_node("flashcards", with_async(flashcard_node))
+workflow.add_node("study_plan", with_async(study_plan_node))
+workflow.add_node("validate", with_async(validation_node))
 
 # add edges
 workflow.add_edge(START, "planner")
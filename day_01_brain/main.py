@@ -1,3 +1,5 @@
+import asyncio
+from typing import List
 from day_01_brain.agent import app
 
 def run_agent(question: str):
@@ -6,6 +8,14 @@ def run_agent(question: str):
     print(f"🤖 Agent: {result['answer']}")
     print(f"👣 Steps: {result['steps']}")
 
+async def arun_agents(questions: List[str]):
+    # one event loop drives every question concurrently via ainvoke; each
+    # node runs through its async twin, so no executor threads are involved
+    results = await asyncio.gather(*[app.ainvoke({"question": q}) for q in questions])
+    for question, result in zip(questions, results):
+        print(f"\n👤 User: {question}")
+        print(f"🤖 Agent: {result['answer']}")
+
 def main():
     print("🧠 Starting Day 1 Brain (Full Architecture)...")
     
@@ -20,6 +30,15 @@ def main():
     
     # test study plan flow
     run_agent("Create a study plan for learning AI")
+    
+    # same flows, concurrently on the async path
+    print("\n⚡ Running all flows concurrently (async)...")
+    asyncio.run(arun_agents([
+        "What is LangGraph?",
+        "Generate a quiz about vector databases",
+        "Make flashcards for semantic chunking",
+        "Create a study plan for learning AI",
+    ]))
 
 if __name__ == "__main__":
     main()
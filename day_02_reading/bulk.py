@@ -0,0 +1,118 @@
+import glob
+import json
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Iterator, List, Optional, Tuple, Union
+
+from langchain_core.documents import Document
+from day_02_reading.loaders import DocumentLoader, load_pdf
+
+# file types picked up when a directory is given
+SUPPORTED_EXTENSIONS = (".pdf", ".txt", ".md")
+
+def _is_url(source: str) -> bool:
+    return source.startswith("http://") or source.startswith("https://")
+
+def expand_sources(spec: Union[str, List[str]]) -> List[str]:
+    """
+    Expands a bulk source spec into a flat, de-duplicated list of sources.
+
+    - A list -> each entry is expanded on its own
+    - A URL -> kept as is
+    - A directory -> every supported file under it (recursive)
+    - A .json manifest -> a JSON list of sources
+    - A .txt/.lst manifest whose lines are sources (ending in `.sources.txt` or `.lst`)
+    - A glob pattern -> every match
+    - Anything else -> kept as a single path
+
+    Args:
+        spec (Union[str, List[str]]): The directory, glob, manifest, URL or list of them.
+
+    Returns:
+        List[str]: The sources to ingest.
+    """
+    if isinstance(spec, list):
+        sources = [s for item in spec for s in expand_sources(item)]
+    elif _is_url(spec):
+        sources = [spec]
+    elif os.path.isdir(spec):
+        sources = sorted(
+            os.path.join(root, name)
+            for root, _, files in os.walk(spec)
+            for name in files
+            if name.lower().endswith(SUPPORTED_EXTENSIONS)
+        )
+    elif spec.endswith(".json") and os.path.isfile(spec):
+        with open(spec, "r") as f:
+            sources = expand_sources(json.load(f))
+    elif spec.endswith((".sources.txt", ".lst")) and os.path.isfile(spec):
+        with open(spec, "r") as f:
+            lines = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+        sources = expand_sources(lines)
+    elif glob.has_magic(spec):
+        sources = sorted(glob.glob(spec, recursive=True))
+    else:
+        # kept even if missing, so the failure shows up in the ingestion report
+        sources = [spec]
+
+    return list(dict.fromkeys(sources))
+
+def _extract_pdf(path: str) -> List[Document]:
+    """Runs in a worker process: pdf text extraction is CPU-bound."""
+    return load_pdf(path)
+
+def iter_load_many(
+    sources: List[str],
+    max_processes: Optional[int] = None,
+    max_threads: int = 16,
+    max_in_flight: int = 64,
+) -> Iterator[Tuple[str, Optional[List[Document]], Optional[Exception]]]:
+    """
+    Loads many sources concurrently and yields them as they finish.
+
+    PDFs are extracted in a process pool; web pages and text files are
+    I/O-bound and loaded on a thread pool. At most `max_in_flight` sources
+    are pending at once, so finished-but-unconsumed results can't pile up.
+    A failing source never stops the others: its error is yielded in place
+    of documents.
+
+    Args:
+        sources (List[str]): The file paths and URLs to load.
+        max_processes (Optional[int]): Size of the PDF process pool (defaults to CPU count).
+        max_threads (int): Size of the I/O thread pool.
+        max_in_flight (int): Maximum sources submitted but not yet yielded.
+
+    Yields:
+        Tuple[str, Optional[List[Document]], Optional[Exception]]: (source, docs, error).
+    """
+    # fork would copy the parent's live threads' locks (embedding loop, http pools) into the workers
+    with ProcessPoolExecutor(max_workers=max_processes, mp_context=multiprocessing.get_context("spawn")) as processes, \
+            ThreadPoolExecutor(max_workers=max_threads) as threads:
+        pending: dict[Future, str] = {}
+        queued = iter(sources)
+
+        def submit_next() -> bool:
+            source = next(queued, None)
+            if source is None:
+                return False
+            if not _is_url(source) and source.lower().endswith(".pdf"):
+                pending[processes.submit(_extract_pdf, source)] = source
+            else:
+                pending[threads.submit(DocumentLoader.load, source)] = source
+            return True
+
+        while len(pending) < max_in_flight and submit_next():
+            pass
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                source = pending.pop(future)
+                submit_next()
+                try:
+                    yield source, future.result(), None
+                except Exception as e:
+                    yield source, None, e
+
+__all__ = ["expand_sources", "iter_load_many"]
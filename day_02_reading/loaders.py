@@ -1,6 +1,8 @@
-from typing import List
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+from langchain_core.document_loaders import BaseLoader
 from langchain_core.documents import Document
-from langchain_community.document_loaders import PyPDFLoader, TextLoader, WebBaseLoader
+from langchain_community.document_loaders import PyPDFLoader, TextLoader
+from day_02_reading.web import get_web_fetcher
 
 # --- loaders ---
 
@@ -36,7 +38,10 @@ def load_text(path: str) -> List[Document]:
 
 def load_web(url: str) -> List[Document]:
     """
-    Loads a web page using WebBaseLoader.
+    Loads a web page through the shared, pooled `WebFetcher`.
+    
+    Connections are reused across calls and unchanged pages are served
+    from the local response cache after a conditional request.
     
     Args:
         url (str): The URL of the web page.
@@ -46,8 +51,7 @@ def load_web(url: str) -> List[Document]:
     """
     # loading web page
     print(f"--- Loading Web: {url} ---")
-    loader = WebBaseLoader(url)
-    return loader.load()
+    return get_web_fetcher().load(url)
 
 # --- unified interface ---
 
@@ -56,12 +60,81 @@ class DocumentLoader:
     A unified interface for loading documents from various sources.
     """
     
+    @staticmethod
+    def _is_url(source: str) -> bool:
+        return source.startswith("http://") or source.startswith("https://")
+    
+    @staticmethod
+    def _loader_for(source: str) -> BaseLoader:
+        """Picks the LangChain loader for a local file."""
+        if source.lower().endswith(".pdf"):
+            return PyPDFLoader(source)
+        else:
+            return TextLoader(source)
+    
+    @staticmethod
+    def iter_load(source: str) -> Iterator[Document]:
+        """
+        Lazily loads a document, yielding one page or section at a time.
+        
+        Unlike `load`, nothing is materialized up front, so memory stays flat
+        no matter how large the source is.
+        
+        Args:
+            source (str): The file path or URL.
+            
+        Yields:
+            Document: The next page or section.
+        """
+        print(f"--- Streaming: {source} ---")
+        if DocumentLoader._is_url(source):
+            yield from get_web_fetcher().load(source)
+        else:
+            yield from DocumentLoader._loader_for(source).lazy_load()
+    
+    @staticmethod
+    async def aload(source: str) -> AsyncIterator[Document]:
+        """
+        Async version of `iter_load`.
+        
+        Args:
+            source (str): The file path or URL.
+            
+        Yields:
+            Document: The next page or section.
+        """
+        print(f"--- Streaming: {source} ---")
+        if DocumentLoader._is_url(source):
+            for doc in await get_web_fetcher().aload(source):
+                yield doc
+        else:
+            async for doc in DocumentLoader._loader_for(source).alazy_load():
+                yield doc
+    
+    @staticmethod
+    async def aload_many(urls: List[str]) -> List[Tuple[str, Optional[List[Document]], Optional[Exception]]]:
+        """
+        Fetches many web pages concurrently over a shared connection pool.
+        
+        Requests are capped per host and revalidated against the local
+        response cache, so only pages that changed are downloaded again.
+        A failing URL is reported with its error instead of failing the batch.
+        
+        Args:
+            urls (List[str]): The URLs to fetch.
+            
+        Returns:
+            List[Tuple[str, Optional[List[Document]], Optional[Exception]]]: (url, docs, error), in the given order.
+        """
+        print(f"--- Loading {len(urls)} web pages ---")
+        return await get_web_fetcher().aload_many(urls)
+    
     @staticmethod
     def load(source: str) -> List[Document]:
         """
         Smartly loads a document based on the source string.
         
-        - URLs (http/https) -> WebBaseLoader
+        - URLs (http/https) -> pooled WebFetcher
         - .pdf files -> PyPDFLoader
         - Other files -> TextLoader
         
@@ -72,7 +145,7 @@ class DocumentLoader:
             List[Document]: The loaded documents.
         """
         # check if source is a url
-        if source.startswith("http://") or source.startswith("https://"):
+        if DocumentLoader._is_url(source):
             return load_web(source)
         # check if source is a pdf
         elif source.lower().endswith(".pdf"):
@@ -0,0 +1,236 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+from bs4 import BeautifulSoup
+from langchain_core.documents import Document
+
+DEFAULT_CACHE_PATH = "day_02_reading/web_cache.sqlite"
+DEFAULT_USER_AGENT = os.environ.get("USER_AGENT", "langchain-course-2026/1.0")
+
+# --- response cache ---
+
+class ResponseCache:
+    """
+    A local SQLite cache of fetched pages and their validators (ETag / Last-Modified).
+
+    Cached validators are sent back as conditional headers, so a page that
+    hasn't changed costs a 304 instead of a full download.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                body TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            );
+            """
+        )
+
+    def get(self, url: str) -> Optional[Tuple[Optional[str], Optional[str], str]]:
+        """Returns (etag, last_modified, body) for a cached url, or None."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT etag, last_modified, body FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str], body: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url, etag, last_modified, body, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body, time.time()),
+            )
+            self._conn.commit()
+
+    def touch(self, url: str):
+        with self._lock:
+            self._conn.execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+
+# --- parsing ---
+
+def html_to_document(url: str, html: str) -> Document:
+    """
+    Converts an HTML page into a Document, with the same metadata as WebBaseLoader.
+
+    Args:
+        url (str): The page URL.
+        html (str): The raw HTML.
+
+    Returns:
+        Document: The page text with source/title/description/language metadata.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    metadata = {"source": url}
+    if title := soup.find("title"):
+        metadata["title"] = title.get_text()
+    if description := soup.find("meta", attrs={"name": "description"}):
+        metadata["description"] = description.get("content", "No description found.")
+    if root := soup.find("html"):
+        metadata["language"] = root.get("lang", "No language found.")
+    return Document(page_content=soup.get_text(), metadata=metadata)
+
+# --- fetcher ---
+
+class WebFetcher:
+    """
+    Fetches web pages over shared keep-alive connection pools.
+
+    The sync client is shared by every thread. Async clients are bound to
+    the event loop they run on, so each `aload_many` call opens its own pool
+    and closes it when the batch is done. Requests to the same host are
+    capped at `max_per_host` at a time, and every request revalidates
+    against the local `ResponseCache`, so re-crawls only download pages
+    that changed.
+    """
+
+    def __init__(
+        self,
+        cache: Optional[ResponseCache] = None,
+        max_connections: int = 64,
+        max_per_host: int = 4,
+        timeout: float = 30.0,
+        user_agent: str = DEFAULT_USER_AGENT,
+    ):
+        self.cache = cache or ResponseCache()
+        self.max_per_host = max_per_host
+        self._limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self._timeout = httpx.Timeout(timeout)
+        self._headers = {"User-Agent": user_agent}
+
+        self._client = httpx.Client(
+            limits=self._limits, timeout=self._timeout, headers=self._headers, follow_redirects=True
+        )
+        self._lock = threading.Lock()
+        self._host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+
+    # --- helpers ---
+
+    def _conditional_headers(self, url: str):
+        cached = self.cache.get(url)
+        headers = {}
+        if cached:
+            etag, last_modified, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        return cached, headers
+
+    def _handle_response(self, url: str, response: httpx.Response, cached) -> Tuple[str, bool]:
+        if response.status_code == 304 and cached:
+            self.cache.touch(url)
+            return cached[2], False
+        response.raise_for_status()
+        body = response.text
+        self.cache.put(url, response.headers.get("ETag"), response.headers.get("Last-Modified"), body)
+        return body, True
+
+    def _host_semaphore(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_semaphores:
+                self._host_semaphores[host] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_semaphores[host]
+
+    def _async_client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            limits=self._limits, timeout=self._timeout, headers=self._headers, follow_redirects=True
+        )
+
+    async def _afetch(self, client: httpx.AsyncClient, semaphores: Dict[str, asyncio.Semaphore], url: str) -> Tuple[str, bool]:
+        host = urlsplit(url).netloc
+        if host not in semaphores:
+            semaphores[host] = asyncio.Semaphore(self.max_per_host)
+
+        cached, headers = self._conditional_headers(url)
+        async with semaphores[host]:
+            response = await client.get(url, headers=headers)
+        return self._handle_response(url, response, cached)
+
+    # --- sync api ---
+
+    def fetch(self, url: str) -> Tuple[str, bool]:
+        """
+        Fetches a page, revalidating against the cache.
+
+        Args:
+            url (str): The URL to fetch.
+
+        Returns:
+            Tuple[str, bool]: The page body and whether it changed since the last fetch.
+        """
+        cached, headers = self._conditional_headers(url)
+        with self._host_semaphore(url):
+            response = self._client.get(url, headers=headers)
+        return self._handle_response(url, response, cached)
+
+    def load(self, url: str) -> List[Document]:
+        """Fetches a page and returns it as a single-Document list."""
+        body, _ = self.fetch(url)
+        return [html_to_document(url, body)]
+
+    # --- async api ---
+
+    async def afetch(self, url: str) -> Tuple[str, bool]:
+        """Async version of `fetch` (use `aload_many` to share a pool across pages)."""
+        async with self._async_client() as client:
+            return await self._afetch(client, {}, url)
+
+    async def aload(self, url: str) -> List[Document]:
+        """Async version of `load`."""
+        body, _ = await self.afetch(url)
+        return [html_to_document(url, body)]
+
+    async def aload_many(self, urls: List[str]) -> List[Tuple[str, Optional[List[Document]], Optional[Exception]]]:
+        """
+        Fetches many pages concurrently over one async pool.
+
+        A failing URL never stops the others: its error is returned in place
+        of documents, like `iter_load_many`.
+
+        Args:
+            urls (List[str]): The URLs to fetch.
+
+        Returns:
+            List[Tuple[str, Optional[List[Document]], Optional[Exception]]]: (url, docs, error), in the given order.
+        """
+        semaphores: Dict[str, asyncio.Semaphore] = {}
+
+        async def load_one(client: httpx.AsyncClient, url: str):
+            body, _ = await self._afetch(client, semaphores, url)
+            return [html_to_document(url, body)]
+
+        async with self._async_client() as client:
+            pages = await asyncio.gather(*(load_one(client, url) for url in urls), return_exceptions=True)
+        return [
+            (url, None, page) if isinstance(page, Exception) else (url, page, None)
+            for url, page in zip(urls, pages)
+        ]
+
+# --- shared instance ---
+
+_fetcher_lock = threading.Lock()
+_default_fetcher: Optional[WebFetcher] = None
+
+def get_web_fetcher() -> WebFetcher:
+    """Returns the process-wide web fetcher, creating it on first use."""
+    global _default_fetcher
+    with _fetcher_lock:
+        if _default_fetcher is None:
+            _default_fetcher = WebFetcher()
+        return _default_fetcher
@@ -0,0 +1,104 @@
+import argparse
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_community.vectorstores import Chroma
+from day_03_chunking.faiss_store import FaissStore
+
+# --- synthetic corpus ---
+
+class LookupEmbeddings(Embeddings):
+    """Serves precomputed vectors by text, so the benchmark measures search, not an API."""
+
+    def __init__(self, vectors: Dict[str, List[float]]):
+        self.vectors = vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.vectors[t] for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.vectors[text]
+
+def make_corpus(n_docs: int, n_queries: int, dim: int, n_clusters: int = 1024, seed: int = 0):
+    """Clustered unit vectors (closer to real embeddings than uniform noise)."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim)).astype(np.float32)
+
+    def sample(n):
+        points = centers[rng.integers(0, n_clusters, n)] + 1.5 * rng.normal(size=(n, dim)).astype(np.float32)
+        return points / np.linalg.norm(points, axis=1, keepdims=True)
+
+    return sample(n_docs), sample(n_queries)
+
+def exact_top_k(doc_vectors: np.ndarray, query_vectors: np.ndarray, k: int) -> np.ndarray:
+    scores = query_vectors @ doc_vectors.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+# --- measurement ---
+
+def run_backend(name: str, store, docs: List[Document], query_vectors: np.ndarray, truth: np.ndarray, k: int) -> Dict[str, float]:
+    start = time.perf_counter()
+    for i in range(0, len(docs), 5000):
+        batch = docs[i:i + 5000]
+        store.add_documents(batch, ids=[d.id for d in batch])
+    if hasattr(store, "save"):
+        store.save()
+    build = time.perf_counter() - start
+
+    hits = 0
+    start = time.perf_counter()
+    for row, vector in enumerate(query_vectors):
+        found = store.similarity_search_by_vector(vector.tolist(), k=k)
+        # chroma drops ids from results, so match on the "doc-{i}" content
+        hits += len({int(d.page_content[4:]) for d in found} & set(truth[row].tolist()))
+    elapsed = time.perf_counter() - start
+    return {
+        "backend": name,
+        "build_s": build,
+        "recall": hits / truth.size,
+        "qps": len(query_vectors) / elapsed,
+        "ms_per_query": 1000 * elapsed / len(query_vectors),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare dense backends on recall@k and QPS.")
+    parser.add_argument("--docs", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--skip-chroma", action="store_true")
+    args = parser.parse_args()
+
+    print(f"\n📏 Dense backend benchmark: {args.docs} docs, {args.queries} queries, dim={args.dim}, k={args.k}\n")
+
+    doc_vectors, query_vectors = make_corpus(args.docs, args.queries, args.dim)
+    truth = exact_top_k(doc_vectors, query_vectors, args.k)
+    docs = [Document(id=str(i), page_content=f"doc-{i}") for i in range(args.docs)]
+    embeddings = LookupEmbeddings({f"doc-{i}": v.tolist() for i, v in enumerate(doc_vectors)})
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        if not args.skip_chroma:
+            chroma = Chroma(collection_name="bench", embedding_function=embeddings, persist_directory=f"{tmp}/chroma")
+            results.append(run_backend("chroma (hnsw)", chroma, docs, query_vectors, truth, args.k))
+
+        for index_type in ("flat", "ivf", "hnsw"):
+            store = FaissStore(embeddings, f"{tmp}/faiss", name=index_type, index_type=index_type)
+            results.append(run_backend(f"faiss {index_type}", store, docs, query_vectors, truth, args.k))
+
+            # reopen: the saved index is memory-mapped instead of read into memory
+            start = time.perf_counter()
+            reopened = FaissStore(embeddings, f"{tmp}/faiss", name=index_type, index_type=index_type)
+            reopened.similarity_search_by_vector(query_vectors[0].tolist(), k=args.k)
+            print(f"   faiss {index_type}: reopen + first query in {1000 * (time.perf_counter() - start):.1f} ms")
+
+    print(f"\n{'backend':<16}{'build s':>10}{'recall@' + str(args.k):>12}{'QPS':>10}{'ms/query':>10}")
+    for r in results:
+        print(f"{r['backend']:<16}{r['build_s']:>10.2f}{r['recall']:>12.3f}{r['qps']:>10.0f}{r['ms_per_query']:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import argparse
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+from langchain_core.documents import Document
+from day_03_chunking.benchmark_dense import LookupEmbeddings, exact_top_k, make_corpus
+from day_03_chunking.faiss_store import FaissStore
+from day_03_chunking.matryoshka import TruncatedEmbeddings, rerank_by_vectors
+
+def make_matryoshka_corpus(n_docs: int, n_queries: int, dim: int):
+    """
+    Clustered vectors whose variance decays along the dimensions.
+
+    Matryoshka-trained models pack most of the signal into the leading
+    dimensions; a decaying spectrum imitates that, so truncation behaves
+    like it does on real `text-embedding-3-*` vectors.
+    """
+    doc_vectors, query_vectors = make_corpus(n_docs, n_queries, dim)
+    decay = (1.0 + np.arange(dim, dtype=np.float32) / 64.0) ** -1.0
+    doc_vectors, query_vectors = doc_vectors * decay, query_vectors * decay
+    doc_vectors /= np.linalg.norm(doc_vectors, axis=1, keepdims=True)
+    query_vectors /= np.linalg.norm(query_vectors, axis=1, keepdims=True)
+    return doc_vectors, query_vectors
+
+def run_dimension(
+    tmp: str,
+    dimensions: int,
+    docs: List[Document],
+    full: LookupEmbeddings,
+    doc_vectors: np.ndarray,
+    query_vectors: np.ndarray,
+    truth: np.ndarray,
+    k: int,
+    rerank_factor: int,
+) -> Dict[str, float]:
+    store = FaissStore(TruncatedEmbeddings(full, dimensions), tmp, name=f"d{dimensions}", index_type="flat")
+    for i in range(0, len(docs), 5000):
+        batch = docs[i:i + 5000]
+        store.add_documents(batch, ids=[d.id for d in batch])
+    store.save()
+
+    truncated_queries = store.embedding.embed_documents([f"query-{i}" for i in range(len(query_vectors))])
+
+    hits, elapsed = 0, 0.0
+    rerank_hits, rerank_elapsed = 0, 0.0
+    for row, vector in enumerate(truncated_queries):
+        start = time.perf_counter()
+        found = store.similarity_search_by_vector(vector, k=k)
+        elapsed += time.perf_counter() - start
+        hits += len({int(d.id) for d in found} & set(truth[row].tolist()))
+
+        # full-dimension re-rank of a wider candidate set
+        start = time.perf_counter()
+        candidates = store.similarity_search_by_vector(vector, k=k * rerank_factor)
+        reranked = rerank_by_vectors(query_vectors[row], candidates, doc_vectors[[int(d.id) for d in candidates]], k)
+        rerank_elapsed += time.perf_counter() - start
+        rerank_hits += len({int(d.id) for d in reranked} & set(truth[row].tolist()))
+
+    n = len(query_vectors)
+    return {
+        "dimensions": dimensions,
+        "index_bytes": os.path.getsize(store.index_path),
+        "recall": hits / truth.size,
+        "ms": 1000 * elapsed / n,
+        "rerank_recall": rerank_hits / truth.size,
+        "rerank_ms": 1000 * rerank_elapsed / n,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the latency / memory / recall trade-off of reduced embedding dimensions.")
+    parser.add_argument("--docs", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rerank-factor", type=int, default=4)
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[1536, 1024, 512, 256, 128, 64])
+    args = parser.parse_args()
+
+    print(f"\n🪆 Dimension report: {args.docs} docs, {args.queries} queries, full dim={args.dim}, k={args.k}\n")
+
+    doc_vectors, query_vectors = make_matryoshka_corpus(args.docs, args.queries, args.dim)
+    truth = exact_top_k(doc_vectors, query_vectors, args.k)
+    docs = [Document(id=str(i), page_content=f"doc-{i}") for i in range(args.docs)]
+    vectors = {f"doc-{i}": v.tolist() for i, v in enumerate(doc_vectors)}
+    vectors.update({f"query-{i}": v.tolist() for i, v in enumerate(query_vectors)})
+    full = LookupEmbeddings(vectors)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for dimensions in args.dimensions:
+            results.append(run_dimension(
+                tmp, min(dimensions, args.dim), docs, full, doc_vectors, query_vectors, truth, args.k, args.rerank_factor
+            ))
+
+    print(f"{'dims':>6}{'index MB':>10}{'ms/query':>10}{'recall':>9}{'+rerank ms':>12}{'+rerank recall':>16}")
+    for r in results:
+        print(
+            f"{r['dimensions']:>6}{r['index_bytes'] / 1e6:>10.1f}{r['ms']:>10.2f}{r['recall']:>9.3f}"
+            f"{r['rerank_ms']:>12.2f}{r['rerank_recall']:>16.3f}"
+        )
+
+if __name__ == "__main__":
+    main()
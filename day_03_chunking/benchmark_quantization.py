@@ -0,0 +1,90 @@
+import argparse
+import os
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+from langchain_core.documents import Document
+from day_03_chunking.benchmark_dense import LookupEmbeddings, exact_top_k, make_corpus
+from day_03_chunking.faiss_store import FaissStore
+
+# (index type, quantization) pairs to compare against the float32 baseline
+CONFIGS = [
+    ("flat", None),
+    ("flat", "sq8"),
+    ("flat", "pq"),
+    ("hnsw", None),
+    ("hnsw", "sq8"),
+    ("hnsw", "pq"),
+    ("ivf", "sq8"),
+    ("ivf", "pq"),
+]
+
+def recall_and_qps(store: FaissStore, query_vectors: np.ndarray, truth: np.ndarray, k: int):
+    hits = 0
+    start = time.perf_counter()
+    for row, vector in enumerate(query_vectors):
+        found = store.similarity_search_by_vector(vector.tolist(), k=k)
+        hits += len({int(d.id) for d in found} & set(truth[row].tolist()))
+    elapsed = time.perf_counter() - start
+    return hits / truth.size, len(query_vectors) / elapsed
+
+def run_config(
+    tmp: str,
+    index_type: str,
+    quantization: Optional[str],
+    docs: List[Document],
+    embeddings: LookupEmbeddings,
+    query_vectors: np.ndarray,
+    truth: np.ndarray,
+    k: int,
+) -> Dict[str, object]:
+    name = f"{index_type}-{quantization or 'f32'}"
+    store = FaissStore(embeddings, tmp, name=name, index_type=index_type, quantization=quantization)
+    for i in range(0, len(docs), 5000):
+        batch = docs[i:i + 5000]
+        store.add_documents(batch, ids=[d.id for d in batch])
+    store.save()
+
+    # the saved index is what a worker keeps in memory
+    index_bytes = os.path.getsize(store.index_path)
+    recall, qps = recall_and_qps(store, query_vectors, truth, k)
+    raw_recall = None
+    if quantization:
+        store.rerank_factor = 0
+        raw_recall, _ = recall_and_qps(store, query_vectors, truth, k)
+    return {"config": name, "index_bytes": index_bytes, "recall": recall, "raw_recall": raw_recall, "qps": qps}
+
+def main():
+    parser = argparse.ArgumentParser(description="Report recall@k against index memory for quantized FAISS stores.")
+    parser.add_argument("--docs", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"\n🗜️  Quantization report: {args.docs} docs, {args.queries} queries, dim={args.dim}, k={args.k}\n")
+
+    doc_vectors, query_vectors = make_corpus(args.docs, args.queries, args.dim)
+    truth = exact_top_k(doc_vectors, query_vectors, args.k)
+    docs = [Document(id=str(i), page_content=f"doc-{i}") for i in range(args.docs)]
+    embeddings = LookupEmbeddings({f"doc-{i}": v.tolist() for i, v in enumerate(doc_vectors)})
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for index_type, quantization in CONFIGS:
+            results.append(run_config(tmp, index_type, quantization, docs, embeddings, query_vectors, truth, args.k))
+            print(f"   done: {results[-1]['config']}")
+
+    baseline = args.docs * args.dim * 4
+    print(f"\n{'config':<12}{'index MB':>10}{'vs f32':>8}{'B/vec':>8}{'recall':>9}{'no rerank':>11}{'QPS':>8}")
+    for r in results:
+        raw = "-" if r["raw_recall"] is None else f"{r['raw_recall']:.3f}"
+        print(
+            f"{r['config']:<12}{r['index_bytes'] / 1e6:>10.1f}{r['index_bytes'] / baseline:>8.2f}"
+            f"{r['index_bytes'] / args.docs:>8.0f}{r['recall']:>9.3f}{raw:>11}{r['qps']:>8.0f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,380 @@
+import heapq
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# segments of one level merged into one of the next, so each posting is rewritten O(log n) times
+MERGE_FACTOR = 8
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases text and splits it into word tokens."""
+    return _TOKEN_RE.findall(text.lower())
+
+class _Cursor:
+    """A read position over one term's postings, used by the WAND search."""
+    __slots__ = ("doc_ids", "tfs", "pos", "idf", "upper_bound")
+
+    def __init__(self, doc_ids: array, tfs: array, idf: float, upper_bound: float):
+        self.doc_ids = doc_ids
+        self.tfs = tfs
+        self.pos = 0
+        self.idf = idf
+        self.upper_bound = upper_bound
+
+    def doc(self) -> int:
+        return self.doc_ids[self.pos] if self.pos < len(self.doc_ids) else -1
+
+    def exhausted(self) -> bool:
+        return self.pos >= len(self.doc_ids)
+
+class BM25Index:
+    """
+    A BM25 inverted index stored on disk in a single SQLite file.
+
+    Postings are packed arrays (uint32 doc ids, uint16 term frequencies)
+    sorted by doc id. Every `add_documents` batch writes its own postings
+    segment instead of rewriting each term's full list; once `MERGE_FACTOR`
+    segments share a level they are merged into one of the next level, so
+    ingestion cost stays O(n log n). A term's segments are concatenated in
+    doc id order when it is read. Postings are loaded per term on demand
+    into a small LRU, and top-k queries use WAND to skip documents that
+    cannot make it into the results.
+    """
+
+    def __init__(self, path: str, k1: float = 1.5, b: float = 0.75, postings_cache_size: int = 4096):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+        self.postings_cache_size = postings_cache_size
+        self._lock = threading.RLock()
+        self._postings: "OrderedDict[str, Tuple[array, array, int]]" = OrderedDict()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS docs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                key TEXT UNIQUE NOT NULL,
+                length INTEGER NOT NULL,
+                content TEXT NOT NULL,
+                metadata TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS segments (
+                id INTEGER PRIMARY KEY,
+                level INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                segment INTEGER NOT NULL,
+                doc_ids BLOB NOT NULL,
+                tfs BLOB NOT NULL,
+                PRIMARY KEY (term, segment)
+            ) WITHOUT ROWID;
+            """
+        )
+        self._migrate_terms()
+
+        # doc lengths are the only per-document state kept in memory (4 bytes each)
+        self._lengths = array("I")
+        self._n_docs = 0
+        self._total_length = 0
+        for doc_id, length in self._conn.execute("SELECT id, length FROM docs"):
+            self._set_length(doc_id, length)
+
+    # --- bookkeeping ---
+
+    def _set_length(self, doc_id: int, length: int):
+        if doc_id >= len(self._lengths):
+            self._lengths.extend([0] * (doc_id + 1 - len(self._lengths)))
+        old = self._lengths[doc_id]
+        self._lengths[doc_id] = length
+        self._total_length += length - old
+        if old == 0 and length > 0:
+            self._n_docs += 1
+        elif old > 0 and length == 0:
+            self._n_docs -= 1
+
+    def _migrate_terms(self):
+        # indexes written before segments kept one full postings row per term
+        if not self._conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'terms'").fetchone():
+            return
+        self._conn.execute(
+            "INSERT OR IGNORE INTO postings (term, segment, doc_ids, tfs) SELECT term, 0, doc_ids, tfs FROM terms"
+        )
+        # a base segment that is never merged again
+        self._conn.execute("INSERT OR IGNORE INTO segments (id, level) VALUES (0, 64)")
+        self._conn.execute("DROP TABLE terms")
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        return self._n_docs
+
+    def drop(self):
+        """Closes the index and deletes its file."""
+        with self._lock:
+            self._conn.close()
+            self._postings.clear()
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(self.path + suffix):
+                    os.remove(self.path + suffix)
+
+    def memory_bytes(self) -> int:
+        """Approximate resident size: doc lengths plus the cached postings."""
+        postings = sum(d.itemsize * len(d) + t.itemsize * len(t) for d, t, _ in self._postings.values())
+        return self._lengths.itemsize * len(self._lengths) + postings
+
+    def _read_postings(self, term: str) -> Optional[Tuple[array, array, int]]:
+        cached = self._postings.get(term)
+        if cached is not None:
+            self._postings.move_to_end(term)
+            return cached
+
+        rows = self._conn.execute(
+            "SELECT doc_ids, tfs FROM postings WHERE term = ? ORDER BY segment", (term,)
+        ).fetchall()
+        if not rows:
+            return None
+        # segments cover increasing doc id ranges, so concatenating keeps the order
+        doc_ids, tfs = array("I"), array("H")
+        for segment_ids, segment_tfs in rows:
+            doc_ids.frombytes(segment_ids)
+            tfs.frombytes(segment_tfs)
+        entry = (doc_ids, tfs, max(tfs) if tfs else 0)
+
+        self._postings[term] = entry
+        if len(self._postings) > self.postings_cache_size:
+            self._postings.popitem(last=False)
+        return entry
+
+    def _merge_segments(self):
+        """Merges full levels of segments, bottom up."""
+        level = 0
+        while True:
+            ids = [r[0] for r in self._conn.execute("SELECT id FROM segments WHERE level = ? ORDER BY id", (level,))]
+            if len(ids) < MERGE_FACTOR:
+                return
+            placeholders = ",".join("?" * len(ids))
+            merged: Dict[str, Tuple[array, array]] = {}
+            rows = self._conn.execute(
+                f"SELECT term, doc_ids, tfs FROM postings WHERE segment IN ({placeholders}) ORDER BY term, segment", ids
+            )
+            for term, segment_ids, segment_tfs in rows:
+                doc_ids, tfs = merged.setdefault(term, (array("I"), array("H")))
+                doc_ids.frombytes(segment_ids)
+                tfs.frombytes(segment_tfs)
+
+            self._conn.execute(f"DELETE FROM postings WHERE segment IN ({placeholders})", ids)
+            self._conn.execute(f"DELETE FROM segments WHERE id IN ({placeholders})", ids)
+            self._conn.executemany(
+                "INSERT INTO postings (term, segment, doc_ids, tfs) VALUES (?, ?, ?, ?)",
+                [(term, ids[0], d.tobytes(), t.tobytes()) for term, (d, t) in merged.items()],
+            )
+            self._conn.execute("INSERT INTO segments (id, level) VALUES (?, ?)", (ids[0], level + 1))
+            level += 1
+
+    # --- writes ---
+
+    def add_documents(self, docs: List[Document], keys: List[str]):
+        """
+        Adds documents to the index in one transaction.
+
+        Args:
+            docs (List[Document]): The documents to add.
+            keys (List[str]): A unique key per document (e.g. the chunk id).
+        """
+        with self._lock:
+            new_postings: Dict[str, List[Tuple[int, int]]] = {}
+            for doc, key in zip(docs, keys):
+                counts = Counter(tokenize(doc.page_content))
+                length = sum(counts.values())
+                cur = self._conn.execute(
+                    "INSERT OR IGNORE INTO docs (key, length, content, metadata) VALUES (?, ?, ?, ?)",
+                    (key, length, doc.page_content, json.dumps(doc.metadata, default=str)),
+                )
+                if cur.rowcount == 0:
+                    continue  # already indexed
+                doc_id = cur.lastrowid
+                self._set_length(doc_id, length)
+                for term, tf in counts.items():
+                    new_postings.setdefault(term, []).append((doc_id, min(tf, 65535)))
+
+            if new_postings:
+                # ids are autoincrement: the batch is a new segment after every existing one
+                segment = min(entries[0][0] for entries in new_postings.values())
+                self._conn.execute("INSERT INTO segments (id, level) VALUES (?, 0)", (segment,))
+                rows = []
+                for term, entries in new_postings.items():
+                    doc_ids = array("I", (d for d, _ in entries))
+                    tfs = array("H", (tf for _, tf in entries))
+                    rows.append((term, segment, doc_ids.tobytes(), tfs.tobytes()))
+                    cached = self._postings.get(term)
+                    if cached is not None:
+                        cached[0].extend(doc_ids)
+                        cached[1].extend(tfs)
+                        self._postings[term] = (cached[0], cached[1], max(cached[2], max(tfs)))
+                self._conn.executemany("INSERT INTO postings (term, segment, doc_ids, tfs) VALUES (?, ?, ?, ?)", rows)
+                self._merge_segments()
+
+            self._conn.commit()
+
+    def delete(self, keys: List[str]):
+        """Removes documents by key, rewriting only the postings segments they appear in."""
+        with self._lock:
+            removed: Dict[str, set] = {}
+            for key in keys:
+                row = self._conn.execute("SELECT id, content FROM docs WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    continue
+                doc_id, content = row
+                for term in set(tokenize(content)):
+                    removed.setdefault(term, set()).add(doc_id)
+                self._conn.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+                self._set_length(doc_id, 0)
+
+            for term, doc_ids_to_drop in removed.items():
+                self._postings.pop(term, None)
+                lo, hi = min(doc_ids_to_drop), max(doc_ids_to_drop)
+                rows = self._conn.execute(
+                    "SELECT segment, doc_ids, tfs FROM postings WHERE term = ? AND segment <= ?", (term, hi)
+                ).fetchall()
+                for segment, segment_ids, segment_tfs in rows:
+                    doc_ids, tfs = array("I"), array("H")
+                    doc_ids.frombytes(segment_ids)
+                    tfs.frombytes(segment_tfs)
+                    if not doc_ids or doc_ids[-1] < lo:
+                        continue
+                    keep = [i for i, d in enumerate(doc_ids) if d not in doc_ids_to_drop]
+                    if len(keep) == len(doc_ids):
+                        continue
+                    if keep:
+                        self._conn.execute(
+                            "UPDATE postings SET doc_ids = ?, tfs = ? WHERE term = ? AND segment = ?",
+                            (array("I", (doc_ids[i] for i in keep)).tobytes(),
+                             array("H", (tfs[i] for i in keep)).tobytes(), term, segment),
+                        )
+                    else:
+                        self._conn.execute("DELETE FROM postings WHERE term = ? AND segment = ?", (term, segment))
+
+            self._conn.commit()
+
+    # --- reads ---
+
+    def idf(self, df: int) -> float:
+        """Non-negative BM25 idf (the Lucene variant)."""
+        return math.log(1 + (self._n_docs - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[str, float]]:
+        """
+        Returns the top-k (key, score) pairs for a query using WAND.
+
+        Each term gets a score upper bound from its highest term frequency and
+        the shortest possible length norm. Documents whose summed upper bounds
+        cannot beat the current k-th best score are skipped without scoring.
+        """
+        with self._lock:
+            if self._n_docs == 0:
+                return []
+            k1, b = self.k1, self.b
+            avgdl = self._total_length / self._n_docs
+
+            cursors = []
+            for term in set(tokenize(query)):
+                postings = self._read_postings(term)
+                if postings is None:
+                    continue
+                doc_ids, tfs, max_tf = postings
+                idf = self.idf(len(doc_ids))
+                upper_bound = idf * max_tf * (k1 + 1) / (max_tf + k1 * (1 - b))
+                cursors.append(_Cursor(doc_ids, tfs, idf, upper_bound))
+
+            heap: List[Tuple[float, int]] = []
+            threshold = 0.0
+            while True:
+                cursors = [c for c in cursors if not c.exhausted()]
+                if not cursors:
+                    break
+                cursors.sort(key=_Cursor.doc)
+
+                # 1. find the pivot: the first cursor where the bounds could beat the threshold
+                acc, pivot = 0.0, None
+                for i, c in enumerate(cursors):
+                    acc += c.upper_bound
+                    if acc > threshold:
+                        pivot = i
+                        break
+                if pivot is None:
+                    break
+                pivot_doc = cursors[pivot].doc()
+
+                # 2. everyone is on the pivot -> score it fully
+                if cursors[0].doc() == pivot_doc:
+                    norm = k1 * (1 - b + b * self._lengths[pivot_doc] / avgdl)
+                    score = 0.0
+                    for c in cursors:
+                        if c.doc() != pivot_doc:
+                            break
+                        tf = c.tfs[c.pos]
+                        score += c.idf * tf * (k1 + 1) / (tf + norm)
+                        c.pos += 1
+                    if len(heap) < k:
+                        heapq.heappush(heap, (score, pivot_doc))
+                    elif score > heap[0][0]:
+                        heapq.heapreplace(heap, (score, pivot_doc))
+                    if len(heap) == k:
+                        threshold = heap[0][0]
+
+                # 3. otherwise skip the lagging cursors straight to the pivot
+                else:
+                    for c in cursors[:pivot]:
+                        c.pos = bisect_left(c.doc_ids, pivot_doc, c.pos)
+
+            ranked = sorted(heap, reverse=True)
+            keys = self._keys_for([doc_id for _, doc_id in ranked])
+            return [(keys[doc_id], score) for score, doc_id in ranked]
+
+    def _keys_for(self, doc_ids: List[int]) -> Dict[int, str]:
+        if not doc_ids:
+            return {}
+        placeholders = ",".join("?" * len(doc_ids))
+        rows = self._conn.execute(f"SELECT id, key FROM docs WHERE id IN ({placeholders})", doc_ids).fetchall()
+        return dict(rows)
+
+    def get_documents(self, keys: List[str]) -> List[Document]:
+        """Fetches stored documents by key, preserving the given order."""
+        if not keys:
+            return []
+        with self._lock:
+            placeholders = ",".join("?" * len(keys))
+            rows = self._conn.execute(
+                f"SELECT key, content, metadata FROM docs WHERE key IN ({placeholders})", keys
+            ).fetchall()
+        by_key = {key: Document(id=key, page_content=c, metadata=json.loads(m)) for key, c, m in rows}
+        return [by_key[key] for key in keys if key in by_key]
+
+class BM25IndexRetriever(BaseRetriever):
+    """
+    A drop-in sparse retriever over a persistent `BM25Index`.
+    """
+    index: BM25Index
+    k: int = 5
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        hits = self.index.search(query, self.k)
+        return self.index.get_documents([key for key, _ in hits])
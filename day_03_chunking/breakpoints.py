@@ -0,0 +1,265 @@
+import re
+import zlib
+from typing import Dict, List, Optional, Protocol, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+# same sentence boundary rule as langchain's SemanticChunker
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.?!])\s+")
+_TOKEN_RE = re.compile(r"\w+")
+
+# default threshold amounts, matching SemanticChunker
+DEFAULT_THRESHOLD_AMOUNTS = {
+    "percentile": 95.0,
+    "standard_deviation": 3.0,
+    "interquartile": 1.5,
+    "gradient": 95.0,
+}
+
+def split_sentences(text: str) -> List[str]:
+    """Splits text on '.', '?' and '!' followed by whitespace."""
+    return [s for s in SENTENCE_SPLIT_RE.split(text) if s]
+
+def sentence_spans(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Finds sentence boundaries as character offsets, without copying any text.
+
+    Args:
+        text (str): The text to split.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Start and end offsets of each non-empty sentence.
+    """
+    starts, ends = [0], []
+    for match in SENTENCE_SPLIT_RE.finditer(text):
+        ends.append(match.start())
+        starts.append(match.end())
+    ends.append(len(text))
+    starts, ends = np.asarray(starts, dtype=np.int64), np.asarray(ends, dtype=np.int64)
+    keep = ends > starts
+    return starts[keep], ends[keep]
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    matrix /= norms
+    return matrix
+
+# --- vectorized core ---
+
+def window_vectors(sentence_vectors: np.ndarray, buffer_size: int) -> np.ndarray:
+    """
+    Sums each sentence's vector with `buffer_size` neighbours on each side.
+
+    Uses one cumulative sum over the contiguous matrix, so every window
+    costs two row lookups regardless of its size. The sum is accumulated in
+    float64: in float32 its rounding error grows with the document and
+    shifts the distances of late windows.
+
+    Args:
+        sentence_vectors (np.ndarray): (n, d) float32 sentence embeddings.
+        buffer_size (int): Neighbours to include on each side.
+
+    Returns:
+        np.ndarray: (n, d) unit-normalized window vectors.
+    """
+    n = sentence_vectors.shape[0]
+    if buffer_size == 0:
+        return _normalize_rows(sentence_vectors.copy())
+    cumulative = np.zeros((n + 1, sentence_vectors.shape[1]), dtype=np.float64)
+    np.cumsum(sentence_vectors, axis=0, dtype=np.float64, out=cumulative[1:])
+    idx = np.arange(n)
+    lo = np.maximum(idx - buffer_size, 0)
+    hi = np.minimum(idx + buffer_size + 1, n)
+    return _normalize_rows((cumulative[hi] - cumulative[lo]).astype(np.float32))
+
+def adjacent_distances(vectors: np.ndarray) -> np.ndarray:
+    """Cosine distance between each pair of consecutive unit vectors."""
+    return 1.0 - np.einsum("ij,ij->i", vectors[:-1], vectors[1:])
+
+def breakpoint_indices(distances: np.ndarray, threshold_type: str = "percentile", amount: Optional[float] = None) -> np.ndarray:
+    """
+    Returns the indices after which the text should be split.
+
+    Args:
+        distances (np.ndarray): Distances between consecutive sentence windows.
+        threshold_type (str): "percentile", "standard_deviation", "interquartile" or "gradient".
+        amount (Optional[float]): The threshold parameter (defaults as in SemanticChunker).
+
+    Returns:
+        np.ndarray: Sorted indices i where sentence i ends a chunk.
+    """
+    if amount is None:
+        amount = DEFAULT_THRESHOLD_AMOUNTS[threshold_type]
+    values = distances
+    if threshold_type == "percentile":
+        threshold = np.percentile(distances, amount)
+    elif threshold_type == "standard_deviation":
+        threshold = distances.mean() + amount * distances.std()
+    elif threshold_type == "interquartile":
+        q1, q3 = np.percentile(distances, [25, 75])
+        threshold = distances.mean() + amount * (q3 - q1)
+    elif threshold_type == "gradient":
+        values = np.gradient(distances) if len(distances) > 1 else distances
+        threshold = np.percentile(values, amount)
+    else:
+        raise ValueError(f"Unknown breakpoint threshold type: {threshold_type}")
+    return np.flatnonzero(values > threshold)
+
+def chunk_spans(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    breakpoints: np.ndarray,
+    distances: np.ndarray,
+    min_chunk_size: Optional[int] = None,
+    max_chunk_size: Optional[int] = None,
+) -> List[Tuple[int, int]]:
+    """
+    Turns breakpoints into (first sentence, last sentence) spans within size limits.
+
+    A chunk never ends before it reaches `min_chunk_size` characters, and is
+    force-split at its most distant sentence boundary before it would exceed
+    `max_chunk_size`. The loop runs once per chunk, not per sentence, and
+    every lookup is a binary search over the offset arrays.
+    """
+    n = len(starts)
+    spans = []
+    first = 0
+    while first < n:
+        base = starts[first]
+        # earliest sentence that satisfies min size, latest that satisfies max size
+        lo = first if min_chunk_size is None else int(np.searchsorted(ends, base + min_chunk_size, side="left"))
+        hi = n - 1 if max_chunk_size is None else int(np.searchsorted(ends, base + max_chunk_size, side="right")) - 1
+        lo, hi = min(max(lo, first), n - 1), max(hi, first)
+
+        natural = np.searchsorted(breakpoints, lo, side="left")
+        if natural < len(breakpoints) and breakpoints[natural] <= hi:
+            last = int(breakpoints[natural])
+        elif hi >= n - 1:
+            last = n - 1
+        elif lo <= hi:
+            last = lo + int(np.argmax(distances[lo:hi + 1]))
+        else:
+            last = hi
+        spans.append((first, last))
+        first = last + 1
+    return spans
+
+# --- engines ---
+
+class BreakpointEngine(Protocol):
+    """Turns a list of texts into an (n, d) float32 matrix."""
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        ...
+
+class HashedTfidfEngine:
+    """
+    A local, CPU-only sentence vectorizer for finding topic shifts.
+
+    Words and word bigrams are hashed (crc32, so stable across processes)
+    into `n_features` buckets, weighted by sublinear tf and an idf computed
+    over the texts of the current call, then L2-normalized. No network calls,
+    no model download, and the cost is a few NumPy passes per document.
+    """
+
+    def __init__(self, n_features: int = 1024, use_bigrams: bool = True):
+        self.n_features = n_features
+        self.use_bigrams = use_bigrams
+        self._buckets: Dict[str, int] = {}
+
+    def _bucket(self, token: str) -> int:
+        bucket = self._buckets.get(token)
+        if bucket is None:
+            bucket = zlib.crc32(token.encode("utf-8")) % self.n_features
+            if len(self._buckets) < 1_000_000:
+                self._buckets[token] = bucket
+        return bucket
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        rows, cols = [], []
+        for row, text in enumerate(texts):
+            tokens = _TOKEN_RE.findall(text.lower())
+            if self.use_bigrams:
+                tokens = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            rows.extend([row] * len(tokens))
+            cols.extend(self._bucket(t) for t in tokens)
+
+        counts = np.zeros((len(texts), self.n_features), dtype=np.float32)
+        np.add.at(counts, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)), 1.0)
+
+        # sublinear tf * smoothed idf
+        df = np.count_nonzero(counts, axis=0).astype(np.float32)
+        idf = np.log((1.0 + len(texts)) / (1.0 + df)) + 1.0
+        np.log1p(counts, out=counts)
+        counts *= idf
+        return _normalize_rows(counts)
+
+class EmbeddingsEngine:
+    """Adapts any LangChain `Embeddings` (e.g. OpenAI) to the engine protocol."""
+
+    def __init__(self, embeddings: Embeddings):
+        self.embeddings = embeddings
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return _normalize_rows(np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32))
+
+# --- chunker ---
+
+class LocalSemanticChunker:
+    """
+    A semantic chunker with a pluggable breakpoint engine.
+
+    Each sentence is embedded once into a contiguous float32 matrix. Window
+    vectors (`buffer_size` neighbours on each side), adjacent cosine
+    distances and the breakpoint threshold are then computed in vectorized
+    passes, and chunks are sliced from the original text by offset.
+
+    `min_chunk_size` and `max_chunk_size` bound chunk lengths in characters:
+    a chunk doesn't end before the minimum, and is split at its most distant
+    sentence boundary rather than grow past the maximum (a single sentence
+    longer than that is kept whole).
+    """
+
+    def __init__(
+        self,
+        engine: Optional[BreakpointEngine] = None,
+        buffer_size: int = 1,
+        breakpoint_threshold_type: str = "percentile",
+        breakpoint_threshold_amount: Optional[float] = None,
+        min_chunk_size: Optional[int] = None,
+        max_chunk_size: Optional[int] = None,
+    ):
+        self.engine = engine or HashedTfidfEngine()
+        self.buffer_size = buffer_size
+        self.breakpoint_threshold_type = breakpoint_threshold_type
+        self.breakpoint_threshold_amount = breakpoint_threshold_amount
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+
+    def split_text(self, text: str) -> List[str]:
+        starts, ends = sentence_spans(text)
+        if len(starts) <= 1:
+            return [text[s:e] for s, e in zip(starts, ends)]
+
+        # 1. one embedding per sentence, then windows via a cumulative sum
+        sentences = [text[s:e] for s, e in zip(starts, ends)]
+        vectors = window_vectors(self.engine.embed(sentences), self.buffer_size)
+        del sentences
+
+        # 2. adjacent distances and the threshold in one pass each
+        distances = adjacent_distances(vectors)
+        breakpoints = breakpoint_indices(distances, self.breakpoint_threshold_type, self.breakpoint_threshold_amount)
+
+        # 3. apply size limits and slice chunks straight from the original text
+        spans = chunk_spans(starts, ends, breakpoints, distances, self.min_chunk_size, self.max_chunk_size)
+        return [text[starts[first]:ends[last]] for first, last in spans]
+
+    def split_documents(self, docs: List[Document]) -> List[Document]:
+        chunks = []
+        for doc in docs:
+            for text in self.split_text(doc.page_content):
+                chunks.append(Document(page_content=text, metadata=dict(doc.metadata)))
+        return chunks
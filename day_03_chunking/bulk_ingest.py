@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+from typing import Callable, Dict, List, Optional, Union
+
+from langchain_core.documents import Document
+from day_02_reading.bulk import _is_url, expand_sources, iter_load_many
+from day_03_chunking.index_manager import IndexManager
+from day_03_chunking.pipeline import run_ingestion_pipeline
+
+# called as on_progress(source, status, finished, total)
+ProgressCallback = Callable[[str, str, int, int], None]
+
+def checkpoint_path_for(index: IndexManager) -> str:
+    """The checkpoint of an index lives next to its manifest, so a wiped or different index starts over."""
+    return os.path.join(index.persist_directory, f"{index.prefix}.bulk_checkpoint.jsonl")
+
+def _file_fingerprint(source: str) -> Optional[str]:
+    """A cheap change marker for files (size + mtime), known before loading."""
+    if os.path.isfile(source):
+        stat = os.stat(source)
+        return f"{stat.st_size}:{stat.st_mtime_ns}"
+    return None
+
+def _content_fingerprint(docs: List[Document]) -> str:
+    """A change marker for URLs: a hash of the fetched content (fetching revalidates cheaply)."""
+    digest = hashlib.sha256()
+    for doc in docs:
+        digest.update(doc.page_content.encode("utf-8"))
+        digest.update(b"\x00")
+    return "sha256:" + digest.hexdigest()
+
+def _read_checkpoint(path: str) -> Dict[str, str]:
+    """Reads the append-only checkpoint; later lines win, a torn last line is ignored."""
+    done: Dict[str, str] = {}
+    if os.path.exists(path):
+        with open(path, "r") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                done[entry["source"]] = entry["fingerprint"]
+    return done
+
+def bulk_ingest(
+    spec: Union[str, List[str]],
+    index: IndexManager,
+    checkpoint_path: Optional[str] = None,
+    max_processes: Optional[int] = None,
+    max_threads: int = 16,
+    on_progress: Optional[ProgressCallback] = None,
+) -> Dict[str, object]:
+    """
+    Ingests a directory, glob or manifest of files and URLs into an index.
+
+    Sources are extracted concurrently (PDFs in a process pool, web pages on
+    threads). Each one is then streamed through the bounded chunk -> index
+    pipeline as it arrives, while the pools keep extracting the next. Each
+    finished source is appended to a checkpoint file kept with the index,
+    so re-running skips sources that are already done, unchanged and still
+    in the index: files by size + mtime before loading, URLs by a hash of
+    their content after fetching. A failing source is reported and skipped
+    without stopping the run.
+
+    Args:
+        spec (Union[str, List[str]]): What to ingest (see `expand_sources`).
+        index (IndexManager): The persistent index to write into.
+        checkpoint_path (Optional[str]): Where finished sources are recorded
+            (defaults to `checkpoint_path_for(index)`).
+        max_processes (Optional[int]): Size of the PDF process pool.
+        max_threads (int): Size of the I/O thread pool.
+        on_progress (Optional[ProgressCallback]): Called after every source.
+
+    Returns:
+        Dict[str, object]: Counts of ingested and skipped sources, plus failures by source.
+    """
+    sources = expand_sources(spec)
+    print(f"--- Bulk Ingestion: {len(sources)} sources ---")
+
+    # 1. skip files the checkpoint says are done, unchanged and still indexed
+    checkpoint_path = checkpoint_path or checkpoint_path_for(index)
+    indexed = index.sources()
+    done = {s: f for s, f in _read_checkpoint(checkpoint_path).items() if s in indexed}
+    fingerprints = {s: _file_fingerprint(s) for s in sources if not _is_url(s)}
+    todo = [s for s in sources if _is_url(s) or fingerprints[s] is None or done.get(s) != fingerprints[s]]
+
+    report: Dict[str, object] = {"ingested": 0, "skipped": len(sources) - len(todo), "chunks": 0, "failed": {}}
+    finished = report["skipped"]
+    if report["skipped"]:
+        print(f"--- Resuming: {report['skipped']} sources already done ---")
+
+    if os.path.dirname(checkpoint_path):
+        os.makedirs(os.path.dirname(checkpoint_path), exist_ok=True)
+
+    # 2. extract concurrently, then pipeline each source through chunk + index as it arrives
+    with open(checkpoint_path, "a") as checkpoint:
+        for source, docs, error in iter_load_many(todo, max_processes=max_processes, max_threads=max_threads):
+            status = "done"
+            if error is None and _is_url(source):
+                fingerprints[source] = _content_fingerprint(docs or [])
+                if done.get(source) == fingerprints[source]:
+                    status = "skipped"
+            if error is None and status == "done":
+                try:
+                    stats = run_ingestion_pipeline(source, index, documents=docs or [])
+                    report["chunks"] += stats["chunks"]
+                except Exception as e:
+                    error = e
+
+            if status == "skipped":
+                report["skipped"] += 1
+            elif error is None:
+                report["ingested"] += 1
+                checkpoint.write(json.dumps({"source": source, "fingerprint": fingerprints[source]}) + "\n")
+                checkpoint.flush()
+            else:
+                status = "failed"
+                report["failed"][source] = str(error)
+                print(f"❌ Failed to ingest {source}: {error}")
+
+            finished += 1
+            if on_progress:
+                on_progress(source, status, finished, len(sources))
+
+    print(f"--- Bulk Ingestion done: {report['ingested']} ingested, {report['skipped']} skipped, {len(report['failed'])} failed ---")
+    return report
@@ -1,35 +1,68 @@
-from typing import List
+from typing import List, Optional
 from langchain_core.documents import Document
 from langchain_experimental.text_splitter import SemanticChunker
-from langchain_openai import OpenAIEmbeddings
+from day_03_chunking.breakpoints import HashedTfidfEngine, LocalSemanticChunker
+from day_03_chunking.embedding_cache import get_embeddings
 
-def chunk_documents(docs: List[Document]) -> List[Document]:
+def chunk_documents(
+    docs: List[Document],
+    engine: str = "local",
+    dimensions: Optional[int] = None,
+    min_chunk_size: Optional[int] = None,
+    max_chunk_size: Optional[int] = None,
+) -> List[Document]:
     """
     Chunks documents using Semantic Chunking.
-    
+
     This method uses embeddings to identify "semantic breakpoints" in the text,
     ensuring that chunks represent coherent ideas rather than arbitrary splits.
-    
+
     Args:
         docs (List[Document]): The list of documents to chunk.
-        
+        engine (str): Which breakpoint engine to use:
+            - "local": hashed TF-IDF sentence vectors on the CPU (no API calls)
+            - "openai": OpenAI embeddings for every sentence (slower, paid)
+        dimensions (Optional[int]): Shorter OpenAI vectors for the "openai" engine;
+            breakpoints only compare neighbouring sentences, so a few hundred
+            dimensions are usually enough.
+        min_chunk_size (Optional[int]): Minimum chunk length in characters.
+        max_chunk_size (Optional[int]): Maximum chunk length in characters
+            ("local" engine only; SemanticChunker has no upper bound).
+
     Returns:
         List[Document]: The list of chunked documents.
     """
-    print("--- Chunking Documents (Semantic) ---")
-    
-    # initialize embeddings (requires openai api key in env)
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
-    
-    # initialize semantic chunker
-    # breakpoint_threshold_type="percentile" is a good default
-    text_splitter = SemanticChunker(
-        embeddings=embeddings,
-        breakpoint_threshold_type="percentile"
-    )
-    
+    print(f"--- Chunking Documents (Semantic, {engine}) ---")
+
+    if engine == "local":
+        # breakpoints only need topic shifts, which lexical vectors capture well
+        # breakpoint_threshold_type="percentile" is a good default
+        text_splitter = LocalSemanticChunker(
+            engine=HashedTfidfEngine(),
+            breakpoint_threshold_type="percentile",
+            min_chunk_size=min_chunk_size,
+            max_chunk_size=max_chunk_size,
+        )
+    elif engine == "openai":
+        if max_chunk_size is not None:
+            raise ValueError("max_chunk_size is only supported by the local chunking engine")
+
+        # initialize embeddings (requires openai api key in env)
+        # sentences we've embedded before are served from the local cache
+        embeddings = get_embeddings(dimensions=dimensions)
+
+        # initialize semantic chunker
+        # breakpoint_threshold_type="percentile" is a good default
+        text_splitter = SemanticChunker(
+            embeddings=embeddings,
+            breakpoint_threshold_type="percentile",
+            min_chunk_size=min_chunk_size,
+        )
+    else:
+        raise ValueError(f"Unknown chunking engine: {engine}")
+
     # split documents
     chunks = text_splitter.split_documents(docs)
-    
+
     print(f"--- Generated {len(chunks)} chunks from {len(docs)} documents ---")
     return chunks
@@ -0,0 +1,226 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+from langchain_openai import OpenAIEmbeddings
+from day_03_chunking.embedding_executor import BatchedEmbeddings, get_rate_limiter
+
+DEFAULT_MODEL = "text-embedding-3-small"
+DEFAULT_CACHE_PATH = "day_03_chunking/embeddings_cache.sqlite"
+
+# --- storage ---
+
+class EmbeddingCache:
+    """
+    A persistent embedding cache backed by a local SQLite file.
+
+    Vectors are stored as raw float32 blobs keyed by (model, sha256 of text),
+    so the same text embedded by the same model is only paid for once.
+    The least recently used entries are evicted once `max_entries` is exceeded.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = 500_000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used INTEGER NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            );
+            CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used);
+            """
+        )
+        # a logical clock is enough for lru ordering and never goes backwards
+        row = self._conn.execute("SELECT COUNT(*), COALESCE(MAX(last_used), 0) FROM embeddings").fetchone()
+        self._size, self._clock = row
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        """Returns the sha256 hex digest used as the cache key for a text."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Looks up cached vectors for a batch of texts.
+
+        Args:
+            model (str): The embedding model identifier.
+            texts (List[str]): The texts to look up.
+
+        Returns:
+            List[Optional[List[float]]]: One vector per text, or None on a miss.
+        """
+        hashes = [self.hash_text(t) for t in texts]
+        found: Dict[str, List[float]] = {}
+
+        with self._lock:
+            # sqlite limits the number of bound parameters, so query in slices
+            unique = list(dict.fromkeys(hashes))
+            for i in range(0, len(unique), 500):
+                batch = unique[i:i + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch],
+                ).fetchall()
+                for text_hash, blob in rows:
+                    found[text_hash] = array("f", blob).tolist()
+
+            # bump recency for everything we served
+            if found:
+                self._clock += 1
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(self._clock, model, h) for h in found],
+                )
+                self._conn.commit()
+
+            results = [found.get(h) for h in hashes]
+            hit_count = sum(1 for r in results if r is not None)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+
+        return results
+
+    def put_many(self, model: str, texts: List[str], vectors: List[List[float]]):
+        """Stores vectors for a batch of texts and evicts old entries if needed."""
+        with self._lock:
+            self._clock += 1
+            rows = [
+                (model, self.hash_text(t), array("f", v).tobytes(), self._clock)
+                for t, v in zip(texts, vectors)
+            ]
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._size += self._conn.total_changes - before
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drops the least recently used entries above `max_entries`."""
+        overflow = self._size - self.max_entries
+        if overflow <= 0:
+            return
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+            (overflow,),
+        )
+        self._size -= overflow
+
+    def stats(self) -> Dict[str, int]:
+        """Returns hit/miss counters and the number of cached vectors."""
+        return {"hits": self.hits, "misses": self.misses, "entries": self._size}
+
+# --- embeddings wrapper ---
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps any LangChain `Embeddings` and serves repeated texts from an `EmbeddingCache`.
+
+    Only cache misses are sent to the underlying model, so re-indexing an
+    unchanged corpus makes zero embedding calls.
+    """
+
+    def __init__(self, underlying: Embeddings, model: str, cache: EmbeddingCache):
+        self.underlying = underlying
+        self.model = model
+        self.cache = cache
+
+    def _merge(self, texts: List[str], vectors: List[Optional[List[float]]], missing: List[str], new_vectors: List[List[float]]):
+        self.cache.put_many(self.model, missing, new_vectors)
+        computed = dict(zip(missing, new_vectors))
+        return [v if v is not None else computed[t] for t, v in zip(texts, vectors)]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.cache.get_many(self.model, texts)
+
+        # embed each distinct missing text once
+        missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        if missing:
+            vectors = self._merge(texts, vectors, missing, self.underlying.embed_documents(missing))
+
+        return vectors
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.cache.get_many(self.model, texts)
+
+        missing = list(dict.fromkeys(t for t, v in zip(texts, vectors) if v is None))
+        if missing:
+            vectors = self._merge(texts, vectors, missing, await self.underlying.aembed_documents(missing))
+
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        cached = self.cache.get_many(self.model, [text])[0]
+        if cached is not None:
+            return cached
+        vector = self.underlying.embed_query(text)
+        self.cache.put_many(self.model, [text], [vector])
+        return vector
+
+# --- shared instances ---
+
+_cache_lock = threading.Lock()
+_default_cache: Optional[EmbeddingCache] = None
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Returns the process-wide embedding cache, opening it on first use."""
+    global _default_cache
+    with _cache_lock:
+        if _default_cache is None:
+            _default_cache = EmbeddingCache()
+        return _default_cache
+
+_embeddings_lock = threading.Lock()
+_shared_embeddings: Dict[Tuple[str, Optional[int]], CachedEmbeddings] = {}
+
+def get_embeddings(model: str = DEFAULT_MODEL, dimensions: Optional[int] = None) -> Embeddings:
+    """
+    Returns the process-wide OpenAI embeddings for (model, dimensions), backed by the shared persistent cache.
+
+    Cache misses go through a `BatchedEmbeddings` executor, so large
+    corpora are embedded in concurrent, rate-limited batches. The chunker,
+    every index and every retriever get the same instance, and every
+    dimension of a model shares the model's rate limiter.
+
+    Args:
+        model (str): The OpenAI embedding model name.
+        dimensions (Optional[int]): Ask the API for shorter vectors
+            (text-embedding-3-* only). Cached separately from full vectors;
+            use `TruncatedEmbeddings` instead to truncate full vectors locally.
+
+    Returns:
+        Embeddings: A cache-backed embeddings instance.
+    """
+    key = (model, dimensions)
+    with _embeddings_lock:
+        if key not in _shared_embeddings:
+            underlying = BatchedEmbeddings(
+                OpenAIEmbeddings(model=model, dimensions=dimensions), model=model, rate_limiter=get_rate_limiter(model)
+            )
+            _shared_embeddings[key] = CachedEmbeddings(
+                underlying=underlying,
+                model=model if dimensions is None else f"{model}@{dimensions}",
+                cache=get_embedding_cache(),
+            )
+        return _shared_embeddings[key]
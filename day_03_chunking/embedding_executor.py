@@ -0,0 +1,201 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Coroutine, Dict, List, Optional
+
+import tiktoken
+from langchain_core.embeddings import Embeddings
+
+# default openai budgets per model, shared by every caller in the process
+DEFAULT_REQUESTS_PER_MINUTE = 3_000
+DEFAULT_TOKENS_PER_MINUTE = 1_000_000
+
+# --- rate limiting ---
+
+class RateLimiter:
+    """
+    A sliding-window limiter for requests-per-minute and tokens-per-minute budgets.
+
+    State is guarded by a thread lock and waits use `asyncio.sleep`, so one
+    limiter can be shared by every event loop in the process.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, window_seconds: float = 60.0):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.window_seconds = window_seconds
+        self._window = deque()  # (timestamp, tokens)
+        self._tokens_in_window = 0
+        self._lock = threading.Lock()
+
+    async def acquire(self, tokens: int):
+        """Waits until a request of `tokens` tokens fits in both budgets."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._window and now - self._window[0][0] >= self.window_seconds:
+                    _, old = self._window.popleft()
+                    self._tokens_in_window -= old
+
+                fits_requests = len(self._window) < self.requests_per_minute
+                fits_tokens = self._tokens_in_window + tokens <= self.tokens_per_minute
+                # an oversized batch is let through on an empty window rather than blocking forever
+                if fits_requests and (fits_tokens or not self._window):
+                    self._window.append((now, tokens))
+                    self._tokens_in_window += tokens
+                    return
+
+                wait = self._window[0][0] + self.window_seconds - now
+            await asyncio.sleep(max(wait, 0.01))
+
+_limiters_lock = threading.Lock()
+_limiters: Dict[str, RateLimiter] = {}
+
+def get_rate_limiter(model: str) -> RateLimiter:
+    """
+    Returns the process-wide limiter for a model, created on first use.
+
+    The API enforces its budgets per model, so every executor embedding
+    with the same model (whatever its dimensions) draws on one limiter.
+    """
+    with _limiters_lock:
+        if model not in _limiters:
+            _limiters[model] = RateLimiter(DEFAULT_REQUESTS_PER_MINUTE, DEFAULT_TOKENS_PER_MINUTE)
+        return _limiters[model]
+
+# --- executor ---
+
+_loop_lock = threading.Lock()
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _background_loop() -> asyncio.AbstractEventLoop:
+    """Returns the process-wide event loop for sync callers, started on first use on a daemon thread."""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="embedding-loop", daemon=True).start()
+        return _loop
+
+def _run_sync(coro: Coroutine):
+    """
+    Runs a coroutine to completion from sync code, even inside a running loop.
+
+    Every sync call shares one long-lived loop: async clients (e.g. the
+    OpenAI one's connection pool) bind to the loop they first run on, so a
+    fresh `asyncio.run` per call would leave them on a closed loop.
+    """
+    loop = _background_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        coro.close()
+        raise RuntimeError("sync embedding called from the embedding loop itself; await the async method instead")
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+class BatchedEmbeddings(Embeddings):
+    """
+    Wraps any LangChain `Embeddings` with a batched, concurrent executor.
+
+    Texts are split into token-bounded batches (counted with tiktoken) and
+    several batches are embedded at once with asyncio, within configurable
+    requests-per-minute and tokens-per-minute budgets. Failed batches are
+    retried with exponential backoff and jitter.
+    """
+
+    def __init__(
+        self,
+        underlying: Embeddings,
+        model: str = "text-embedding-3-small",
+        max_tokens_per_batch: int = 100_000,
+        max_texts_per_batch: int = 512,
+        max_concurrency: int = 4,
+        requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = DEFAULT_TOKENS_PER_MINUTE,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        rate_limiter: Optional[RateLimiter] = None,
+    ):
+        self.underlying = underlying
+        self.model = model
+        self.max_tokens_per_batch = max_tokens_per_batch
+        self.max_texts_per_batch = max_texts_per_batch
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.rate_limiter = rate_limiter or RateLimiter(requests_per_minute, tokens_per_minute)
+        self._encoding = None
+
+    # --- batching ---
+
+    def _count_tokens(self, texts: List[str]) -> List[int]:
+        if self._encoding is None:
+            try:
+                self._encoding = tiktoken.encoding_for_model(self.model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+        return [len(tokens) for tokens in self._encoding.encode_ordinary_batch(texts)]
+
+    def make_batches(self, texts: List[str]) -> List[tuple]:
+        """
+        Splits texts into batches bounded by token count and batch size.
+
+        Args:
+            texts (List[str]): The texts to embed.
+
+        Returns:
+            List[tuple]: (start index, texts, token count) for each batch, in order.
+        """
+        batches = []
+        start, current, current_tokens = 0, [], 0
+        for i, (text, n_tokens) in enumerate(zip(texts, self._count_tokens(texts))):
+            too_many_tokens = current_tokens + n_tokens > self.max_tokens_per_batch
+            if current and (too_many_tokens or len(current) >= self.max_texts_per_batch):
+                batches.append((start, current, current_tokens))
+                start, current, current_tokens = i, [], 0
+            current.append(text)
+            current_tokens += n_tokens
+        if current:
+            batches.append((start, current, current_tokens))
+        return batches
+
+    # --- execution ---
+
+    async def _embed_batch(self, semaphore: asyncio.Semaphore, texts: List[str], n_tokens: int) -> List[List[float]]:
+        async with semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self.rate_limiter.acquire(n_tokens)
+                try:
+                    return await self.underlying.aembed_documents(texts)
+                except Exception as e:
+                    if attempt == self.max_retries:
+                        raise
+                    delay = self.base_delay * (2 ** attempt) * (1 + random.random())
+                    print(f"⚠️ Embedding batch failed ({e}); retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        batches = self.make_batches(texts)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = await asyncio.gather(
+            *(self._embed_batch(semaphore, batch, n_tokens) for _, batch, n_tokens in batches)
+        )
+        # batches are contiguous and ordered, so flattening restores input order
+        return [vector for batch_vectors in results for vector in batch_vectors]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return _run_sync(self.aembed_documents(texts))
+
+    async def aembed_query(self, text: str) -> List[float]:
+        await self.rate_limiter.acquire(self._count_tokens([text])[0])
+        return await self.underlying.aembed_query(text)
+
+    def embed_query(self, text: str) -> List[float]:
+        # through the shared loop, so queries count against the same budgets
+        return _run_sync(self.aembed_query(text))
@@ -0,0 +1,528 @@
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterable, List, Optional, Sequence, Set, Tuple
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+INDEX_TYPES = ("flat", "ivf", "hnsw")
+QUANTIZATIONS = (None, "sq8", "pq")
+
+# an ivf index wants ~39 training points per list before it is worth using
+IVF_POINTS_PER_LIST = 39
+
+# hnsw can't remove vectors in place; rebuild once this share are tombstones
+MAX_TOMBSTONE_RATIO = 0.2
+
+# vectors seen before codes are trained; smaller stores stay exact float32
+QUANTIZE_MIN_TRAIN = {"sq8": 1000, "pq": 256 * IVF_POINTS_PER_LIST}
+
+class _SearchLock:
+    """Lets searches run side by side while index writes run alone."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+
+    @contextmanager
+    def shared(self):
+        with self._cond:
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def exclusive(self):
+        with self._cond:
+            self._cond.wait_for(lambda: not self._readers)
+            yield
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+def _pq_subquantizers(dim: int) -> int:
+    """Largest divisor of `dim` up to dim / 16, i.e. 1 byte per 16 floats (64x smaller)."""
+    for m in range(max(1, dim // 16), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+class FaissStore(VectorStore):
+    """
+    An in-process FAISS vector index with a small SQLite docstore.
+
+    Vectors are L2-normalized and searched by inner product (cosine
+    similarity). String ids are mapped to int64 FAISS ids through the
+    docstore, so chunks can be upserted and deleted by id like in Chroma.
+
+    - "flat": exact search, the baseline for recall
+    - "ivf": inverted lists, trained on the data and retrained as it grows
+    - "hnsw": a graph index; deletions are tombstoned (filtered out inside
+      the search) and compacted on save
+
+    With `quantization` set, the index holds int8 ("sq8", 4x smaller) or
+    product-quantized ("pq", ~64x smaller) codes instead of float32. The
+    float vectors are kept on disk in the docstore, and the top
+    `k * rerank_factor` candidates are re-scored exactly against them.
+    Stores too small to train codes on stay float32 until they grow.
+
+    New vectors live in memory until `save()` writes the index atomically
+    and marks their docstore rows as saved; rows that never made it into a
+    saved index are dropped on reopen. Reopening memory-maps the index, so
+    startup cost doesn't grow with the corpus; the first write after that
+    reads it into memory.
+    """
+
+    def __init__(
+        self,
+        embedding: Embeddings,
+        persist_directory: str,
+        name: str = "faiss",
+        index_type: str = "flat",
+        nlist: int = 1024,
+        nprobe: int = 16,
+        hnsw_m: int = 32,
+        ef_construction: int = 128,
+        ef_search: int = 64,
+        quantization: Optional[str] = None,
+        rerank_factor: int = 4,
+    ):
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown FAISS index type: {index_type}")
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown FAISS quantization: {quantization}")
+        self.embedding = embedding
+        self.persist_directory = persist_directory
+        self.index_type = index_type
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.hnsw_m = hnsw_m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.quantization = quantization
+        self.rerank_factor = rerank_factor
+        os.makedirs(persist_directory, exist_ok=True)
+
+        self.index_path = os.path.join(persist_directory, f"{name}.faiss")
+        self._lock = threading.RLock()
+        # faiss searches run outside `_lock`; in-place index writes wait for them
+        self._search_lock = _SearchLock()
+        self.docstore_path = os.path.join(persist_directory, f"{name}.docstore.sqlite")
+        self._conn = sqlite3.connect(self.docstore_path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS docs (
+                faiss_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                id TEXT UNIQUE NOT NULL,
+                content TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                saved INTEGER NOT NULL DEFAULT 0,
+                vector BLOB
+            );
+            """
+        )
+        columns = {r[1] for r in self._conn.execute("PRAGMA table_info(docs)").fetchall()}
+        if "vector" not in columns:
+            self._conn.execute("ALTER TABLE docs ADD COLUMN vector BLOB")
+
+        self._index = None
+        self._mmapped = False
+        # faiss ids still in the index but gone from the docstore, and the cached filter over them
+        self._dead_ids: Set[int] = set()
+        self._filter = None
+        if os.path.exists(self.index_path):
+            self._index = faiss.read_index(self.index_path, self._mmap_flag())
+            self._mmapped = True
+            self._apply_search_params()
+
+        # rows written after the last save have no vector on disk
+        lost = self._conn.execute("DELETE FROM docs WHERE saved = 0").rowcount
+        self._conn.commit()
+        if lost:
+            print(f"--- FAISS store: dropped {lost} unsaved rows ---")
+        if isinstance(self._index, faiss.IndexIDMap2):
+            stored = faiss.vector_to_array(self._index.id_map)
+            self._dead_ids = set(np.setdiff1d(stored, self._live_faiss_ids()).tolist())
+
+    # --- index construction ---
+
+    def _new_index(self, dim: int, n_train: int):
+        ip = faiss.METRIC_INNER_PRODUCT
+        sq8 = faiss.ScalarQuantizer.QT_8bit
+        codes = self.quantization if self.quantization and n_train >= QUANTIZE_MIN_TRAIN[self.quantization] else None
+
+        if self.index_type == "flat":
+            if codes == "sq8":
+                return faiss.IndexIDMap2(faiss.IndexScalarQuantizer(dim, sq8, ip))
+            if codes == "pq":
+                return faiss.IndexIDMap2(faiss.IndexPQ(dim, _pq_subquantizers(dim), 8, ip))
+            return faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+
+        if self.index_type == "hnsw":
+            if codes == "sq8":
+                hnsw = faiss.IndexHNSWSQ(dim, sq8, self.hnsw_m, ip)
+            elif codes == "pq":
+                hnsw = faiss.IndexHNSWPQ(dim, _pq_subquantizers(dim), self.hnsw_m, 8, ip)
+            else:
+                hnsw = faiss.IndexHNSWFlat(dim, self.hnsw_m, ip)
+            hnsw.hnsw.efConstruction = self.ef_construction
+            return faiss.IndexIDMap2(hnsw)
+
+        # ivf keeps its own ids; a hashtable direct map allows reconstruct + remove
+        nlist = max(1, min(self.nlist, n_train // IVF_POINTS_PER_LIST))
+        if codes == "sq8":
+            ivf = faiss.IndexIVFScalarQuantizer(faiss.IndexFlatIP(dim), dim, nlist, sq8, ip)
+        elif codes == "pq":
+            ivf = faiss.IndexIVFPQ(faiss.IndexFlatIP(dim), dim, nlist, _pq_subquantizers(dim), 8, ip)
+        else:
+            ivf = faiss.IndexIVFFlat(faiss.IndexFlatIP(dim), dim, nlist, ip)
+        ivf.set_direct_map_type(faiss.DirectMap.Hashtable)
+        return ivf
+
+    def _inner(self):
+        return faiss.downcast_index(self._index.index if isinstance(self._index, faiss.IndexIDMap2) else self._index)
+
+    def _is_quantized(self) -> bool:
+        return not isinstance(self._inner(), (faiss.IndexFlat, faiss.IndexIVFFlat, faiss.IndexHNSWFlat))
+
+    def _mmap_flag(self) -> int:
+        # IO_FLAG_MMAP only maps ivf inverted lists; flat codes and the hnsw
+        # storage need IO_FLAG_MMAP_IFC, or they're read fully into RAM
+        return faiss.IO_FLAG_MMAP if self.index_type == "ivf" else faiss.IO_FLAG_MMAP_IFC
+
+    def _mapped_bytes(self) -> int:
+        """Bytes of the loaded index that live in the mapped file rather than in RAM."""
+        inner = self._inner()
+        if isinstance(inner, faiss.IndexIVF):
+            lists = inner.invlists
+            # each entry is its code plus its 64-bit id
+            return sum(lists.list_size(i) for i in range(lists.nlist)) * (lists.code_size + 8)
+        if isinstance(inner, faiss.IndexHNSW):
+            inner = faiss.downcast_index(inner.storage)
+        if isinstance(inner, faiss.IndexFlatCodes):
+            return inner.ntotal * inner.code_size
+        return 0
+
+    def _apply_search_params(self):
+        inner = self._inner()
+        if isinstance(inner, faiss.IndexIVF):
+            inner.nprobe = min(self.nprobe, inner.nlist)
+        elif isinstance(inner, faiss.IndexHNSW):
+            inner.hnsw.efSearch = self.ef_search
+
+    def _build(self, vectors: np.ndarray, faiss_ids: np.ndarray):
+        index = self._new_index(vectors.shape[1], len(vectors))
+        if not index.is_trained:
+            index.train(vectors)
+        if len(vectors):
+            index.add_with_ids(vectors, faiss_ids)
+        self._index = index
+        self._mmapped = False
+        self._dead_ids = set()
+        self._filter = None
+        self._apply_search_params()
+
+    def _ensure_writable(self):
+        # mmapped indexes are read-only
+        if self._mmapped:
+            self._index = faiss.read_index(self.index_path)
+            self._mmapped = False
+            self._apply_search_params()
+
+    def _live_faiss_ids(self) -> np.ndarray:
+        rows = self._conn.execute("SELECT faiss_id FROM docs ORDER BY faiss_id").fetchall()
+        return np.asarray([r[0] for r in rows], dtype=np.int64)
+
+    def _rebuild(self):
+        """Re-creates the index from its live vectors (drops tombstones, retrains codes)."""
+        dim = self._index.d
+        if self.quantization:
+            # train on the exact float vectors, never on lossy codes
+            rows = self._conn.execute("SELECT faiss_id, vector FROM docs ORDER BY faiss_id").fetchall()
+            faiss_ids = np.asarray([r[0] for r in rows], dtype=np.int64)
+            vectors = np.frombuffer(b"".join(r[1] for r in rows), dtype=np.float32).reshape(-1, dim)
+        else:
+            faiss_ids = self._live_faiss_ids()
+            vectors = self._index.reconstruct_batch(faiss_ids) if len(faiss_ids) else np.zeros((0, dim), dtype=np.float32)
+        self._build(np.ascontiguousarray(vectors, dtype=np.float32), faiss_ids)
+
+    def _needs_rebuild(self, live: int) -> bool:
+        if self._index is None or self._index.ntotal == 0:
+            return False
+        # hnsw tombstones, or vectors orphaned by deletes that were never saved
+        if self._index.ntotal - live > MAX_TOMBSTONE_RATIO * self._index.ntotal:
+            return True
+        # started out as float32 -> switch to codes once there's enough to train on
+        if self.quantization and not self._is_quantized() and live >= QUANTIZE_MIN_TRAIN[self.quantization]:
+            return True
+        if self.index_type == "ivf":
+            # trained on a small first batch -> retrain once there's data for 4x the lists
+            nlist = faiss.downcast_index(self._index).nlist
+            return nlist < self.nlist and live >= 4 * nlist * IVF_POINTS_PER_LIST
+        return False
+
+    # --- vectorstore api ---
+
+    @property
+    def embeddings(self) -> Embeddings:
+        return self.embedding
+
+    def _select_relevance_score_fn(self):
+        # scores are cosine similarities in [-1, 1]
+        return lambda score: (score + 1.0) / 2.0
+
+    def add_texts(
+        self,
+        texts: Iterable[str],
+        metadatas: Optional[List[dict]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> List[str]:
+        texts = list(texts)
+        vectors = self.embedding.embed_documents(texts)
+        return self.add_embeddings(texts, vectors, metadatas, ids)
+
+    def add_embeddings(
+        self,
+        texts: List[str],
+        vectors: Sequence[Sequence[float]],
+        metadatas: Optional[List[dict]] = None,
+        ids: Optional[List[str]] = None,
+    ) -> List[str]:
+        """
+        Adds pre-computed embeddings. Existing ids are replaced.
+
+        Args:
+            texts (List[str]): The chunk texts.
+            vectors (Sequence[Sequence[float]]): One embedding per text.
+            metadatas (Optional[List[dict]]): One metadata dict per text.
+            ids (Optional[List[str]]): One id per text (defaults to the row number).
+
+        Returns:
+            List[str]: The ids that were written.
+        """
+        if not texts:
+            return []
+        metadatas = metadatas or [{} for _ in texts]
+        vectors = _normalize(np.asarray(vectors, dtype=np.float32))
+
+        with self._lock:
+            if ids is None:
+                start = self._conn.execute("SELECT COALESCE(MAX(faiss_id), 0) FROM docs").fetchone()[0]
+                ids = [str(start + i + 1) for i in range(len(texts))]
+            self._delete(ids)
+
+            faiss_ids = []
+            for cid, text, metadata, vector in zip(ids, texts, metadatas, vectors):
+                cursor = self._conn.execute(
+                    "INSERT INTO docs (id, content, metadata, vector) VALUES (?, ?, ?, ?)",
+                    (cid, text, json.dumps(metadata, default=str), vector.tobytes() if self.quantization else None),
+                )
+                faiss_ids.append(cursor.lastrowid)
+            faiss_ids = np.asarray(faiss_ids, dtype=np.int64)
+
+            if self._index is None:
+                self._build(vectors, faiss_ids)
+            else:
+                self._ensure_writable()
+                with self._search_lock.exclusive():
+                    self._index.add_with_ids(vectors, faiss_ids)
+            self._conn.commit()
+        return list(ids)
+
+    def delete(self, ids: Optional[List[str]] = None, **kwargs: Any) -> Optional[bool]:
+        if not ids:
+            return None
+        with self._lock:
+            self._delete(ids)
+            self._conn.commit()
+        return True
+
+    def _delete(self, ids: List[str]):
+        faiss_ids = []
+        for i in range(0, len(ids), 500):
+            batch = ids[i:i + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(f"SELECT faiss_id FROM docs WHERE id IN ({placeholders})", batch).fetchall()
+            faiss_ids.extend(r[0] for r in rows)
+            self._conn.execute(f"DELETE FROM docs WHERE id IN ({placeholders})", batch)
+        if not faiss_ids or self._index is None:
+            return
+        if self.index_type == "hnsw":
+            # hnsw keeps the vectors as tombstones; searches filter them out
+            self._dead_ids.update(faiss_ids)
+            self._filter = None
+            return
+        self._ensure_writable()
+        selector = np.asarray(faiss_ids, dtype=np.int64)
+        with self._search_lock.exclusive():
+            self._index.remove_ids(faiss.IDSelectorArray(len(selector), faiss.swig_ptr(selector)))
+
+    def _search_filter(self):
+        """A selector that skips tombstoned ids inside faiss (None if there are none)."""
+        if not self._dead_ids:
+            return None
+        if self._filter is None:
+            dead = faiss.IDSelectorBatch(np.fromiter(self._dead_ids, dtype=np.int64, count=len(self._dead_ids)))
+            # the batch has to outlive every search using the selector
+            self._filter = (faiss.IDSelectorNot(dead), dead)
+        return self._filter
+
+    def _search_params(self, search_filter):
+        """
+        Fresh search parameters for one search.
+
+        IndexIDMap2 swaps `params.sel` for the duration of a search, so
+        concurrent searches can't share a params object; the selectors
+        themselves are only read and are shared.
+        """
+        if search_filter is None:
+            return None
+        selector = search_filter[0]
+        if isinstance(self._inner(), faiss.IndexHNSW):
+            # explicit params replace the index's own efSearch
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=self.ef_search)
+        return faiss.SearchParameters(sel=selector)
+
+    def similarity_search_with_score_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        """Returns the k nearest chunks with their cosine similarity."""
+        query = _normalize(np.asarray([embedding], dtype=np.float32))
+        with self._lock:
+            # the index and its tombstone filter as of now; the search itself runs unlocked
+            index = self._index
+            if index is None or index.ntotal == 0:
+                return []
+            search_filter = self._search_filter()
+            params = self._search_params(search_filter)
+            # quantized scores are approximate: fetch extra candidates to re-score exactly
+            rerank = self.rerank_factor > 0 and self._is_quantized()
+        candidates = k * self.rerank_factor if rerank else k
+
+        with self._search_lock.shared():
+            scores, faiss_ids = index.search(query, min(index.ntotal, candidates), params=params)
+        hits = [(int(i), float(s)) for i, s in zip(faiss_ids[0], scores[0]) if i != -1]
+
+        with self._lock:
+            by_id = {}
+            columns = "faiss_id, id, content, metadata" + (", vector" if rerank else "")
+            for i in range(0, len(hits), 500):
+                batch = [h[0] for h in hits[i:i + 500]]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(f"SELECT {columns} FROM docs WHERE faiss_id IN ({placeholders})", batch).fetchall()
+                by_id.update({r[0]: r[1:] for r in rows})
+
+        # rows deleted since the snapshot no longer resolve
+        hits = [(faiss_id, score) for faiss_id, score in hits if faiss_id in by_id]
+        if rerank and hits:
+            vectors = np.frombuffer(b"".join(by_id[i][3] for i, _ in hits), dtype=np.float32).reshape(len(hits), -1)
+            exact = vectors @ query[0]
+            hits = sorted(((i, float(s)) for (i, _), s in zip(hits, exact)), key=lambda h: h[1], reverse=True)
+
+        results = []
+        for faiss_id, score in hits[:k]:
+            cid, content, metadata = by_id[faiss_id][:3]
+            results.append((Document(id=cid, page_content=content, metadata=json.loads(metadata)), score))
+        return results
+
+    def similarity_search_by_vector(self, embedding: List[float], k: int = 4, **kwargs: Any) -> List[Document]:
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(embedding, k, **kwargs)]
+
+    def similarity_search_with_score(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        return self.similarity_search_with_score_by_vector(self.embedding.embed_query(query), k, **kwargs)
+
+    def _similarity_search_with_relevance_scores(self, query: str, k: int = 4, **kwargs: Any) -> List[Tuple[Document, float]]:
+        relevance = self._select_relevance_score_fn()
+        return [(doc, relevance(score)) for doc, score in self.similarity_search_with_score(query, k, **kwargs)]
+
+    def similarity_search(self, query: str, k: int = 4, **kwargs: Any) -> List[Document]:
+        return self.similarity_search_by_vector(self.embedding.embed_query(query), k, **kwargs)
+
+    def get_by_ids(self, ids: Sequence[str], /) -> List[Document]:
+        docs = []
+        with self._lock:
+            for i in range(0, len(ids), 500):
+                batch = list(ids[i:i + 500])
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(f"SELECT id, content, metadata FROM docs WHERE id IN ({placeholders})", batch).fetchall()
+                docs.extend(Document(id=cid, page_content=c, metadata=json.loads(m)) for cid, c, m in rows)
+        return docs
+
+    @classmethod
+    def from_texts(
+        cls,
+        texts: List[str],
+        embedding: Embeddings,
+        metadatas: Optional[List[dict]] = None,
+        *,
+        ids: Optional[List[str]] = None,
+        persist_directory: str = "faiss_index",
+        **kwargs: Any,
+    ) -> "FaissStore":
+        store = cls(embedding=embedding, persist_directory=persist_directory, **kwargs)
+        store.add_texts(texts, metadatas, ids=ids)
+        store.save()
+        return store
+
+    # --- persistence ---
+
+    def save(self):
+        """
+        Persists pending writes: compacts or retrains if due, writes the
+        index atomically, then marks the new rows as saved.
+        """
+        with self._lock:
+            if self._index is None:
+                return
+            live = self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+            if self._needs_rebuild(live):
+                self._ensure_writable()
+                self._rebuild()
+            if not self._mmapped:
+                tmp_path = f"{self.index_path}.tmp"
+                faiss.write_index(self._index, tmp_path)
+                os.replace(tmp_path, self.index_path)
+            self._conn.execute("UPDATE docs SET saved = 1 WHERE saved = 0")
+            self._conn.commit()
+
+    def ids(self) -> Set[str]:
+        """Returns every id in the store (including unsaved writes)."""
+        with self._lock:
+            return {r[0] for r in self._conn.execute("SELECT id FROM docs").fetchall()}
+
+    def delete_collection(self):
+        """Deletes the index and its docstore from disk (like `Chroma.delete_collection`)."""
+        with self._lock:
+            self._conn.close()
+            self._index = None
+            self._mmapped = False
+            for path in (self.index_path, self.docstore_path, f"{self.docstore_path}-wal", f"{self.docstore_path}-shm"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def memory_bytes(self) -> int:
+        """Approximate resident size of the index (its serialized size, less what is mmapped)."""
+        with self._lock:
+            if self._index is None:
+                return 0
+            if self._mmapped:
+                return max(os.path.getsize(self.index_path) - self._mapped_bytes(), 0)
+            return faiss.serialize_index(self._index).nbytes
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
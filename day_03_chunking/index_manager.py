@@ -0,0 +1,355 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_community.vectorstores import Chroma
+from day_03_chunking.bm25_index import BM25Index
+from day_03_chunking.embedding_cache import get_embeddings
+from day_03_chunking.faiss_store import FaissStore
+from day_03_chunking.matryoshka import TruncatedEmbeddings
+
+DEFAULT_PERSIST_DIRECTORY = "day_03_chunking/index"
+DEFAULT_COLLECTION_NAME = "day_03_hybrid"
+DENSE_BACKENDS = ("chroma", "faiss")
+
+# chroma rejects very large upserts, so writes are sent in slices
+WRITE_BATCH_SIZE = 1000
+
+# used to size chroma collections, whose memory we can't measure directly
+FULL_EMBEDDING_DIMENSIONS = 1536
+
+def chunk_ids(docs: List[Document], seen: Optional[Dict[str, int]] = None) -> List[str]:
+    """
+    Computes stable, content-addressed ids for a list of chunks.
+
+    The id is the sha256 of the chunk's source and text, so the same chunk
+    always maps to the same id. Repeated chunks within one source get an
+    occurrence suffix to keep ids unique.
+
+    Args:
+        docs (List[Document]): The chunks to identify.
+        seen (Optional[Dict[str, int]]): Occurrence counts carried over from
+            earlier batches of the same stream.
+
+    Returns:
+        List[str]: One id per chunk, in order.
+    """
+    ids = []
+    seen = {} if seen is None else seen
+    for doc in docs:
+        source = str(doc.metadata.get("source", ""))
+        digest = hashlib.sha256(f"{source}\x00{doc.page_content}".encode("utf-8")).hexdigest()
+        count = seen.get(digest, 0)
+        seen[digest] = count + 1
+        ids.append(digest if count == 0 else f"{digest}-{count}")
+    return ids
+
+def source_hash(ids: List[str]) -> str:
+    """Hashes a source's ordered chunk ids into its content hash."""
+    return hashlib.sha256("\n".join(ids).encode("utf-8")).hexdigest()
+
+class IndexManager:
+    """
+    A persistent, incremental index over a dense vector store and a BM25 index.
+
+    The dense leg is a Chroma collection by default, or an in-process FAISS
+    index (`dense_backend="faiss"`). Each source document is tracked by a
+    content hash in a small SQLite manifest next to the index files. Syncing
+    a corpus only embeds chunks that are new, deletes chunks whose source
+    changed or disappeared, and leaves everything else untouched. Reopening
+    an existing index does no embedding work at all.
+    """
+
+    def __init__(
+        self,
+        persist_directory: str = DEFAULT_PERSIST_DIRECTORY,
+        collection_name: str = DEFAULT_COLLECTION_NAME,
+        embeddings: Optional[Embeddings] = None,
+        dense_backend: str = "chroma",
+        faiss_index_type: str = "flat",
+        faiss_quantization: Optional[str] = None,
+        embedding_dimensions: Optional[int] = None,
+    ):
+        if dense_backend not in DENSE_BACKENDS:
+            raise ValueError(f"Unknown dense backend: {dense_backend}")
+        self.persist_directory = persist_directory
+        self.collection_name = collection_name
+        self.dense_backend = dense_backend
+        self.embedding_dimensions = embedding_dimensions
+        os.makedirs(persist_directory, exist_ok=True)
+
+        embeddings = embeddings or get_embeddings()
+        if embedding_dimensions:
+            # truncate locally: full vectors stay cached for re-ranking
+            embeddings = TruncatedEmbeddings(embeddings, embedding_dimensions)
+            collection_name = f"{collection_name}-{embedding_dimensions}d"
+
+        # each backend (and dimension) keeps its own manifest, so switching never mixes them up
+        prefix = collection_name
+        if dense_backend == "chroma":
+            self.vectorstore = Chroma(
+                collection_name=collection_name,
+                embedding_function=embeddings,
+                persist_directory=persist_directory,
+            )
+        else:
+            prefix = f"{collection_name}.faiss-{faiss_index_type}"
+            if faiss_quantization:
+                prefix = f"{prefix}-{faiss_quantization}"
+            self.vectorstore = FaissStore(
+                embedding=embeddings,
+                persist_directory=persist_directory,
+                name=prefix,
+                index_type=faiss_index_type,
+                quantization=faiss_quantization,
+            )
+
+        # the name the manifest and sidecar files are stored under
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.manifest_path = os.path.join(persist_directory, f"{prefix}.manifest.sqlite")
+        self._conn = sqlite3.connect(self.manifest_path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS sources (
+                source TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS chunks (
+                id TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                content TEXT NOT NULL,
+                metadata TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_chunks_source ON chunks (source);
+            """
+        )
+
+        # the sparse index follows the same chunk ids as the dense one
+        self.bm25 = BM25Index(os.path.join(persist_directory, f"{prefix}.bm25.sqlite"))
+        if len(self.bm25) == 0 and self.count() > 0:
+            docs = self.documents()
+            self.bm25.add_documents(docs, [d.id for d in docs])
+
+        if dense_backend == "faiss":
+            self._reconcile_dense()
+
+    # --- public api ---
+
+    def sync(self, docs: List[Document], prune: bool = True) -> Dict[str, int]:
+        """
+        Brings the index in line with the given chunks.
+
+        Args:
+            docs (List[Document]): The full set of chunks that should be indexed.
+            prune (bool): If True, sources that are not in `docs` are removed.
+
+        Returns:
+            Dict[str, int]: Counts of added, removed and unchanged chunks.
+        """
+        print("--- Syncing Index ---")
+        stats = {"added": 0, "removed": 0, "unchanged": 0}
+
+        # group chunks by the source document they came from
+        by_source: Dict[str, List[Document]] = {}
+        for doc in docs:
+            by_source.setdefault(str(doc.metadata.get("source", "")), []).append(doc)
+
+        with self._lock:
+            known = self._known_sources()
+
+            for source, source_docs in by_source.items():
+                ids = chunk_ids(source_docs)
+                content_hash = source_hash(ids)
+
+                # 1. unchanged source -> nothing to do
+                if known.get(source) == content_hash:
+                    stats["unchanged"] += len(ids)
+                    continue
+
+                # 2. changed or new source -> diff its chunks
+                existing = self._source_chunk_ids(source)
+                new_ids = set(ids)
+                to_add = [(i, d) for i, d in zip(ids, source_docs) if i not in existing]
+                to_remove = [i for i in existing if i not in new_ids]
+
+                self._remove_chunks(to_remove)
+                self._add_chunks(source, to_add)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sources (source, content_hash) VALUES (?, ?)",
+                    (source, content_hash),
+                )
+                self._conn.commit()
+
+                stats["added"] += len(to_add)
+                stats["removed"] += len(to_remove)
+                stats["unchanged"] += len(ids) - len(to_add)
+
+            # 3. sources that disappeared -> drop their chunks
+            if prune:
+                stats["removed"] += self._prune(set(by_source))
+            self._flush_dense()
+
+        print(f"--- Index synced: +{stats['added']} / -{stats['removed']} / ={stats['unchanged']} chunks ---")
+        return stats
+
+    def add_chunks(self, source: str, docs: List[Document], seen: Dict[str, int]) -> List[str]:
+        """
+        Adds one batch of a streamed source, skipping chunks already indexed.
+
+        Call `finish_source` with every id returned for the source once the
+        stream is done, so stale chunks are dropped and the hash is recorded.
+
+        Args:
+            source (str): The source the chunks belong to.
+            docs (List[Document]): The next batch of chunks.
+            seen (Dict[str, int]): Occurrence counts shared across the stream's batches.
+
+        Returns:
+            List[str]: The ids of the chunks in this batch.
+        """
+        with self._lock:
+            ids = chunk_ids(docs, seen)
+            existing = self._existing_ids(ids)
+            self._add_chunks(source, [(i, d) for i, d in zip(ids, docs) if i not in existing])
+            self._conn.commit()
+        return ids
+
+    def finish_source(self, source: str, ids: List[str]) -> int:
+        """Drops chunks of a streamed source that weren't seen and records its hash."""
+        with self._lock:
+            keep = set(ids)
+            stale = [i for i in self._source_chunk_ids(source) if i not in keep]
+            self._remove_chunks(stale)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sources (source, content_hash) VALUES (?, ?)",
+                (source, source_hash(ids)),
+            )
+            self._conn.commit()
+            self._flush_dense()
+        return len(stale)
+
+    def prune(self, keep_sources: set) -> int:
+        """Removes every source not in `keep_sources`. Returns the number of chunks removed."""
+        with self._lock:
+            removed = self._prune(keep_sources)
+            self._flush_dense()
+        return removed
+
+    def remove_source(self, source: str) -> int:
+        """Removes every chunk of a source. Returns the number of chunks removed."""
+        with self._lock:
+            stale = list(self._source_chunk_ids(source))
+            self._remove_chunks(stale)
+            self._conn.execute("DELETE FROM sources WHERE source = ?", (source,))
+            self._conn.commit()
+            self._flush_dense()
+        return len(stale)
+
+    def sources(self) -> Dict[str, str]:
+        """Returns every indexed source with its content hash."""
+        with self._lock:
+            return self._known_sources()
+
+    def documents(self) -> List[Document]:
+        """Returns all indexed chunks from the manifest, without touching Chroma."""
+        with self._lock:
+            rows = self._conn.execute("SELECT id, content, metadata FROM chunks ORDER BY rowid").fetchall()
+        return [Document(id=i, page_content=c, metadata=json.loads(m)) for i, c, m in rows]
+
+    def count(self) -> int:
+        """Returns the number of indexed chunks."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def destroy(self):
+        """Deletes the whole index from disk: the dense collection, the manifest and the BM25 file."""
+        with self._lock:
+            self.vectorstore.delete_collection()
+            self.bm25.drop()
+            self._conn.close()
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(self.manifest_path + suffix):
+                    os.remove(self.manifest_path + suffix)
+
+    def memory_estimate(self) -> int:
+        """Roughly how many bytes the dense and sparse indexes keep in memory."""
+        if self.dense_backend == "faiss":
+            dense = self.vectorstore.memory_bytes()
+        else:
+            # float32 vectors plus ~50% for chroma's hnsw graph
+            dims = self.embedding_dimensions or FULL_EMBEDDING_DIMENSIONS
+            dense = int(self.count() * dims * 4 * 1.5)
+        return dense + self.bm25.memory_bytes()
+
+    # --- internals ---
+
+    def _flush_dense(self):
+        # chroma persists every write itself; faiss writes its index on save
+        if self.dense_backend == "faiss":
+            self.vectorstore.save()
+
+    def _reconcile_dense(self):
+        """Re-adds chunks the faiss index lost (e.g. a crash before its last save)."""
+        stored = self.vectorstore.ids()
+        docs = self.documents()
+        missing = [(d.id, d) for d in docs if d.id not in stored]
+        extra = list(stored - {d.id for d in docs})
+        if not missing and not extra:
+            return
+        print(f"--- Reconciling FAISS index: +{len(missing)} / -{len(extra)} chunks ---")
+        for i in range(0, len(missing), WRITE_BATCH_SIZE):
+            batch = missing[i:i + WRITE_BATCH_SIZE]
+            self.vectorstore.add_documents([d for _, d in batch], ids=[cid for cid, _ in batch])
+        self.vectorstore.delete(ids=extra)
+        self.vectorstore.save()
+
+    def _known_sources(self) -> Dict[str, str]:
+        return dict(self._conn.execute("SELECT source, content_hash FROM sources").fetchall())
+
+    def _prune(self, keep_sources: set) -> int:
+        removed = 0
+        for source in self._known_sources():
+            if source not in keep_sources:
+                stale = list(self._source_chunk_ids(source))
+                self._remove_chunks(stale)
+                self._conn.execute("DELETE FROM sources WHERE source = ?", (source,))
+                self._conn.commit()
+                removed += len(stale)
+        return removed
+
+    def _existing_ids(self, ids: List[str]) -> set:
+        found = set()
+        for i in range(0, len(ids), 500):
+            batch = ids[i:i + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(f"SELECT id FROM chunks WHERE id IN ({placeholders})", batch).fetchall()
+            found.update(r[0] for r in rows)
+        return found
+
+    def _source_chunk_ids(self, source: str) -> set:
+        rows = self._conn.execute("SELECT id FROM chunks WHERE source = ?", (source,)).fetchall()
+        return {r[0] for r in rows}
+
+    def _add_chunks(self, source: str, items: List[tuple]):
+        for i in range(0, len(items), WRITE_BATCH_SIZE):
+            batch = items[i:i + WRITE_BATCH_SIZE]
+            self.vectorstore.add_documents([d for _, d in batch], ids=[cid for cid, _ in batch])
+            self.bm25.add_documents([d for _, d in batch], [cid for cid, _ in batch])
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chunks (id, source, content, metadata) VALUES (?, ?, ?, ?)",
+                [(cid, source, d.page_content, json.dumps(d.metadata, default=str)) for cid, d in batch],
+            )
+
+    def _remove_chunks(self, ids: List[str]):
+        for i in range(0, len(ids), WRITE_BATCH_SIZE):
+            batch = ids[i:i + WRITE_BATCH_SIZE]
+            self.vectorstore.delete(ids=batch)
+            self.bm25.delete(batch)
+            self._conn.executemany("DELETE FROM chunks WHERE id = ?", [(cid,) for cid in batch])
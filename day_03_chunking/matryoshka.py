@@ -0,0 +1,63 @@
+from typing import List, Sequence
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+def truncate_vectors(vectors: Sequence[Sequence[float]], dimensions: int) -> np.ndarray:
+    """
+    Keeps the first `dimensions` values of each vector and re-normalizes it.
+
+    `text-embedding-3-*` models are trained Matryoshka-style, so the leading
+    dimensions carry most of the meaning and a truncated, re-normalized
+    vector is a usable embedding on its own.
+    """
+    matrix = np.array(vectors, dtype=np.float32)[:, :dimensions]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+class TruncatedEmbeddings(Embeddings):
+    """
+    Wraps full-dimension embeddings and returns truncated, re-normalized vectors.
+
+    The underlying (cached) embeddings still see full vectors, so the cache
+    keeps them: a full-dimension re-rank or a switch to another dimension
+    never re-embeds anything.
+    """
+
+    def __init__(self, underlying: Embeddings, dimensions: int):
+        self.underlying = underlying
+        self.dimensions = dimensions
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return truncate_vectors(self.underlying.embed_documents(texts), self.dimensions).tolist()
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return truncate_vectors(await self.underlying.aembed_documents(texts), self.dimensions).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        return truncate_vectors([self.underlying.embed_query(text)], self.dimensions)[0].tolist()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return truncate_vectors([await self.underlying.aembed_query(text)], self.dimensions)[0].tolist()
+
+def rerank_by_vectors(query_vector: Sequence[float], docs: List[Document], doc_vectors: Sequence[Sequence[float]], k: int) -> List[Document]:
+    """
+    Re-orders candidates by cosine similarity against (full-dimension) vectors.
+
+    Args:
+        query_vector (Sequence[float]): The query embedding.
+        docs (List[Document]): The candidates from the reduced-dimension search.
+        doc_vectors (Sequence[Sequence[float]]): One embedding per candidate.
+        k (int): The number of documents to keep.
+
+    Returns:
+        List[Document]: The best k candidates, best first.
+    """
+    if not docs:
+        return []
+    matrix = np.asarray(doc_vectors, dtype=np.float32)
+    query = np.asarray(query_vector, dtype=np.float32)
+    scores = (matrix @ query) / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query) + 1e-12)
+    return [docs[i] for i in np.argsort(-scores, kind="stable")[:k]]
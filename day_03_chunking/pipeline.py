@@ -0,0 +1,167 @@
+import queue
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from langchain_core.documents import Document
+from day_02_reading.loaders import DocumentLoader
+from day_03_chunking.chunker import chunk_documents
+from day_03_chunking.index_manager import IndexManager
+
+# marks the end of a stage's output
+_DONE = object()
+# how often a blocked stage checks whether the pipeline was stopped
+_POLL_SECONDS = 0.1
+
+class _StageError:
+    """Carries an exception from a worker stage to the consumer."""
+    def __init__(self, error: BaseException):
+        self.error = error
+
+# called as on_progress(stage, stats) whenever a stage finishes a batch
+ProgressCallback = Callable[[str, Dict[str, int]], None]
+
+def _batched(docs: Iterable[Document], size: int) -> Iterator[List[Document]]:
+    batch = []
+    for doc in docs:
+        batch.append(doc)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _put(out_q: queue.Queue, item, stop: threading.Event) -> bool:
+    """Puts an item, waiting for room until the pipeline stops. Returns False if it stopped."""
+    while not stop.is_set():
+        try:
+            # put() blocks when the queue is full, which is our backpressure
+            out_q.put(item, timeout=_POLL_SECONDS)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _run_stage(produce: Callable[[], Iterator], out_q: queue.Queue, stop: threading.Event):
+    """Pushes everything `produce` yields into a bounded queue, then a sentinel; gives up once stopped."""
+    items = produce()
+    try:
+        for item in items:
+            if not _put(out_q, item, stop):
+                return
+    except BaseException as e:
+        _put(out_q, _StageError(e), stop)
+    else:
+        _put(out_q, _DONE, stop)
+    finally:
+        # runs the generators' cleanup (e.g. closing the open file) right away
+        items.close()
+
+def _drain(in_q: queue.Queue, stop: threading.Event) -> Iterator:
+    while not stop.is_set():
+        try:
+            item = in_q.get(timeout=_POLL_SECONDS)
+        except queue.Empty:
+            continue
+        if item is _DONE:
+            return
+        if isinstance(item, _StageError):
+            raise item.error
+        yield item
+
+def _discard(q: queue.Queue):
+    while True:
+        try:
+            q.get_nowait()
+        except queue.Empty:
+            return
+
+def run_ingestion_pipeline(
+    source: str,
+    index: IndexManager,
+    source_name: Optional[str] = None,
+    pages_per_batch: int = 8,
+    queue_size: int = 2,
+    prune: bool = False,
+    on_progress: Optional[ProgressCallback] = None,
+    documents: Optional[Iterable[Document]] = None,
+) -> Dict[str, int]:
+    """
+    Streams one source through load -> chunk -> index with bounded memory.
+
+    Loading and chunking run on their own threads and hand work over through
+    bounded queues, so at most a few page batches are in flight no matter
+    how large the document is. Indexing runs on the calling thread.
+
+    Args:
+        source (str): The file path or URL to ingest.
+        index (IndexManager): The persistent index to write into.
+        source_name (Optional[str]): Overrides the `source` metadata (e.g. for temp files).
+        pages_per_batch (int): How many pages are chunked together.
+        queue_size (int): Maximum batches buffered between stages.
+        prune (bool): If True, every other source is removed from the index afterwards.
+        on_progress (Optional[ProgressCallback]): Called with the stage name
+            ("loading", "chunking", "indexing", "finalizing") and a snapshot of
+            the counts; may be called from the worker threads.
+        documents (Optional[Iterable[Document]]): Pages that were already
+            loaded (e.g. by a bulk ingestion pool); skips loading `source`.
+
+    Returns:
+        Dict[str, int]: Counts of loaded and chunked pages, indexed chunks and removed stale chunks.
+    """
+    print(f"--- Ingestion Pipeline: {source} ---")
+    name = source_name or source
+    pages_q: queue.Queue = queue.Queue(maxsize=queue_size)
+    chunks_q: queue.Queue = queue.Queue(maxsize=queue_size)
+    stats = {"pages": 0, "pages_chunked": 0, "chunks": 0, "removed": 0}
+
+    def report(stage: str):
+        if on_progress:
+            on_progress(stage, dict(stats))
+
+    # 1. load: stream pages into batches
+    def load_pages():
+        pages = DocumentLoader.iter_load(source) if documents is None else documents
+        for batch in _batched(pages, pages_per_batch):
+            for doc in batch:
+                doc.metadata["source"] = name
+            stats["pages"] += len(batch)
+            report("loading")
+            yield batch
+
+    # 2. chunk: turn each page batch into chunks
+    def chunk_pages():
+        for batch in _drain(pages_q, stop):
+            chunks = chunk_documents(batch)
+            stats["pages_chunked"] += len(batch)
+            report("chunking")
+            yield chunks
+
+    # set when the pipeline ends, however it ends, so no stage is left blocked
+    stop = threading.Event()
+    loader = threading.Thread(target=_run_stage, args=(load_pages, pages_q, stop), daemon=True)
+    chunker = threading.Thread(target=_run_stage, args=(chunk_pages, chunks_q, stop), daemon=True)
+    loader.start()
+    chunker.start()
+
+    # 3. index: add chunks as they arrive
+    ids: List[str] = []
+    seen: Dict[str, int] = {}
+    try:
+        for chunks in _drain(chunks_q, stop):
+            ids.extend(index.add_chunks(name, chunks, seen))
+            stats["chunks"] += len(chunks)
+            report("indexing")
+    finally:
+        stop.set()
+        _discard(pages_q)
+        _discard(chunks_q)
+        loader.join()
+        chunker.join()
+
+    report("finalizing")
+    stats["removed"] = index.finish_source(name, ids)
+    if prune:
+        stats["removed"] += index.prune({name})
+
+    print(f"--- Ingested {stats['pages']} pages -> {stats['chunks']} chunks ---")
+    return stats
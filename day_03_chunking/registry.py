@@ -0,0 +1,202 @@
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+from langchain_core.retrievers import BaseRetriever
+from day_03_chunking.index_manager import IndexManager
+
+# indexes nobody is using are evicted (oldest first) once the total passes this
+DEFAULT_MEMORY_BUDGET = 2 * 1024 ** 3
+
+# returns the built retriever and the index it reads from
+RetrieverBuilder = Callable[[], Tuple[BaseRetriever, IndexManager]]
+
+def corpus_key(*contents: bytes) -> str:
+    """Hashes uploaded file contents into a registry key (order-independent)."""
+    digests = sorted(hashlib.sha256(c).hexdigest() for c in contents)
+    return hashlib.sha256("\n".join(digests).encode("utf-8")).hexdigest()
+
+class _Entry:
+    __slots__ = ("retriever", "index", "size", "refs")
+
+    def __init__(self, retriever: BaseRetriever, index: IndexManager, size: int):
+        self.retriever = retriever
+        self.index = index
+        self.size = size
+        self.refs = 0
+
+class RetrieverLease:
+    """
+    A reference to a shared retriever. Call `release()` when done with it.
+
+    The lease also releases itself when it is garbage collected, so a
+    Streamlit session that simply goes away doesn't pin its index forever.
+    """
+
+    def __init__(self, registry: "RetrieverRegistry", key: str, retriever: BaseRetriever):
+        self.key = key
+        self.retriever = retriever
+        self._registry = registry
+        # gc can run on a thread that holds the registry lock: only queue the release
+        self._finalizer = weakref.finalize(self, registry._defer_release, key)
+
+    def release(self):
+        # detach succeeds at most once, so double releases are harmless
+        if self._finalizer.detach() is not None:
+            self._registry.release(self.key)
+
+class RetrieverRegistry:
+    """
+    A process-wide registry of built retrievers, keyed by corpus content hash.
+
+    Sessions that load the same corpus share one index. Every `acquire`
+    takes a reference; entries with no references are kept for reuse and
+    evicted least-recently-used first once their estimated memory passes
+    `memory_budget`. The registry owns the indexes it builds: an evicted
+    entry's index is deleted from disk, and built again if its corpus
+    comes back. Concurrent acquires of a key that isn't built yet are
+    single-flighted: one caller builds, the rest wait for its result.
+
+    Leases collected by gc only queue their release; the queue is applied
+    by the next `acquire` or `release`. Evicted indexes are deleted outside
+    the lock, and acquires of their key wait until that has finished.
+    """
+
+    def __init__(self, memory_budget: int = DEFAULT_MEMORY_BUDGET):
+        self.memory_budget = memory_budget
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._building: Dict[str, Future] = {}
+        self._deferred: "deque[str]" = deque()
+        self._stats = {"hits": 0, "builds": 0, "waits": 0, "evictions": 0}
+
+    def acquire(self, key: str, build: RetrieverBuilder) -> RetrieverLease:
+        """
+        Returns a lease on the retriever for `key`, building it if needed.
+
+        Args:
+            key (str): The corpus content hash (see `corpus_key`).
+            build (RetrieverBuilder): Builds the retriever; only called by
+                the first of any concurrent callers.
+
+        Returns:
+            RetrieverLease: Holds a reference until released.
+        """
+        while True:
+            with self._lock:
+                evicted = self._apply_deferred()
+                entry = self._entries.get(key)
+                if entry is not None:
+                    entry.refs += 1
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    lease = RetrieverLease(self, key, entry.retriever)
+                else:
+                    lease = None
+                    pending = self._building.get(key)
+                    if pending is None:
+                        pending = self._building[key] = Future()
+                        owner = True
+                    else:
+                        owner = False
+                        self._stats["waits"] += 1
+            self._destroy(evicted)
+            if lease is not None:
+                return lease
+
+            if not owner:
+                # re-raises the builder's error; on success, loop to take a reference
+                pending.result()
+                continue
+
+            try:
+                retriever, index = build()
+                size = index.memory_estimate()
+            except BaseException as e:
+                with self._lock:
+                    del self._building[key]
+                pending.set_exception(e)
+                raise
+
+            with self._lock:
+                entry = self._entries[key] = _Entry(retriever, index, size)
+                entry.refs += 1
+                del self._building[key]
+                self._stats["builds"] += 1
+                lease = RetrieverLease(self, key, retriever)
+                evicted = self._evict()
+            pending.set_result(None)
+            self._destroy(evicted)
+            return lease
+
+    def release(self, key: str):
+        """Drops one reference; unreferenced entries become evictable."""
+        self._deferred.append(key)
+        with self._lock:
+            evicted = self._apply_deferred()
+        self._destroy(evicted)
+
+    def _defer_release(self, key: str):
+        # deque appends are atomic, so this never touches the lock
+        self._deferred.append(key)
+
+    def _apply_deferred(self) -> List[Tuple[str, _Entry, Future]]:
+        released = False
+        while self._deferred:
+            entry = self._entries.get(self._deferred.popleft())
+            if entry is not None and entry.refs > 0:
+                entry.refs -= 1
+                released = released or entry.refs == 0
+        return self._evict() if released else []
+
+    def _evict(self) -> List[Tuple[str, _Entry, Future]]:
+        """Unlinks unreferenced entries over budget; the caller destroys them outside the lock."""
+        evicted = []
+        total = sum(e.size for e in self._entries.values())
+        for key in list(self._entries):
+            if total <= self.memory_budget:
+                break
+            entry = self._entries[key]
+            if entry.refs == 0:
+                del self._entries[key]
+                total -= entry.size
+                self._stats["evictions"] += 1
+                # acquires of this corpus wait until its files are gone
+                pending = self._building[key] = Future()
+                evicted.append((key, entry, pending))
+        return evicted
+
+    def _destroy(self, evicted: List[Tuple[str, _Entry, Future]]):
+        for key, entry, pending in evicted:
+            try:
+                entry.index.destroy()
+            finally:
+                with self._lock:
+                    del self._building[key]
+                pending.set_result(None)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns entry / reference / memory totals and hit, build, wait and eviction counts."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "refs": sum(e.refs for e in self._entries.values()),
+                "bytes": sum(e.size for e in self._entries.values()),
+                **self._stats,
+            }
+
+# --- shared instance ---
+
+_registry_lock = threading.Lock()
+_default_registry: Optional[RetrieverRegistry] = None
+
+def get_retriever_registry() -> RetrieverRegistry:
+    """Returns the process-wide retriever registry, creating it on first use."""
+    global _default_registry
+    with _registry_lock:
+        if _default_registry is None:
+            _default_registry = RetrieverRegistry()
+        return _default_registry
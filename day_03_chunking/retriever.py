@@ -1,43 +1,267 @@
-from typing import List
+import asyncio
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from pydantic import Field, PrivateAttr
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 from langchain_core.retrievers import BaseRetriever
-from langchain.retrievers import EnsembleRetriever
-from langchain_community.retrievers import BM25Retriever
-from langchain_community.vectorstores import Chroma
-from langchain_openai import OpenAIEmbeddings
+from langchain_core.vectorstores import VectorStore
+from day_03_chunking.bm25_index import BM25IndexRetriever
+from day_03_chunking.index_manager import IndexManager, DEFAULT_PERSIST_DIRECTORY, DEFAULT_COLLECTION_NAME
+from day_03_chunking.matryoshka import TruncatedEmbeddings, rerank_by_vectors
 
-def create_hybrid_retriever(docs: List[Document]) -> BaseRetriever:
+# shared by every hybrid retriever so concurrent sessions don't each spawn threads
+_LEG_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hybrid-leg")
+
+# leg timings of the latest hybrid retrieval in the current thread / task
+_last_timings: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar("hybrid_timings", default=None)
+
+def last_retrieval_timings() -> Optional[Dict[str, float]]:
     """
-    Creates a Hybrid Retriever (BM25 + Vector Search).
-    
+    Returns the leg timings of the latest `HybridRetriever` call made in the
+    current thread or asyncio task (None if there wasn't one).
+
+    Unlike `HybridRetriever.last_timings`, this isn't overwritten by other
+    sessions querying the same shared retriever.
+    """
+    return _last_timings.get()
+
+def reciprocal_rank_fusion(results: List[List[Document]], weights: List[float], c: int = 60) -> List[Document]:
+    """
+    Fuses ranked lists with weighted reciprocal-rank fusion.
+
+    Each document scores sum(weight / (c + rank)) over the lists it appears in.
+    Documents are matched by content, like EnsembleRetriever: not every
+    vector store returns ids (langchain's Chroma drops them).
+
     Args:
-        docs (List[Document]): The list of chunked documents to index.
-        
+        results (List[List[Document]]): One ranked list per retriever.
+        weights (List[float]): One weight per list.
+        c (int): The RRF damping constant.
+
     Returns:
-        BaseRetriever: The ensemble retriever.
+        List[Document]: The fused ranking, best first.
+    """
+    scores: Dict[str, float] = {}
+    docs: Dict[str, Document] = {}
+    for ranked, weight in zip(results, weights):
+        for rank, doc in enumerate(ranked, start=1):
+            key = doc.page_content
+            scores[key] = scores.get(key, 0.0) + weight / (c + rank)
+            docs.setdefault(key, doc)
+    return [docs[key] for key in sorted(scores, key=scores.get, reverse=True)]
+
+class HybridRetriever(BaseRetriever):
+    """
+    Runs the sparse and dense legs concurrently and fuses them with RRF.
+
+    Query embeddings are kept in a small in-process LRU. The duration of each
+    leg is available per call from `last_retrieval_timings()`; `last_timings`
+    holds whichever call finished last, which is only best-effort on a
+    retriever shared across sessions.
+
+    With `rerank_embeddings` set (e.g. full-dimension embeddings over a
+    reduced-dimension index), the dense leg fetches `k * rerank_factor`
+    candidates and re-orders them by those embeddings.
+    """
+    sparse_retriever: BaseRetriever
+    vectorstore: VectorStore
+    embeddings: Embeddings
+    rerank_embeddings: Optional[Embeddings] = None
+    rerank_factor: int = 4
+    k: int = 5
+    weights: List[float] = Field(default_factory=lambda: [0.5, 0.5])
+    rrf_c: int = 60
+    query_cache_size: int = 1024
+    last_timings: Dict[str, float] = Field(default_factory=dict)
+
+    _query_cache: OrderedDict = PrivateAttr(default_factory=OrderedDict)
+    _cache_lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    # --- query embedding cache ---
+
+    def _cached_query_vector(self, query: str):
+        with self._cache_lock:
+            vector = self._query_cache.get(query)
+            if vector is not None:
+                self._query_cache.move_to_end(query)
+            return vector
+
+    def _remember_query_vector(self, query: str, vector: List[float]):
+        with self._cache_lock:
+            self._query_cache[query] = vector
+            if len(self._query_cache) > self.query_cache_size:
+                self._query_cache.popitem(last=False)
+
+    # --- legs ---
+
+    def _sparse_leg(self, query: str, run_manager: CallbackManagerForRetrieverRun) -> Tuple[List[Document], float]:
+        start = time.perf_counter()
+        docs = self.sparse_retriever.invoke(query, config={"callbacks": run_manager.get_child("sparse")})
+        return docs, time.perf_counter() - start
+
+    def _dense_k(self) -> int:
+        return self.k * self.rerank_factor if self.rerank_embeddings is not None else self.k
+
+    def _dense_leg(self, query: str) -> Tuple[List[Document], float, float, float]:
+        start = time.perf_counter()
+        vector = self._cached_query_vector(query)
+        if vector is None:
+            vector = self.embeddings.embed_query(query)
+            self._remember_query_vector(query, vector)
+        embedded = time.perf_counter()
+        docs = self.vectorstore.similarity_search_by_vector(vector, k=self._dense_k())
+        searched = time.perf_counter()
+        if self.rerank_embeddings is not None and docs:
+            # full vectors come from the embedding cache, not the api
+            docs = rerank_by_vectors(
+                self.rerank_embeddings.embed_query(query),
+                docs,
+                self.rerank_embeddings.embed_documents([d.page_content for d in docs]),
+                self.k,
+            )
+        return docs, embedded - start, searched - embedded, time.perf_counter() - searched
+
+    async def _asparse_leg(self, query: str, run_manager: AsyncCallbackManagerForRetrieverRun) -> Tuple[List[Document], float]:
+        start = time.perf_counter()
+        docs = await self.sparse_retriever.ainvoke(query, config={"callbacks": run_manager.get_child("sparse")})
+        return docs, time.perf_counter() - start
+
+    async def _adense_leg(self, query: str) -> Tuple[List[Document], float, float, float]:
+        start = time.perf_counter()
+        vector = self._cached_query_vector(query)
+        if vector is None:
+            vector = await self.embeddings.aembed_query(query)
+            self._remember_query_vector(query, vector)
+        embedded = time.perf_counter()
+        docs = await self.vectorstore.asimilarity_search_by_vector(vector, k=self._dense_k())
+        searched = time.perf_counter()
+        if self.rerank_embeddings is not None and docs:
+            docs = rerank_by_vectors(
+                await self.rerank_embeddings.aembed_query(query),
+                docs,
+                await self.rerank_embeddings.aembed_documents([d.page_content for d in docs]),
+                self.k,
+            )
+        return docs, embedded - start, searched - embedded, time.perf_counter() - searched
+
+    # --- fusion ---
+
+    def _fuse(self, sparse, dense, total: float) -> List[Document]:
+        sparse_docs, sparse_time = sparse
+        dense_docs, embed_time, search_time, rerank_time = dense
+        timings = {
+            "sparse": sparse_time,
+            "dense_embed": embed_time,
+            "dense_search": search_time,
+            "dense_rerank": rerank_time,
+            "dense": embed_time + search_time + rerank_time,
+            "total": total,
+        }
+        _last_timings.set(timings)
+        self.last_timings = timings
+        fused = reciprocal_rank_fusion([sparse_docs, dense_docs], self.weights, self.rrf_c)
+        return fused[:self.k]
+
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        start = time.perf_counter()
+        dense_future = _LEG_POOL.submit(self._dense_leg, query)
+        # the sparse leg runs on this thread while the dense leg is in flight
+        sparse = self._sparse_leg(query, run_manager)
+        dense = dense_future.result()
+        return self._fuse(sparse, dense, time.perf_counter() - start)
+
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        start = time.perf_counter()
+        sparse, dense = await asyncio.gather(
+            self._asparse_leg(query, run_manager),
+            self._adense_leg(query),
+        )
+        return self._fuse(sparse, dense, time.perf_counter() - start)
+
+def build_hybrid_retriever(index: IndexManager, k: int = 5, full_dimension_rerank: bool = False) -> HybridRetriever:
+    """
+    Builds a Hybrid Retriever over an already-synced `IndexManager`.
+
+    Args:
+        index (IndexManager): The persistent sparse + dense indexes.
+        k (int): The number of chunks to return.
+        full_dimension_rerank (bool): For a reduced-dimension index, re-order
+            dense candidates by their full-dimension (cached) embeddings.
+
+    Returns:
+        HybridRetriever: The hybrid retriever.
     """
-    print("--- Creating Hybrid Retriever ---")
-    
     # 1. bm25 retriever (sparse / keyword)
     # good for exact matches and specific terms
-    bm25_retriever = BM25Retriever.from_documents(docs)
-    bm25_retriever.k = 5
-    
-    # 2. vector retriever (dense / semantic)
+    bm25_retriever = BM25IndexRetriever(index=index.bm25, k=k)
+
+    # 2. vector store (dense / semantic)
     # good for conceptual matching
-    embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
-    vectorstore = Chroma.from_documents(
-        documents=docs,
-        embedding=embeddings,
-        collection_name="day_03_hybrid"
-    )
-    vector_retriever = vectorstore.as_retriever(search_kwargs={"k": 5})
-    
-    # 3. ensemble retriever
-    # combines both with equal weight (0.5 / 0.5)
-    ensemble_retriever = EnsembleRetriever(
-        retrievers=[bm25_retriever, vector_retriever],
+    vectorstore = index.vectorstore
+    rerank_embeddings = None
+    if full_dimension_rerank and isinstance(vectorstore.embeddings, TruncatedEmbeddings):
+        rerank_embeddings = vectorstore.embeddings.underlying
+
+    # 3. hybrid retriever
+    # runs both legs at once and combines them with equal weight (0.5 / 0.5)
+    return HybridRetriever(
+        sparse_retriever=bm25_retriever,
+        vectorstore=vectorstore,
+        embeddings=vectorstore.embeddings,
+        rerank_embeddings=rerank_embeddings,
+        k=k,
         weights=[0.5, 0.5]
     )
-    
-    return ensemble_retriever
+
+def create_hybrid_retriever(
+    docs: List[Document],
+    persist_directory: str = DEFAULT_PERSIST_DIRECTORY,
+    collection_name: str = DEFAULT_COLLECTION_NAME,
+    dense_backend: str = "chroma",
+    faiss_index_type: str = "flat",
+    faiss_quantization: Optional[str] = None,
+    embedding_dimensions: Optional[int] = None,
+    full_dimension_rerank: bool = False,
+) -> BaseRetriever:
+    """
+    Creates a Hybrid Retriever (BM25 + Vector Search).
+
+    Both indexes are persisted to `persist_directory` and synced
+    incrementally, so only new or changed chunks are embedded or tokenized.
+    At query time both legs run concurrently and are fused with RRF.
+
+    Args:
+        docs (List[Document]): The list of chunked documents to index.
+        persist_directory (str): Where the vector index and its manifest live.
+        collection_name (str): The collection to sync into.
+        dense_backend (str): "chroma" or "faiss" (an in-process, memory-mapped index).
+        faiss_index_type (str): "flat", "ivf" or "hnsw" when using the faiss backend.
+        faiss_quantization (Optional[str]): "sq8" or "pq" to keep compressed codes in
+            memory and re-rank candidates against float vectors on disk.
+        embedding_dimensions (Optional[int]): Index truncated, re-normalized
+            embeddings of this size instead of the full vectors.
+        full_dimension_rerank (bool): Re-order dense candidates by the full vectors.
+
+    Returns:
+        BaseRetriever: The hybrid retriever.
+    """
+    print("--- Creating Hybrid Retriever ---")
+
+    # sync the persistent indexes (only new or changed chunks do any work)
+    index = IndexManager(
+        persist_directory=persist_directory,
+        collection_name=collection_name,
+        dense_backend=dense_backend,
+        faiss_index_type=faiss_index_type,
+        faiss_quantization=faiss_quantization,
+        embedding_dimensions=embedding_dimensions,
+    )
+    index.sync(docs)
+
+    return build_hybrid_retriever(index, full_dimension_rerank=full_dimension_rerank)
@@ -0,0 +1,94 @@
+import argparse
+import json
+import statistics
+import time
+from typing import Callable, Dict, List
+
+import httpx
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_openai import ChatOpenAI
+from day_04_explanation.llm import DEFAULT_CHAT_MODEL
+from day_05_quizzes.generator import QUIZ_TEMPLATE
+from day_05_quizzes.models import Quiz
+
+CANNED_QUIZ = {
+    "topic": "photosynthesis",
+    "questions": [
+        {
+            "question": f"Question {i}?",
+            "options": ["A", "B", "C", "D"],
+            "correct_answer": "A",
+            "explanation": "Because.",
+        }
+        for i in range(3)
+    ],
+}
+
+def make_offline_client() -> httpx.Client:
+    """An httpx client that answers every chat completion with a canned quiz, so no network is involved."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={
+            "id": "chatcmpl-bench",
+            "object": "chat.completion",
+            "created": 0,
+            "model": DEFAULT_CHAT_MODEL,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": json.dumps(CANNED_QUIZ)},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        })
+
+    return httpx.Client(transport=httpx.MockTransport(handler))
+
+def build_chain(client: httpx.Client):
+    # what each generator used to do on every call
+    llm = ChatOpenAI(model=DEFAULT_CHAT_MODEL, temperature=0, api_key="sk-bench", http_client=client)
+    return ChatPromptTemplate.from_template(QUIZ_TEMPLATE) | llm.with_structured_output(Quiz)
+
+def time_calls(call: Callable[[], object], n: int) -> List[float]:
+    timings = []
+    for _ in range(n):
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    ordered = sorted(timings)
+    return {
+        "mean_ms": 1000 * statistics.mean(ordered),
+        "p50_ms": 1000 * ordered[len(ordered) // 2],
+        "p95_ms": 1000 * ordered[int(len(ordered) * 0.95) - 1],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the per-call overhead of building LLM chains versus reusing them.")
+    parser.add_argument("--calls", type=int, default=200)
+    args = parser.parse_args()
+
+    client = make_offline_client()
+    inputs = {"context": "Plants turn light into chemical energy.", "topic": "photosynthesis"}
+
+    # warm up imports and pydantic schema caches before timing
+    build_chain(client).invoke(inputs)
+
+    shared = build_chain(client)
+    results = {
+        "build only": summarize(time_calls(lambda: build_chain(client), args.calls)),
+        "build per call": summarize(time_calls(lambda: build_chain(client).invoke(inputs), args.calls)),
+        "shared chain": summarize(time_calls(lambda: shared.invoke(inputs), args.calls)),
+    }
+
+    print(f"\n⏱️  Chain overhead: {args.calls} offline quiz calls (canned response, no network)\n")
+    print(f"{'':<16}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, r in results.items():
+        print(f"{name:<16}{r['mean_ms']:>10.2f}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}")
+
+    saved = results["build per call"]["mean_ms"] - results["shared chain"]["mean_ms"]
+    print(f"\n✅ Reusing the chain saves {saved:.2f} ms per call.")
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,54 @@
 from typing import List
 from langchain_core.documents import Document
 from langchain_core.retrievers import BaseRetriever
-from langchain_openai import ChatOpenAI
+from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable
+from day_04_explanation.llm import DEFAULT_CHAT_MODEL, combine_context, get_chain, get_chat_model
+from day_04_explanation.response_cache import Generation, arun_generation, run_generation
 
-def generate_explanation(question: str, retriever: BaseRetriever) -> str:
+# this prompt is optimized for simple, clear explanations
+EXPLANATION_TEMPLATE = """You are a helpful teacher explaining complex topics in simple terms.
+
+Context:
+{context}
+
+Question: {question}
+
+Instructions:
+- Use the context above to answer the question
+- Explain it as if you're talking to someone learning this for the first time
+- Use simple language and avoid jargon when possible
+- If you use technical terms, explain them briefly
+- Be concise but complete
+
+Answer:"""
+
+# everything besides the question and context that shapes the explanation
+EXPLANATION_CACHE_PARAMS = {"model": DEFAULT_CHAT_MODEL, "temperature": 0, "template": EXPLANATION_TEMPLATE}
+
+def _build_explanation_chain() -> Runnable:
+    prompt = ChatPromptTemplate.from_template(EXPLANATION_TEMPLATE)
+    return prompt | get_chat_model(temperature=0) | StrOutputParser()
+
+def _prepare_explanation(question: str, docs: List[Document]) -> Generation:
+    # 2. combine context
+    chunks, context = combine_context(docs)
+    
+    # 3-5. prompt | llm, built once and shared across calls
+    chain = get_chain("explanation", _build_explanation_chain)
+    inputs = {"context": context, "question": question}
+    return Generation("explanation", question, chunks, EXPLANATION_CACHE_PARAMS, chain, inputs)
+
+def generate_explanation(question: str, retriever: BaseRetriever, use_cache: bool = True) -> str:
     """
     Generates a clear, simple explanation for a given question using RAG.
     
     Args:
         question (str): The user's question.
         retriever (BaseRetriever): The retriever to use for finding relevant context.
+        use_cache (bool): Serve repeated (or near-identical) questions over the
+            same context from the response cache.
         
     Returns:
         str: The generated explanation.
@@ -22,37 +60,19 @@ def generate_explanation(question: str, retriever: BaseRetriever) -> str:
     docs = retriever.invoke(question)
     print(f"✅ Retrieved {len(docs)} chunks.")
     
-    # 2. combine context
-    context = "\n\n".join([doc.page_content for doc in docs])
-    
-    # 3. create prompt
-    # this prompt is optimized for simple, clear explanations
-    template = """You are a helpful teacher explaining complex topics in simple terms.
-
-Context:
-{context}
-
-Question: {question}
-
-Instructions:
-- Use the context above to answer the question
-- Explain it as if you're talking to someone learning this for the first time
-- Use simple language and avoid jargon when possible
-- If you use technical terms, explain them briefly
-- Be concise but complete
+    # 6. generate explanation
+    print("--- Generating explanation ---")
+    return run_generation(_prepare_explanation(question, docs), use_cache=use_cache)
 
-Answer:"""
-    
-    prompt = ChatPromptTemplate.from_template(template)
-    
-    # 4. initialize llm
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
+async def agenerate_explanation(question: str, retriever: BaseRetriever, use_cache: bool = True) -> str:
+    """Async `generate_explanation`: retrieval and generation are awaited."""
+    print(f"\n❓ Question: {question}")
     
-    # 5. create chain
-    chain = prompt | llm
+    # 1. retrieve relevant chunks
+    print("--- Retrieving relevant context ---")
+    docs = await retriever.ainvoke(question)
+    print(f"✅ Retrieved {len(docs)} chunks.")
     
     # 6. generate explanation
     print("--- Generating explanation ---")
-    response = chain.invoke({"context": context, "question": question})
-    
-    return response.content
+    return await arun_generation(_prepare_explanation(question, docs), use_cache=use_cache)
@@ -0,0 +1,90 @@
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+from langchain_core.documents import Document
+from langchain_core.runnables import Runnable
+from langchain_openai import ChatOpenAI
+
+DEFAULT_CHAT_MODEL = "gpt-4o-mini"
+
+# enough keep-alive connections for a study pack's concurrent generations
+MAX_CONNECTIONS = 32
+REQUEST_TIMEOUT = 120.0
+
+_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+_models: Dict[Tuple, ChatOpenAI] = {}
+_chains: Dict[str, Runnable] = {}
+
+def get_http_client() -> httpx.Client:
+    """Returns the process-wide pooled HTTP client used by every chat model."""
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            _http_client = httpx.Client(
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+                timeout=httpx.Timeout(REQUEST_TIMEOUT),
+            )
+        return _http_client
+
+def get_chat_model(model: str = DEFAULT_CHAT_MODEL, temperature: float = 0.0, **kwargs: Any) -> ChatOpenAI:
+    """
+    Returns a shared `ChatOpenAI` for the given settings, creating it once.
+
+    All models share one pooled HTTP client, so calls from any thread
+    reuse warm keep-alive connections instead of opening new ones.
+
+    Args:
+        model (str): The OpenAI chat model name.
+        temperature (float): The sampling temperature.
+        **kwargs: Any other `ChatOpenAI` settings (part of the cache key).
+
+    Returns:
+        ChatOpenAI: The shared chat model.
+    """
+    key = (model, temperature, tuple(sorted(kwargs.items())))
+    with _lock:
+        llm = _models.get(key)
+    if llm is None:
+        llm = ChatOpenAI(model=model, temperature=temperature, http_client=get_http_client(), **kwargs)
+        with _lock:
+            llm = _models.setdefault(key, llm)
+    return llm
+
+def get_chain(name: str, build: Callable[[], Runnable]) -> Runnable:
+    """
+    Returns the named chain, building it on first use.
+
+    Prompt templates and `with_structured_output` schemas are derived once;
+    the resulting runnable is stateless and safe to share across threads.
+
+    Args:
+        name (str): A unique name for the chain.
+        build (Callable[[], Runnable]): Builds the chain (called at most once
+            per name, barring a first-use race, where one result wins).
+
+    Returns:
+        Runnable: The shared chain.
+    """
+    with _lock:
+        chain = _chains.get(name)
+    if chain is None:
+        chain = build()
+        with _lock:
+            chain = _chains.setdefault(name, chain)
+    return chain
+
+def combine_context(docs: Optional[List[Document]]) -> Tuple[List[str], str]:
+    """
+    Joins retrieved documents into the prompt context.
+
+    Returns:
+        Tuple[List[str], str]: The chunk texts (for the response cache
+        fingerprint) and the joined context ("" when nothing was retrieved).
+    """
+    if docs is None:
+        print("--- No retriever provided. Using LLM knowledge. ---")
+        return [], ""
+    chunks = [doc.page_content for doc in docs]
+    return chunks, "\n\n".join(chunks)
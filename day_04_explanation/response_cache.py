@@ -0,0 +1,434 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Type, TypeVar, Union
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from langchain_core.runnables import Runnable
+from pydantic import BaseModel
+from day_03_chunking.embedding_cache import get_embeddings
+
+DEFAULT_CACHE_PATH = "day_04_explanation/response_cache.sqlite"
+DEFAULT_TTL = 7 * 24 * 3600
+# cosine similarity above which two normalized prompts count as the same request
+DEFAULT_SIMILARITY_THRESHOLD = 0.93
+
+T = TypeVar("T", bound=BaseModel)
+
+def normalize_prompt(prompt: str) -> str:
+    """Lowercases, collapses whitespace and drops trailing punctuation."""
+    return re.sub(r"\s+", " ", prompt).strip().lower().rstrip("?!. ")
+
+def context_fingerprint(chunks: Iterable[str]) -> str:
+    """
+    Hashes retrieved chunks into an order-independent fingerprint.
+
+    Similar questions often retrieve the same chunks in a different order,
+    so the chunks are deduplicated and sorted before hashing.
+    """
+    digest = hashlib.sha256()
+    for chunk in sorted(set(chunks)):
+        digest.update(hashlib.sha256(chunk.encode("utf-8")).digest())
+    return digest.hexdigest()
+
+# the fingerprint of no retrieved context at all
+EMPTY_CONTEXT = context_fingerprint(())
+
+_ROMAN = re.compile(r"m{0,3}(?:cm|cd|d?c{0,3})(?:xc|xl|l?x{0,3})(?:ix|iv|v?i{0,3})")
+# words after which a roman numeral is a number ("chapter iv", "world war i")
+_NUMERAL_MARKERS = frozenset({"chapter", "part", "section", "volume", "book", "act", "unit", "lesson", "war"})
+# roman numerals unlikely to be ordinary words on their own ("i", "mix" or "cd" are)
+_STANDALONE_ROMAN = frozenset({
+    "ii", "iii", "iv", "v", "vi", "vii", "viii", "ix", "x",
+    "xi", "xii", "xiii", "xiv", "xv", "xvi", "xvii", "xviii", "xix", "xx",
+})
+
+def key_terms(prompt: str) -> frozenset:
+    """
+    Returns the numerals in a normalized prompt.
+
+    They are a single token of the prompt but decide what it asks about
+    ("world war i" / "world war ii", "chapter 3" / "chapter 4"), so two
+    prompts are only matched by similarity when these agree. Arabic
+    numbers always count; a roman numeral counts after a marker such as
+    "chapter" or "part", or on its own if it is ii to xx.
+    """
+    words = re.findall(r"\w+", prompt)
+    return frozenset(
+        word
+        for previous, word in zip([""] + words, words)
+        if word.isdigit() or word in _STANDALONE_ROMAN or (previous in _NUMERAL_MARKERS and _ROMAN.fullmatch(word))
+    )
+
+class ResponseCache:
+    """
+    A persistent cache of generator responses backed by a local SQLite file.
+
+    Entries are scoped by (generator, model parameters, retrieved-context
+    fingerprint); within a scope, a request hits either on its exact
+    normalized prompt or, when `embeddings` is set, on the most similar
+    cached prompt above `similarity_threshold` whose numerals match (see
+    `key_terms`), so near-miss topics such as "World War I" / "World War
+    II" never serve each other. Without retrieved context every prompt of
+    a generator shares one scope, so those requests only ever hit
+    exactly. Entries older than `ttl`
+    seconds are ignored and purged; the least recently used are evicted
+    once `max_entries` is exceeded. Generators named in `disabled` always
+    bypass the cache.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        embeddings: Optional[Embeddings] = None,
+        max_entries: int = 10_000,
+        ttl: float = DEFAULT_TTL,
+        similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+        disabled: Iterable[str] = (),
+    ):
+        self.path = path
+        self.embeddings = embeddings
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.disabled = set(disabled)
+        self._stats = {"exact_hits": 0, "semantic_hits": 0, "misses": 0, "bypassed": 0}
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                scope TEXT NOT NULL,
+                prompt TEXT NOT NULL,
+                vector BLOB,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_responses_scope ON responses (scope);
+            CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used);
+            """
+        )
+        row = self._conn.execute("SELECT COUNT(*), COALESCE(MAX(last_used), 0) FROM responses").fetchone()
+        self._size, self._clock = row
+
+    @staticmethod
+    def scope(generator: str, context: str, params: Dict[str, Any]) -> str:
+        """Returns the key of the partition a request's prompt is matched within."""
+        payload = json.dumps([generator, context, params], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get_or_compute(
+        self,
+        generator: str,
+        prompt: str,
+        context: str,
+        params: Dict[str, Any],
+        compute: Callable[[], str],
+    ) -> str:
+        """
+        Returns the cached response for a request, or computes and stores it.
+
+        Args:
+            generator (str): The generator name (e.g. "quiz"); part of the scope.
+            prompt (str): The user-supplied part of the prompt (topic, question).
+            context (str): The retrieved-context fingerprint (see `context_fingerprint`).
+            params (Dict[str, Any]): Everything else that changes the output:
+                model, temperature, template, exact-match inputs.
+            compute (Callable[[], str]): Produces the response on a miss.
+
+        Returns:
+            str: The cached or freshly computed response.
+        """
+        if self._bypass(generator):
+            return compute()
+
+        scope, normalized, key = self._keys(generator, prompt, context, params)
+        cached = self._get_exact(key)
+        if cached is not None:
+            return cached
+
+        vector = None
+        if self._semantic(context):
+            vector = self.embeddings.embed_query(normalized)
+            cached = self._get_similar(scope, normalized, vector)
+            if cached is not None:
+                return cached
+
+        self._count("misses")
+        # generate outside the lock so concurrent misses don't serialize
+        response = compute()
+        self._put(key, scope, normalized, vector, response)
+        return response
+
+    async def aget_or_compute(
+        self,
+        generator: str,
+        prompt: str,
+        context: str,
+        params: Dict[str, Any],
+        compute: Callable[[], Awaitable[str]],
+    ) -> str:
+        """Async `get_or_compute`: the prompt embedding and the generation are awaited."""
+        if self._bypass(generator):
+            return await compute()
+
+        # the sqlite lookups are local and sub-millisecond, so they run inline
+        scope, normalized, key = self._keys(generator, prompt, context, params)
+        cached = self._get_exact(key)
+        if cached is not None:
+            return cached
+
+        vector = None
+        if self._semantic(context):
+            vector = await self.embeddings.aembed_query(normalized)
+            cached = self._get_similar(scope, normalized, vector)
+            if cached is not None:
+                return cached
+
+        self._count("misses")
+        response = await compute()
+        self._put(key, scope, normalized, vector, response)
+        return response
+
+    def _keys(self, generator: str, prompt: str, context: str, params: Dict[str, Any]) -> Tuple[str, str, str]:
+        scope = self.scope(generator, context, params)
+        normalized = normalize_prompt(prompt)
+        return scope, normalized, hashlib.sha256(f"{scope}\n{normalized}".encode("utf-8")).hexdigest()
+
+    def _semantic(self, context: str) -> bool:
+        # prompts are only matched by similarity within a retrieved context
+        return self.embeddings is not None and context not in ("", EMPTY_CONTEXT)
+
+    def _count(self, stat: str):
+        with self._lock:
+            self._stats[stat] += 1
+
+    def _bypass(self, generator: str) -> bool:
+        if generator not in self.disabled:
+            return False
+        self._count("bypassed")
+        return True
+
+    def _expiry(self) -> float:
+        return time.time() - self.ttl
+
+    def _touch(self, key: str):
+        self._clock += 1
+        self._conn.execute("UPDATE responses SET last_used = ? WHERE key = ?", (self._clock, key))
+        self._conn.commit()
+
+    def _get_exact(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ? AND created_at > ?", (key, self._expiry())
+            ).fetchone()
+            if row is None:
+                return None
+            self._touch(key)
+            self._stats["exact_hits"] += 1
+            return row[0]
+
+    def _get_similar(self, scope: str, prompt: str, vector: List[float]) -> Optional[str]:
+        terms = key_terms(prompt)
+        with self._lock:
+            rows = [
+                (key, blob, response)
+                for key, cached_prompt, blob, response in self._conn.execute(
+                    "SELECT key, prompt, vector, response FROM responses "
+                    "WHERE scope = ? AND vector IS NOT NULL AND created_at > ?",
+                    (scope, self._expiry()),
+                )
+                if key_terms(cached_prompt) == terms
+            ]
+            if not rows:
+                return None
+
+            query = np.asarray(vector, dtype=np.float32)
+            matrix = np.stack([np.frombuffer(blob, dtype=np.float32) for _, blob, _ in rows])
+            scores = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query) + 1e-12)
+            best = int(np.argmax(scores))
+            if scores[best] < self.similarity_threshold:
+                return None
+
+            self._touch(rows[best][0])
+            self._stats["semantic_hits"] += 1
+            return rows[best][2]
+
+    def _put(self, key: str, scope: str, prompt: str, vector: Optional[List[float]], response: str):
+        blob = array("f", vector).tobytes() if vector is not None else None
+        with self._lock:
+            self._clock += 1
+            before = self._conn.total_changes
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._size -= self._conn.total_changes - before
+            self._conn.execute(
+                "INSERT INTO responses (key, scope, prompt, vector, response, created_at, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, scope, prompt, blob, response, time.time(), self._clock),
+            )
+            self._size += 1
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Purges expired entries, then the least recently used above `max_entries`."""
+        before = self._conn.total_changes
+        self._conn.execute("DELETE FROM responses WHERE created_at <= ?", (self._expiry(),))
+        self._size -= self._conn.total_changes - before
+
+        overflow = self._size - self.max_entries
+        if overflow <= 0:
+            return
+        self._conn.execute(
+            "DELETE FROM responses WHERE rowid IN (SELECT rowid FROM responses ORDER BY last_used LIMIT ?)",
+            (overflow,),
+        )
+        self._size -= overflow
+
+    def clear(self):
+        """Drops every cached response."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+            self._size = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Returns hit/miss counters and the number of cached responses."""
+        with self._lock:
+            return {**self._stats, "entries": self._size}
+
+# --- generator helper ---
+
+def cached_generate(
+    generator: str,
+    prompt: str,
+    chunks: Iterable[str],
+    params: Dict[str, Any],
+    compute: Callable[[], Union[str, T]],
+    schema: Optional[Type[T]] = None,
+    use_cache: bool = True,
+) -> Union[str, T]:
+    """
+    Runs a generation through the shared response cache.
+
+    Structured responses are stored as JSON and validated back into
+    `schema` on a hit; plain responses are stored as-is.
+
+    Args:
+        generator (str): The generator name.
+        prompt (str): The user-supplied part of the prompt.
+        chunks (Iterable[str]): The retrieved context chunks.
+        params (Dict[str, Any]): Model parameters and exact-match inputs.
+        compute (Callable[[], Union[str, T]]): Runs the chain on a miss.
+        schema (Optional[Type[T]]): The structured-output model, if any.
+        use_cache (bool): False bypasses the cache for this call.
+
+    Returns:
+        Union[str, T]: The response.
+    """
+    if not use_cache:
+        return compute()
+
+    if schema is None:
+        return get_response_cache().get_or_compute(generator, prompt, context_fingerprint(chunks), params, compute)
+
+    computed: List[T] = []
+
+    def compute_json() -> str:
+        computed.append(compute())
+        return computed[0].model_dump_json()
+
+    response = get_response_cache().get_or_compute(
+        generator, prompt, context_fingerprint(chunks), _with_schema(params, schema), compute_json
+    )
+    return computed[0] if computed else schema.model_validate_json(response)
+
+async def acached_generate(
+    generator: str,
+    prompt: str,
+    chunks: Iterable[str],
+    params: Dict[str, Any],
+    compute: Callable[[], Awaitable[Union[str, T]]],
+    schema: Optional[Type[T]] = None,
+    use_cache: bool = True,
+) -> Union[str, T]:
+    """Async `cached_generate`: `compute` returns an awaitable."""
+    if not use_cache:
+        return await compute()
+
+    if schema is None:
+        return await get_response_cache().aget_or_compute(generator, prompt, context_fingerprint(chunks), params, compute)
+
+    computed: List[T] = []
+
+    async def compute_json() -> str:
+        computed.append(await compute())
+        return computed[0].model_dump_json()
+
+    response = await get_response_cache().aget_or_compute(
+        generator, prompt, context_fingerprint(chunks), _with_schema(params, schema), compute_json
+    )
+    return computed[0] if computed else schema.model_validate_json(response)
+
+class Generation(NamedTuple):
+    """A prepared generator call: the chain and its inputs, plus its response cache key parts."""
+    generator: str
+    prompt: str
+    chunks: List[str]
+    params: Dict[str, Any]
+    chain: Runnable
+    inputs: Dict[str, Any]
+    schema: Optional[Type[BaseModel]] = None
+
+def run_generation(generation: Generation, use_cache: bool = True) -> Union[str, BaseModel]:
+    """Invokes a prepared generation through the response cache."""
+    return cached_generate(
+        generation.generator, generation.prompt, generation.chunks, generation.params,
+        lambda: generation.chain.invoke(generation.inputs),
+        schema=generation.schema, use_cache=use_cache,
+    )
+
+async def arun_generation(generation: Generation, use_cache: bool = True) -> Union[str, BaseModel]:
+    """Async `run_generation`: the chain is awaited."""
+    return await acached_generate(
+        generation.generator, generation.prompt, generation.chunks, generation.params,
+        lambda: generation.chain.ainvoke(generation.inputs),
+        schema=generation.schema, use_cache=use_cache,
+    )
+
+@lru_cache(maxsize=None)
+def _json_schema(schema: Type[BaseModel]) -> Dict[str, Any]:
+    # building a json schema walks the whole model; it never changes at runtime
+    return schema.model_json_schema()
+
+def _with_schema(params: Dict[str, Any], schema: Type[BaseModel]) -> Dict[str, Any]:
+    # a schema change must not serve responses shaped for the old one
+    return {**params, "schema": _json_schema(schema)}
+
+# --- shared instance ---
+
+_cache_lock = threading.Lock()
+_default_cache: Optional[ResponseCache] = None
+
+def get_response_cache() -> ResponseCache:
+    """Returns the process-wide response cache, opening it on first use."""
+    global _default_cache
+    with _cache_lock:
+        if _default_cache is None:
+            # prompt embeddings go through the persistent embedding cache too
+            _default_cache = ResponseCache(embeddings=get_embeddings())
+        return _default_cache
@@ -1,27 +1,13 @@
+from typing import List, Optional
+from langchain_core.documents import Document
 from langchain_core.retrievers import BaseRetriever
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable
 from day_05_quizzes.models import Quiz
+from day_04_explanation.llm import DEFAULT_CHAT_MODEL, combine_context, get_chain, get_chat_model
+from day_04_explanation.response_cache import Generation, arun_generation, run_generation
 
-def generate_quiz(topic: str, retriever: BaseRetriever = None) -> Quiz:
-    """
-    Generates a quiz for a given topic using RAG (optional) and structured output.
-    """
-    print(f"\n📝 Generating quiz for topic: {topic}")
-    
-    context = ""
-    if retriever:
-        # 1. retrieve relevant chunks
-        print("--- Retrieving relevant context ---")
-        docs = retriever.invoke(topic)
-        print(f"✅ Retrieved {len(docs)} chunks.")
-        # 2. combine context
-        context = "\n\n".join([doc.page_content for doc in docs])
-    else:
-        print("--- No retriever provided. Using LLM knowledge. ---")
-    
-    # 3. create prompt
-    template = """You are an expert teacher creating a quiz to test student understanding.
+QUIZ_TEMPLATE = """You are an expert teacher creating a quiz to test student understanding.
 
 Context:
 {context}
@@ -35,18 +21,59 @@ Instructions:
 - Provide a clear explanation for the correct answer.
 - The output must be a valid JSON object matching the Quiz schema.
 """
+
+# everything besides the topic and context that shapes the quiz
+QUIZ_CACHE_PARAMS = {"model": DEFAULT_CHAT_MODEL, "temperature": 0, "template": QUIZ_TEMPLATE}
+
+def _build_quiz_chain() -> Runnable:
+    # the json schema for structured output is derived here, once
+    prompt = ChatPromptTemplate.from_template(QUIZ_TEMPLATE)
+    structured_llm = get_chat_model(temperature=0).with_structured_output(Quiz)
+    return prompt | structured_llm
+
+def _prepare_quiz(topic: str, docs: Optional[List[Document]]) -> Generation:
+    # 2. combine context
+    chunks, context = combine_context(docs)
     
-    prompt = ChatPromptTemplate.from_template(template)
-    
-    # 4. initialize llm with structured output
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    structured_llm = llm.with_structured_output(Quiz)
+    # 3-5. prompt | structured llm, built once and shared across calls
+    chain = get_chain("quiz", _build_quiz_chain)
+    inputs = {"context": context, "topic": topic}
+    return Generation("quiz", topic, chunks, QUIZ_CACHE_PARAMS, chain, inputs, Quiz)
+
+def generate_quiz(
+    topic: str, retriever: BaseRetriever = None, use_cache: bool = True, docs: Optional[List[Document]] = None
+) -> Quiz:
+    """
+    Generates a quiz for a given topic using RAG (optional) and structured output.
+    Repeated (or near-identical) topics over the same context are served from
+    the response cache unless `use_cache` is False.
+    `docs` is context that was already retrieved (e.g. for a study pack); it
+    skips the retriever.
+    """
+    print(f"\n📝 Generating quiz for topic: {topic}")
     
-    # 5. create chain
-    chain = prompt | structured_llm
+    if docs is None and retriever:
+        # 1. retrieve relevant chunks
+        print("--- Retrieving relevant context ---")
+        docs = retriever.invoke(topic)
+        print(f"✅ Retrieved {len(docs)} chunks.")
     
     # 6. generate quiz
     print("--- Generating quiz (Structured Output) ---")
-    quiz = chain.invoke({"context": context, "topic": topic})
+    return run_generation(_prepare_quiz(topic, docs), use_cache=use_cache)
+
+async def agenerate_quiz(
+    topic: str, retriever: BaseRetriever = None, use_cache: bool = True, docs: Optional[List[Document]] = None
+) -> Quiz:
+    """Async `generate_quiz`: retrieval and generation are awaited."""
+    print(f"\n📝 Generating quiz for topic: {topic}")
     
-    return quiz
+    if docs is None and retriever:
+        # 1. retrieve relevant chunks
+        print("--- Retrieving relevant context ---")
+        docs = await retriever.ainvoke(topic)
+        print(f"✅ Retrieved {len(docs)} chunks.")
+    
+    # 6. generate quiz
+    print("--- Generating quiz (Structured Output) ---")
+    return await arun_generation(_prepare_quiz(topic, docs), use_cache=use_cache)
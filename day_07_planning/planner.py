@@ -1,27 +1,13 @@
+from typing import List, Optional
+from langchain_core.documents import Document
 from langchain_core.retrievers import BaseRetriever
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable
 from day_07_planning.models import StudyPlan
+from day_04_explanation.llm import DEFAULT_CHAT_MODEL, combine_context, get_chain, get_chat_model
+from day_04_explanation.response_cache import Generation, arun_generation, run_generation
 
-def generate_study_plan(topic: str, duration: str, retriever: BaseRetriever = None) -> StudyPlan:
-    """
-    Generates a study plan for a given topic and duration using RAG (optional) and structured output.
-    """
-    print(f"\n📅 Generating study plan for topic: {topic} ({duration})")
-    
-    context = ""
-    if retriever:
-        # 1. retrieve relevant chunks
-        print("--- Retrieving relevant context ---")
-        docs = retriever.invoke(topic)
-        print(f"✅ Retrieved {len(docs)} chunks.")
-        # 2. combine context
-        context = "\n\n".join([doc.page_content for doc in docs])
-    else:
-        print("--- No retriever provided. Using LLM knowledge. ---")
-    
-    # 3. create prompt
-    template = """You are an expert study planner helping a student master a topic.
+STUDY_PLAN_TEMPLATE = """You are an expert study planner helping a student master a topic.
 
 Context:
 {context}
@@ -36,18 +22,69 @@ Instructions:
 - Ensure the plan is realistic and actionable.
 - The output must be a valid JSON object matching the StudyPlan schema.
 """
+
+# everything besides the topic and context that shapes the plan (the duration is added per call)
+STUDY_PLAN_CACHE_PARAMS = {"model": DEFAULT_CHAT_MODEL, "temperature": 0, "template": STUDY_PLAN_TEMPLATE}
+
+def _build_study_plan_chain() -> Runnable:
+    # the json schema for structured output is derived here, once
+    prompt = ChatPromptTemplate.from_template(STUDY_PLAN_TEMPLATE)
+    structured_llm = get_chat_model(temperature=0).with_structured_output(StudyPlan)
+    return prompt | structured_llm
+
+def _prepare_study_plan(topic: str, duration: str, docs: Optional[List[Document]]) -> Generation:
+    # 2. combine context
+    chunks, context = combine_context(docs)
     
-    prompt = ChatPromptTemplate.from_template(template)
-    
-    # 4. initialize llm with structured output
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    structured_llm = llm.with_structured_output(StudyPlan)
+    # 3-5. prompt | structured llm, built once and shared across calls
+    chain = get_chain("study_plan", _build_study_plan_chain)
+    # the duration must match exactly: "2 hours" and "3 hours" embed almost alike
+    params = {**STUDY_PLAN_CACHE_PARAMS, "duration": duration}
+    inputs = {"context": context, "topic": topic, "duration": duration}
+    return Generation("study_plan", topic, chunks, params, chain, inputs, StudyPlan)
+
+def generate_study_plan(
+    topic: str,
+    duration: str,
+    retriever: BaseRetriever = None,
+    use_cache: bool = True,
+    docs: Optional[List[Document]] = None,
+) -> StudyPlan:
+    """
+    Generates a study plan for a given topic and duration using RAG (optional) and structured output.
+    Repeated (or near-identical) topics with the same duration and context are
+    served from the response cache unless `use_cache` is False.
+    `docs` is context that was already retrieved (e.g. for a study pack); it
+    skips the retriever.
+    """
+    print(f"\n📅 Generating study plan for topic: {topic} ({duration})")
     
-    # 5. create chain
-    chain = prompt | structured_llm
+    if docs is None and retriever:
+        # 1. retrieve relevant chunks
+        print("--- Retrieving relevant context ---")
+        docs = retriever.invoke(topic)
+        print(f"✅ Retrieved {len(docs)} chunks.")
     
     # 6. generate plan
     print("--- Generating study plan (Structured Output) ---")
-    plan = chain.invoke({"context": context, "topic": topic, "duration": duration})
+    return run_generation(_prepare_study_plan(topic, duration, docs), use_cache=use_cache)
+
+async def agenerate_study_plan(
+    topic: str,
+    duration: str,
+    retriever: BaseRetriever = None,
+    use_cache: bool = True,
+    docs: Optional[List[Document]] = None,
+) -> StudyPlan:
+    """Async `generate_study_plan`: retrieval and generation are awaited."""
+    print(f"\n📅 Generating study plan for topic: {topic} ({duration})")
     
-    return plan
+    if docs is None and retriever:
+        # 1. retrieve relevant chunks
+        print("--- Retrieving relevant context ---")
+        docs = await retriever.ainvoke(topic)
+        print(f"✅ Retrieved {len(docs)} chunks.")
+    
+    # 6. generate plan
+    print("--- Generating study plan (Structured Output) ---")
+    return await arun_generation(_prepare_study_plan(topic, duration, docs), use_cache=use_cache)
@@ -1,75 +1,86 @@
-from typing import Literal
+from typing import Dict, List, Literal, Optional
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.sqlite import SqliteSaver
-import sqlite3
 
+from langchain_core.runnables import RunnableConfig
 from .state import AgentState, InputState, OutputState
-from .semantic import SemanticMemory
+from .checkpoint_store import DEFAULT_CHECKPOINT_PATH, PooledSqliteSaver, get_checkpoint_retention
+from .shards import get_memory_shards
 
-# Initialize Semantic Memory
-semantic_memory = SemanticMemory()
+# Semantic Memory is sharded per user: each run reads and writes the memory
+# of its `configurable.user_id`, loaded on first use
+memory_shards = get_memory_shards()
 
 # --- nodes ---
 
-def planner_node(state: AgentState):
+def _detect_intent(question: str) -> str:
+    # simple keyword heuristic
+    if "save" in question or "remember" in question or "my name is" in question:
+        return "save_memory"
+    return "chat"
+
+def _planned(intent: str, memories: List[str]):
+    print(f"--- Planner: Intent -> {intent} | Memories: {len(memories)} ---")
+    return {"intent": intent, "memories": memories, "steps": ["Planned"]}
+
+def planner_node(state: AgentState, config: RunnableConfig):
     """
-    Determines intent and retrieves relevant memories.
+    Determines intent and retrieves the user's relevant memories.
     """
     question = state["question"].lower()
     
-    # 1. Retrieve relevant facts from semantic memory
-    # In a real app, we'd use the question to search.
-    # Here we just get all facts to inject into context.
-    memories = semantic_memory.get_relevant_facts(question)
-    
-    # 2. Determine intent (simple keyword heuristic)
-    intent = "chat"
-    if "save" in question or "remember" in question or "my name is" in question:
-        intent = "save_memory"
+    # 1. Retrieve the facts most relevant to the question (top-k, thresholded
+    # and token-budgeted, so the prompt stays small as memory grows)
+    memories = memory_shards.for_config(config).get_relevant_facts(question)
     
-    print(f"--- Planner: Intent -> {intent} | Memories: {len(memories)} ---")
-    return {"intent": intent, "memories": memories, "steps": ["Planned"]}
+    # 2. Determine intent
+    return _planned(_detect_intent(question), memories)
 
-def memory_node(state: AgentState):
+async def aplanner_node(state: AgentState, config: RunnableConfig):
     """
-    Saves a new fact to semantic memory.
+    Async `planner_node`: the memory search embeds the question, so it's awaited.
     """
-    question = state["question"]
-    
+    question = state["question"].lower()
+    memories = await memory_shards.for_config(config).aget_relevant_facts(question)
+    return _planned(_detect_intent(question), memories)
+
+def _extract_fact(question: str) -> str:
     # Simple extraction: just save the whole message for this demo
     # In reality, use an LLM to extract the core fact.
     # Improved simple heuristic:
     if "remember that" in question:
-        fact = question.split("remember that")[1].strip()
+        return question.split("remember that")[1].strip()
     elif "save" in question:
-        fact = question.replace("save", "").strip()
-    else:
-        fact = question
-    
-    semantic_memory.save_fact(fact)
-    
+        return question.replace("save", "").strip()
+    return question
+
+def _remembered(fact: str):
     return {
         "answer": f"I've remembered that: {fact}",
         "steps": ["Saved Memory"]
     }
 
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
+def memory_node(state: AgentState, config: RunnableConfig):
+    """
+    Saves a new fact to the user's semantic memory.
+    """
+    fact = _extract_fact(state["question"])
+    memory_shards.for_config(config).save_fact(fact)
+    return _remembered(fact)
 
-def chat_node(state: AgentState):
+async def amemory_node(state: AgentState, config: RunnableConfig):
     """
-    Generates a response using context and memories via a real LLM.
+    Async `memory_node`: indexing the new fact embeds it, so it's awaited.
     """
-    memories = state.get("memories", [])
-    memory_context = "\n".join([f"- {m}" for m in memories])
-    
-    print(f"--- Chat Node (Context: {len(memories)} facts) ---")
-    
-    # Initialize LLM
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7)
-    
-    context = state.get("context", "")
-    
+    fact = _extract_fact(state["question"])
+    await memory_shards.for_config(config).asave_fact(fact)
+    return _remembered(fact)
+
+from langchain_core.messages import BaseMessage
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable, RunnableLambda
+from day_04_explanation.llm import get_chain, get_chat_model
+
+def _build_chat_chain() -> Runnable:
     system_prompt = """You are a helpful AI Learning Assistant.
     
     Your goal is to help the user learn based on their questions.
@@ -90,19 +101,59 @@ def chat_node(state: AgentState):
         ("human", "{question}")
     ])
     
-    chain = prompt | llm
+    return prompt | get_chat_model(temperature=0.7)
+
+def _chat_inputs(state: AgentState) -> Dict[str, str]:
+    memories = state.get("memories", [])
+    memory_context = "\n".join([f"- {m}" for m in memories])
+    
+    print(f"--- Chat Node (Context: {len(memories)} facts) ---")
+    
+    context = state.get("context", "")
     
-    response = chain.invoke({
+    return {
         "memory_context": memory_context if memory_context else "No specific facts known yet.",
         "context": context if context else "No document context available.",
         "question": state["question"]
-    })
-        
+    }
+
+def _chat_result(response: Optional[BaseMessage]):
     return {
-        "answer": response.content,
+        "answer": response.content if response is not None else "",
         "steps": ["Chatted"]
     }
 
+def chat_node(state: AgentState):
+    """
+    Generates a response using context and memories via a real LLM.
+    """
+    inputs = _chat_inputs(state)
+    
+    # the prompt and llm are built once and shared across turns
+    chain = get_chain("chat", _build_chat_chain)
+    
+    # stream the completion: under app.stream(stream_mode="messages")
+    # every chunk reaches the caller as soon as it's generated
+    response = None
+    for chunk in chain.stream(inputs):
+        response = chunk if response is None else response + chunk
+        
+    return _chat_result(response)
+
+async def achat_node(state: AgentState):
+    """
+    Async `chat_node`, used by `ainvoke` / `astream`: awaits the llm instead
+    of holding an executor thread for the whole completion.
+    """
+    inputs = _chat_inputs(state)
+    chain = get_chain("chat", _build_chat_chain)
+    
+    response = None
+    async for chunk in chain.astream(inputs):
+        response = chunk if response is None else response + chunk
+        
+    return _chat_result(response)
+
 # --- routing ---
 
 def route_by_intent(state: AgentState) -> Literal["save_memory", "chat"]:
@@ -112,9 +163,12 @@ def route_by_intent(state: AgentState) -> Literal["save_memory", "chat"]:
 
 workflow = StateGraph(AgentState, input=InputState, output=OutputState)
 
-workflow.add_node("planner", planner_node)
-workflow.add_node("save_memory", memory_node)
-workflow.add_node("chat", chat_node)
+# under ainvoke / astream langgraph runs a sync node on the loop's default
+# thread executor, so a blocking api call would hold one of its few threads
+# per request; every node that calls an api carries an async twin instead
+workflow.add_node("planner", RunnableLambda(planner_node, afunc=aplanner_node))
+workflow.add_node("save_memory", RunnableLambda(memory_node, afunc=amemory_node))
+workflow.add_node("chat", RunnableLambda(chat_node, afunc=achat_node))
 
 workflow.add_edge(START, "planner")
 
@@ -131,9 +185,15 @@ workflow.add_edge("save_memory", END)
 workflow.add_edge("chat", END)
 
 # Create the checkpointer for Episodic Memory
-# We use a connection to a local sqlite file
-conn = sqlite3.connect("day_08_memory/checkpoints.sqlite", check_same_thread=False)
-checkpointer = SqliteSaver(conn)
+# A pool of connections to a local sqlite file (WAL), shared by concurrent
+# sessions; it serves ainvoke / astream as well
+CHECKPOINT_PATH = DEFAULT_CHECKPOINT_PATH
+# old checkpoints are pruned and the file compacted in the background once
+# an entry point calls `retention.start()` (importing the graph starts nothing
+# and opens no file: the database is opened on first use);
+# the saver reports its write timings there too
+retention = get_checkpoint_retention()
+checkpointer = PooledSqliteSaver(CHECKPOINT_PATH, latency=retention.latency)
 
 # Compile with checkpointer
 app = workflow.compile(checkpointer=checkpointer)
@@ -0,0 +1,123 @@
+import argparse
+import asyncio
+import operator
+import os
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated, List
+
+from langchain_core.runnables import RunnableLambda
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
+from langgraph.graph import StateGraph, START, END
+from langgraph.graph.state import CompiledStateGraph
+from typing_extensions import TypedDict
+from day_08_memory.checkpoint_store import PooledSqliteSaver
+
+class TurnState(TypedDict):
+    question: str
+    steps: Annotated[List[str], operator.add]
+
+def _node(name: str, work: float) -> RunnableLambda:
+    def run(state: TurnState):
+        time.sleep(work)
+        return {"steps": [name]}
+
+    async def arun(state: TurnState):
+        await asyncio.sleep(work)
+        return {"steps": [name]}
+
+    return RunnableLambda(run, afunc=arun)
+
+def build_graph(saver: BaseCheckpointSaver, work: float) -> CompiledStateGraph:
+    """A turn shaped like the agent's: a planner, then two nodes in one super-step, each busy for `work` seconds."""
+    graph = StateGraph(TurnState)
+    for name in ("planner", "memory", "chat"):
+        graph.add_node(name, _node(name, work))
+    graph.add_edge(START, "planner")
+    graph.add_edge("planner", "memory")
+    graph.add_edge("planner", "chat")
+    graph.add_edge("memory", END)
+    graph.add_edge("chat", END)
+    return graph.compile(checkpointer=saver)
+
+def _turn(worker: int, turn: int, payload: str):
+    config = {"configurable": {"thread_id": f"worker-{worker}"}}
+    return {"question": f"{turn}: {payload}"}, config
+
+def run_threads(app: CompiledStateGraph, workers: int, turns: int, payload: str) -> float:
+    """Runs `turns` turns on each of `workers` threads (one conversation each); returns turns per second."""
+
+    def converse(worker: int):
+        for turn in range(turns):
+            inputs, config = _turn(worker, turn, payload)
+            app.invoke(inputs, config, durability="sync")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(converse, range(workers)))
+    return workers * turns / (time.perf_counter() - start)
+
+async def run_tasks(app: CompiledStateGraph, workers: int, turns: int, payload: str) -> float:
+    """`run_threads` on the event loop: one task per conversation, with ainvoke."""
+
+    async def converse(worker: int):
+        for turn in range(turns):
+            inputs, config = _turn(worker, turn, payload)
+            await app.ainvoke(inputs, config, durability="sync")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(converse(worker) for worker in range(workers)))
+    return workers * turns / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the checkpointers with concurrent conversations.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--turns", type=int, default=20, help="Turns per conversation")
+    parser.add_argument("--work", type=float, default=0.005, help="Seconds each node spends (stands in for an api call)")
+    parser.add_argument("--payload", type=int, default=2000, help="Characters of state per turn")
+    args = parser.parse_args()
+
+    payload = "x" * args.payload
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        def path(name: str, workers: int) -> str:
+            return os.path.join(tmp, f"{name}-{workers}.sqlite")
+
+        for workers in args.workers:
+            # what the agent used to do: one connection shared by every thread
+            conn = sqlite3.connect(path("shared", workers), check_same_thread=False)
+            shared = run_threads(build_graph(SqliteSaver(conn), args.work), workers, args.turns, payload)
+            conn.close()
+
+            pooled_saver = PooledSqliteSaver(path("pooled", workers))
+            pooled = run_threads(build_graph(pooled_saver, args.work), workers, args.turns, payload)
+            pooled_saver.close()
+
+            async def run_async():
+                async with AsyncSqliteSaver.from_conn_string(path("aio", workers)) as saver:
+                    single = await run_tasks(build_graph(saver, args.work), workers, args.turns, payload)
+                saver = PooledSqliteSaver(path("apooled", workers))
+                try:
+                    return single, await run_tasks(build_graph(saver, args.work), workers, args.turns, payload)
+                finally:
+                    saver.close()
+
+            async_single, async_pooled = asyncio.run(run_async())
+            results[workers] = (shared, pooled, async_single, async_pooled)
+
+    print(f"\n⏱️  Checkpointer load test: {args.turns} turns per conversation, "
+          f"{args.work * 1000:.0f} ms per node, durability=sync (turns/s)\n")
+    print(f"{'conversations':<15}{'shared conn':>13}{'pooled':>10}{'aio conn':>11}{'pooled aio':>12}")
+    for workers, (shared, pooled, async_single, async_pooled) in results.items():
+        print(f"{workers:<15}{shared:>13.1f}{pooled:>10.1f}{async_single:>11.1f}{async_pooled:>12.1f}")
+
+    first, last = min(results), max(results)
+    print(f"\n✅ From {first} to {last} conversations, pooled throughput scaled "
+          f"{results[last][1] / results[first][1]:.1f}x (shared connection: {results[last][0] / results[first][0]:.1f}x).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,525 @@
+import asyncio
+import functools
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import WRITES_IDX_MAP, ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+DEFAULT_CHECKPOINT_PATH = "day_08_memory/checkpoints.sqlite"
+# retention: the latest checkpoints kept per thread, and how long a thread
+# may sit idle before it is dropped altogether
+DEFAULT_KEEP_LAST = 20
+DEFAULT_IDLE_TTL = 30 * 24 * 3600.0
+# seconds between background maintenance passes
+DEFAULT_INTERVAL = 15 * 60.0
+# the share of free pages worth reclaiming
+MAX_FREE_RATIO = 0.25
+# free pages reclaimed per incremental vacuum step; writers get the lock back between steps
+VACUUM_STEP_PAGES = 256
+# write timings kept for the latency report
+LATENCY_WINDOW = 1000
+# connections shared by the graph's concurrent runs
+DEFAULT_POOL_SIZE = 8
+# checkpoints read per worker-thread hop by `alist`
+LIST_PAGE_SIZE = 50
+
+# 100-ns intervals between the uuid epoch (1582-10-15) and the unix epoch
+_UUID_EPOCH_OFFSET = 0x01B21DD213814000
+
+def checkpoint_id_at(timestamp: float) -> str:
+    """
+    Returns the smallest checkpoint id that could be written at `timestamp`.
+
+    Checkpoint ids are uuid6, whose leading bits are the creation time, so
+    ids sort (as strings) in the order they were written.
+    """
+    ticks = int(timestamp * 10**7) + _UUID_EPOCH_OFFSET
+    value = ((ticks >> 12) & 0xFFFFFFFFFFFF) << 80 | (6 << 76) | (ticks & 0x0FFF) << 64 | (0x8000 << 48)
+    return str(uuid.UUID(int=value))
+
+class WriteLatency:
+    """A rolling window of checkpoint write timings, per kind of write."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._timings: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+
+    def record(self, kind: str, seconds: float):
+        with self._lock:
+            self._timings.setdefault(kind, deque(maxlen=self.window)).append(seconds)
+            self._counts[kind] = self._counts.get(kind, 0) + 1
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Returns, per kind, the write count and the mean / p50 / p95 / max of recent writes in ms."""
+        with self._lock:
+            timings = {kind: sorted(values) for kind, values in self._timings.items()}
+            counts = dict(self._counts)
+        return {
+            kind: {
+                "count": counts[kind],
+                "mean_ms": 1000 * sum(values) / len(values),
+                "p50_ms": 1000 * values[len(values) // 2],
+                "p95_ms": 1000 * values[min(len(values) - 1, int(len(values) * 0.95))],
+                "max_ms": 1000 * values[-1],
+            }
+            for kind, values in timings.items()
+        }
+
+class ConnectionPool:
+    """
+    A fixed set of connections to one SQLite file, each lent to one thread at a time.
+
+    Connections run in WAL mode, so readers never block and a writer only
+    waits for another writer's commit. A thread that already holds a
+    connection gets the same one back when it asks again. Connections are
+    opened on first use, so creating a pool doesn't touch the disk; a file
+    created by the pool uses incremental auto-vacuum, so free pages can be
+    reclaimed in small steps without ever rewriting it.
+    """
+
+    def __init__(self, path: str, size: int = DEFAULT_POOL_SIZE, timeout: float = 30.0):
+        self.path = path
+        self.size = size
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._opened = 0
+        self._open_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _open(self) -> sqlite3.Connection:
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=self.timeout)
+        # auto_vacuum only takes effect before the first table is created
+        conn.executescript("PRAGMA auto_vacuum=INCREMENTAL; PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;")
+        return conn
+
+    def _borrow(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._open_lock:
+            if self._opened < self.size:
+                self._opened += 1
+                try:
+                    return self._open()
+                except BaseException:
+                    self._opened -= 1
+                    raise
+        return self._idle.get()
+
+    @property
+    def current(self) -> Optional[sqlite3.Connection]:
+        """The connection the calling thread holds, if any."""
+        return getattr(self._local, "conn", None)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Lends a connection for the duration of the block, waiting if all are in use."""
+        held = self.current
+        if held is not None:
+            yield held
+            return
+        conn = self._borrow()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._idle.put(conn)
+
+    def close(self):
+        with self._open_lock:
+            opened, self._opened = self._opened, 0
+        for _ in range(opened):
+            self._idle.get().close()
+
+class PooledSqliteSaver(SqliteSaver):
+    """
+    A `SqliteSaver` over a connection pool, batching its writes per super-step.
+
+    `SqliteSaver` serializes every read and write on one connection and
+    commits each task's writes on its own. Here each call borrows a pooled
+    connection (WAL), so concurrent threads read and write in parallel,
+    and the writes of a step's tasks are buffered and committed together
+    with the checkpoint that closes the step, in one transaction. The
+    buffer is keyed by thread and checkpoint namespace, so a subgraph's
+    checkpoint only commits its own namespace's writes. Writes that must
+    survive on their own (errors, interrupts, resumes), reads of the thread
+    and `delete_thread` flush the buffer first. Each commit's duration is
+    recorded into `latency`, if given.
+
+    The async methods are not natively async: they run the same sqlite
+    code offloaded to worker threads (`alist` a page of `LIST_PAGE_SIZE`
+    checkpoints per hop), so one saver serves both `invoke` / `stream` and
+    `ainvoke` / `astream`.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CHECKPOINT_PATH,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        latency: Optional[WriteLatency] = None,
+        **kwargs: Any,
+    ):
+        self.pool = ConnectionPool(path, pool_size)
+        super().__init__(None, **kwargs)
+        self.latency = latency
+        self._local = threading.local()
+        # (thread_id, checkpoint_ns) -> put_writes arguments not committed yet
+        self._pending: Dict[Tuple[str, str], List[Tuple[Any, ...]]] = {}
+        self._pending_lock = threading.Lock()
+
+    # `SqliteSaver` reads `self.conn` inside its cursor blocks: that's the
+    # connection the calling thread borrowed from the pool
+    @property
+    def conn(self) -> Optional[sqlite3.Connection]:
+        return self.pool.current
+
+    @conn.setter
+    def conn(self, value: Optional[sqlite3.Connection]):
+        # the pool owns the connections; `SqliteSaver.__init__` assigns None here
+        pass
+
+    @contextmanager
+    def cursor(self, transaction: bool = True) -> Iterator[sqlite3.Cursor]:
+        with self.pool.connection() as conn:
+            if not self.is_setup:
+                # the lock now only guards creating the tables
+                with self.lock:
+                    self.setup()
+            cur = conn.cursor()
+            try:
+                yield cur
+            finally:
+                # inside a batch, `_flush` commits once at the end
+                if transaction and not getattr(self._local, "batching", False):
+                    conn.commit()
+                cur.close()
+
+    @staticmethod
+    def _key(config: RunnableConfig) -> Tuple[str, str]:
+        configurable = config["configurable"]
+        return str(configurable["thread_id"]), configurable.get("checkpoint_ns", "")
+
+    def _flush(self, key: Tuple[str, str], writes: Sequence[Tuple[Any, ...]] = (), put: Optional[Tuple[Any, ...]] = None):
+        """Commits the key's buffered writes, plus `writes` and the `put`, in one transaction."""
+        with self._pending_lock:
+            batch = self._pending.pop(key, []) + list(writes)
+        if not batch and put is None:
+            return None
+        start = time.perf_counter()
+        with self.pool.connection() as conn:
+            self._local.batching = True
+            try:
+                for args in batch:
+                    super().put_writes(*args)
+                result = super().put(*put) if put is not None else None
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                self._local.batching = False
+            conn.commit()
+        if self.latency is not None:
+            self.latency.record("put" if put is not None else "put_writes", time.perf_counter() - start)
+        return result
+
+    def _flush_all(self, thread_id: Optional[str] = None):
+        """Commits the buffered writes of every namespace of a thread (or of every thread)."""
+        with self._pending_lock:
+            keys = [key for key in self._pending if thread_id is None or key[0] == thread_id]
+        for key in keys:
+            self._flush(key)
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        self._flush(self._key(config))
+        return super().get_tuple(config)
+
+    def list(self, config: Optional[RunnableConfig], **kwargs: Any) -> Iterator[CheckpointTuple]:
+        thread_id = (config or {}).get("configurable", {}).get("thread_id")
+        self._flush_all(None if thread_id is None else str(thread_id))
+        return super().list(config, **kwargs)
+
+    def put(
+        self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata, new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        return self._flush(self._key(config), put=(config, checkpoint, metadata, new_versions))
+
+    def put_writes(
+        self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = ""
+    ) -> None:
+        key = self._key(config)
+        args = (config, writes, task_id, task_path)
+        if any(channel in WRITES_IDX_MAP for channel, _ in writes):
+            self._flush(key, writes=[args])
+            return
+        with self._pending_lock:
+            self._pending.setdefault(key, []).append(args)
+
+    def delete_thread(self, thread_id: str) -> None:
+        # like an unbuffered saver: everything written before the delete goes with it
+        self._flush_all(str(thread_id))
+        super().delete_thread(thread_id)
+
+    def close(self):
+        """Commits any buffered writes and closes the pool."""
+        self._flush_all()
+        self.pool.close()
+
+    # --- async: the same calls, offloaded to worker threads ---
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        # one page per hop, so a long history isn't loaded before the first item
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = LIST_PAGE_SIZE if remaining is None else min(LIST_PAGE_SIZE, remaining)
+            read_page = functools.partial(self.list, config, filter=filter, before=before, limit=size)
+            page = await asyncio.to_thread(lambda: list(read_page()))
+            for item in page:
+                yield item
+            if len(page) < size:
+                return
+            if remaining is not None:
+                remaining -= len(page)
+            # checkpoints are listed newest first: continue below the last one
+            before = {"configurable": {"checkpoint_id": page[-1].config["configurable"]["checkpoint_id"]}}
+
+    async def aput(
+        self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata, new_versions: ChannelVersions
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = ""
+    ) -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+class CheckpointRetention:
+    """
+    Keeps the checkpoint database bounded.
+
+    The graph writes a checkpoint per step of every turn and langgraph never
+    deletes them. A maintenance pass keeps only the latest `keep_last`
+    checkpoints of each thread (resuming a thread only needs its latest),
+    drops threads idle for longer than `idle_ttl` seconds, deletes the
+    pending writes of removed checkpoints, then reclaims free pages and
+    truncates the WAL. `start()` runs a pass every `interval` seconds on a
+    daemon thread, the first one an interval after starting; readers and
+    writers on other connections carry on (WAL). A failed pass is reported
+    and retried on the next one. The database is opened on first use, so
+    creating the retention (e.g. when the graph module is imported) doesn't
+    touch the disk. Checkpoint write timings recorded by a
+    `PooledSqliteSaver` into `latency` are reported by `stats()`.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CHECKPOINT_PATH,
+        keep_last: int = DEFAULT_KEEP_LAST,
+        idle_ttl: Optional[float] = DEFAULT_IDLE_TTL,
+        interval: float = DEFAULT_INTERVAL,
+    ):
+        self.path = path
+        self.keep_last = keep_last
+        self.idle_ttl = idle_ttl
+        self.interval = interval
+        self.latency = WriteLatency()
+        self.last_run: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        """The retention's own connection, opened (and the tables created) on first use; call under `_lock`."""
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            # autocommit mode: the pruning transaction is opened explicitly
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            # the saver's own setup creates the tables (and turns on WAL) if the graph hasn't yet
+            SqliteSaver(conn).setup()
+            self._conn = conn
+        return self._conn
+
+    def prune(self, now: Optional[float] = None) -> Dict[str, int]:
+        """
+        Deletes checkpoints past `keep_last` per thread and threads idle past `idle_ttl`.
+
+        Returns:
+            Dict[str, int]: The number of expired threads, and deleted checkpoints and writes.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            conn = self._db()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                expired = checkpoints = 0
+                if self.idle_ttl is not None:
+                    idle = [
+                        row[0] for row in conn.execute(
+                            "SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(checkpoint_id) < ?",
+                            (checkpoint_id_at(now - self.idle_ttl),),
+                        )
+                    ]
+                    for thread_id in idle:
+                        checkpoints += conn.execute(
+                            "DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,)
+                        ).rowcount
+                    expired = len(idle)
+                checkpoints += conn.execute(
+                    """
+                    DELETE FROM checkpoints WHERE rowid IN (
+                        SELECT rowid FROM (
+                            SELECT rowid, ROW_NUMBER() OVER (
+                                PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC
+                            ) AS age FROM checkpoints
+                        ) WHERE age > ?
+                    )
+                    """,
+                    (self.keep_last,),
+                ).rowcount
+                writes = conn.execute(
+                    """
+                    DELETE FROM writes WHERE NOT EXISTS (
+                        SELECT 1 FROM checkpoints c WHERE c.thread_id = writes.thread_id
+                        AND c.checkpoint_ns = writes.checkpoint_ns AND c.checkpoint_id = writes.checkpoint_id
+                    )
+                    """
+                ).rowcount
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        return {"expired_threads": expired, "checkpoints": checkpoints, "writes": writes}
+
+    def compact(self) -> int:
+        """
+        Reclaims free pages if they're worth it, then checkpoints and truncates the WAL.
+
+        Pages are released `VACUUM_STEP_PAGES` at a time, each step its own
+        short write transaction, so pooled writers interleave with it. Only
+        a file created before incremental auto-vacuum was turned on needs
+        one full VACUUM, once, to switch over.
+
+        Returns:
+            int: The number of pages reclaimed.
+        """
+        with self._lock:
+            conn = self._db()
+            free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            total = conn.execute("PRAGMA page_count").fetchone()[0]
+            reclaimed = 0
+            if total and free / total > MAX_FREE_RATIO:
+                if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                    while free > 0:
+                        # execute() steps the pragma once (one page); executescript runs the whole step
+                        conn.executescript(f"PRAGMA incremental_vacuum({VACUUM_STEP_PAGES});")
+                        left = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                        if left >= free:
+                            break
+                        reclaimed += free - left
+                        free = left
+                else:
+                    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                    conn.execute("VACUUM")
+                    reclaimed = free
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return reclaimed
+
+    def maintain(self) -> Dict[str, float]:
+        """Runs one pass: prune, then compact. Returns what it removed and how long it took."""
+        start = time.perf_counter()
+        result: Dict[str, float] = dict(self.prune())
+        self.compact()
+        result["seconds"] = time.perf_counter() - start
+        result["finished_at"] = time.time()
+        self.last_run = result
+        return result
+
+    # --- background maintenance ---
+
+    def start(self):
+        """Starts maintaining the database every `interval` seconds, beginning one interval from now."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="checkpoint-retention", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stops the background maintenance and waits for a running pass to finish."""
+        self._stop.set()
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.maintain()
+            except Exception as e:
+                # e.g. the database stayed locked past the busy timeout; the thread
+                # must outlive any failure, so report it and try again next pass
+                print(f"⚠️ Checkpoint maintenance failed: {type(e).__name__}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns thread / checkpoint / write counts, database and WAL sizes, write latency and the last pass."""
+        with self._lock:
+            conn = self._db()
+            threads, checkpoints = conn.execute(
+                "SELECT COUNT(DISTINCT thread_id), COUNT(*) FROM checkpoints"
+            ).fetchone()
+            writes = conn.execute("SELECT COUNT(*) FROM writes").fetchone()[0]
+        wal = self.path + "-wal"
+        return {
+            "threads": threads,
+            "checkpoints": checkpoints,
+            "writes": writes,
+            "db_bytes": os.path.getsize(self.path),
+            "wal_bytes": os.path.getsize(wal) if os.path.exists(wal) else 0,
+            "write_latency": self.latency.summary(),
+            "last_maintenance": dict(self.last_run),
+        }
+
+# --- shared instance ---
+
+_retention_lock = threading.Lock()
+_default_retention: Optional[CheckpointRetention] = None
+
+def get_checkpoint_retention() -> CheckpointRetention:
+    """Returns the process-wide retention for the default database; entry points call `start()` on it."""
+    global _default_retention
+    with _retention_lock:
+        if _default_retention is None:
+            _default_retention = CheckpointRetention()
+        return _default_retention
@@ -0,0 +1,184 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_STORE_PATH = "day_08_memory/semantic_memory.sqlite"
+# writes between compactions, and the share of free pages worth reclaiming
+COMPACT_EVERY = 1000
+MAX_FREE_RATIO = 0.25
+
+class FactStore:
+    """
+    Durable storage for semantic memory facts, in a SQLite file in WAL mode.
+
+    Facts are appended with increasing ids, so readers catch up
+    incrementally with `since(last_id)`. A unique (namespace, sha256)
+    index makes dedup one indexed lookup. Every `add` / `forget` is a
+    single atomic transaction taken with BEGIN IMMEDIATE; with WAL and a
+    busy timeout, threads and processes can share the file (readers
+    never block). Every `compact_every` writes, the WAL is checkpointed
+    and the free pages left by forgotten facts are reclaimed.
+    """
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH, compact_every: int = COMPACT_EVERY):
+        self.path = path
+        self.compact_every = compact_every
+        self._writes = 0
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # autocommit mode: transactions are opened explicitly in `_transaction`
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30.0, isolation_level=None)
+        self._conn.executescript(
+            """
+            PRAGMA auto_vacuum=INCREMENTAL;
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            CREATE TABLE IF NOT EXISTS facts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                namespace TEXT NOT NULL,
+                fact_hash TEXT NOT NULL,
+                fact TEXT NOT NULL,
+                UNIQUE (namespace, fact_hash)
+            );
+            CREATE TABLE IF NOT EXISTS epochs (
+                namespace TEXT PRIMARY KEY,
+                epoch INTEGER NOT NULL
+            );
+            """
+        )
+
+    @staticmethod
+    def hash_fact(fact: str) -> str:
+        """Returns the sha256 hex digest used to dedup a fact."""
+        return hashlib.sha256(fact.strip().encode("utf-8")).hexdigest()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            # take the write lock up front, so concurrent writers queue on the
+            # busy timeout instead of failing on a lock upgrade
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def add(self, namespace: str, facts: List[str]) -> List[str]:
+        """
+        Appends facts that aren't stored yet, in one atomic transaction.
+
+        Args:
+            namespace (str): The memory the facts belong to.
+            facts (List[str]): The facts to store.
+
+        Returns:
+            List[str]: The facts that were new, in order.
+        """
+        added = []
+        with self._transaction() as conn:
+            for fact in dict.fromkeys(f.strip() for f in facts):
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO facts (namespace, fact_hash, fact) VALUES (?, ?, ?)",
+                    (namespace, self.hash_fact(fact), fact),
+                )
+                if cursor.rowcount:
+                    added.append(fact)
+        self._wrote()
+        return added
+
+    def forget(self, namespace: str, facts: List[str]) -> int:
+        """
+        Deletes facts and bumps the namespace's epoch, so readers reload.
+
+        Returns:
+            int: The number of facts deleted.
+        """
+        with self._transaction() as conn:
+            deleted = 0
+            for fact in facts:
+                deleted += conn.execute(
+                    "DELETE FROM facts WHERE namespace = ? AND fact_hash = ?", (namespace, self.hash_fact(fact))
+                ).rowcount
+            if deleted:
+                conn.execute(
+                    "INSERT INTO epochs (namespace, epoch) VALUES (?, 1) "
+                    "ON CONFLICT (namespace) DO UPDATE SET epoch = epoch + 1",
+                    (namespace,),
+                )
+        self._wrote()
+        return deleted
+
+    def contains(self, namespace: str, fact: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM facts WHERE namespace = ? AND fact_hash = ?", (namespace, self.hash_fact(fact))
+            ).fetchone()
+        return row is not None
+
+    def since(self, namespace: str, last_id: int = 0) -> List[Tuple[int, str]]:
+        """Returns (id, fact) for the namespace's facts after `last_id`, oldest first."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT id, fact FROM facts WHERE namespace = ? AND id > ? ORDER BY id", (namespace, last_id)
+            ).fetchall()
+
+    def epoch(self, namespace: str) -> int:
+        """Returns a counter that changes whenever facts are deleted from the namespace."""
+        with self._lock:
+            row = self._conn.execute("SELECT epoch FROM epochs WHERE namespace = ?", (namespace,)).fetchone()
+        return row[0] if row else 0
+
+    def count(self, namespace: str) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM facts WHERE namespace = ?", (namespace,)).fetchone()[0]
+
+    # --- maintenance ---
+
+    def _wrote(self):
+        with self._lock:
+            self._writes += 1
+            due = self._writes % self.compact_every == 0
+        if due:
+            self.compact()
+
+    def compact(self):
+        """Reclaims free pages if they're worth it, then checkpoints and truncates the WAL."""
+        with self._lock:
+            free = self._conn.execute("PRAGMA freelist_count").fetchone()[0]
+            total = self._conn.execute("PRAGMA page_count").fetchone()[0]
+            if total and free / total > MAX_FREE_RATIO:
+                # execute() steps the pragma once (one page); executescript runs it to completion
+                self._conn.executescript("PRAGMA incremental_vacuum;")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def stats(self) -> Dict[str, int]:
+        """Returns fact / namespace counts and the database and WAL sizes in bytes."""
+        with self._lock:
+            facts, namespaces = self._conn.execute("SELECT COUNT(*), COUNT(DISTINCT namespace) FROM facts").fetchone()
+        wal = self.path + "-wal"
+        return {
+            "facts": facts,
+            "namespaces": namespaces,
+            "db_bytes": os.path.getsize(self.path),
+            "wal_bytes": os.path.getsize(wal) if os.path.exists(wal) else 0,
+        }
+
+# --- shared instance ---
+
+_store_lock = threading.Lock()
+_default_store: Optional[FactStore] = None
+
+def get_fact_store() -> FactStore:
+    """Returns the process-wide fact store, opening it on first use."""
+    global _default_store
+    with _store_lock:
+        if _default_store is None:
+            _default_store = FactStore()
+        return _default_store
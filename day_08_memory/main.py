@@ -1,19 +1,32 @@
 import uuid
-from day_08_memory.agent import app
+from day_08_memory.agent import app, retention
+from day_08_memory.streaming import AnswerStream
 
-def run_chat(thread_id: str, user_input: str):
+def run_chat(thread_id: str, user_input: str, user_id: str = "sebastian"):
     print(f"\n💬 User ({thread_id}): {user_input}")
     
-    config = {"configurable": {"thread_id": thread_id}}
+    # the thread is the conversation (episodic memory); the user owns the facts (semantic memory)
+    config = {"configurable": {"thread_id": thread_id, "user_id": user_id}}
     
     # Run the agent
-    # stream_mode="values" returns the full state at each step
-    for event in app.stream({"question": user_input}, config=config, stream_mode="values"):
-        if "answer" in event and event["answer"]:
-            print(f"🤖 Agent: {event['answer']}")
+    # tokens are printed as the llm generates them
+    stream = AnswerStream(app, {"question": user_input}, config)
+    print("🤖 Agent: ", end="", flush=True)
+    streamed = False
+    for token in stream:
+        print(token, end="", flush=True)
+        streamed = True
+    if not streamed and stream.answer:
+        print(stream.answer, end="")
+    print()
+
+    if stream.ttft is not None:
+        print(f"   ⚡ first token after {stream.ttft:.2f}s (full answer {stream.total:.2f}s)")
 
 def main():
     print("\n🧠 Starting Day 8: Memory (Verification)...\n")
+    # prune and compact the checkpoint file in the background while we run
+    retention.start()
     
     # 1. Create a thread ID (simulating a user session)
     # We use a fixed ID here to demonstrate persistence across script runs if we wanted,
@@ -31,6 +44,17 @@ def main():
     print(f"\n--- Switching to new thread {thread_id_2} ---")
     run_chat(thread_id_2, "Who am I?")
 
+    # 5. Another user: their semantic memory is separate
+    print("\n--- Switching to another user ---")
+    run_chat("user_session_3", "Who am I?", user_id="guest")
+
+    # 6. Episodic memory footprint: checkpoints kept, file size, write latency
+    stats = retention.stats()
+    print(f"\n🗄️ Checkpoints: {stats['checkpoints']} across {stats['threads']} threads, "
+          f"{(stats['db_bytes'] + stats['wal_bytes']) / 1024:.0f} KiB on disk")
+    for kind, latency in stats["write_latency"].items():
+        print(f"   {kind}: {latency['count']} writes, p50 {latency['p50_ms']:.2f} ms, p95 {latency['p95_ms']:.2f} ms")
+
     print("\n✅ Day 8 Verification Complete!")
 
 if __name__ == "__main__":
@@ -1,53 +1,224 @@
+import asyncio
 import json
 import os
-from typing import List
+import sys
+import threading
+from typing import List, Optional
+
+import numpy as np
+import tiktoken
+from langchain_core.embeddings import Embeddings
+from day_03_chunking.embedding_cache import get_embeddings
+from day_04_explanation.llm import DEFAULT_CHAT_MODEL
+from day_08_memory.fact_store import FactStore, get_fact_store
+
+# recall settings: at most this many facts, each at least this similar to
+# the question, and no more than this many prompt tokens in total
+DEFAULT_TOP_K = 5
+DEFAULT_MIN_SCORE = 0.25
+DEFAULT_TOKEN_BUDGET = 256
+
+DEFAULT_NAMESPACE = "default"
+# facts saved before the sqlite store, imported once into an empty namespace
+LEGACY_JSON_PATH = "day_08_memory/user_profile.json"
 
 class SemanticMemory:
     """
-    A simple semantic memory store that saves facts to a JSON file.
-    In a real app, this would likely be a vector database.
+    A semantic memory store backed by a `FactStore` (SQLite, WAL).
+
+    The store is the source of truth: saves are atomic, deduplicated
+    inserts, and every read first catches up on facts appended since the
+    last one (by this or any other process). Facts are embedded into an
+    in-memory vector index (extended incrementally, with vectors served
+    from the persistent embedding cache), so recall ranks facts by
+    similarity to the question and returns only the best few: at most
+    `top_k`, scoring at least `min_score`, within `token_budget` prompt
+    tokens. The prompt stays the same size however many facts a user saves.
     """
-    
-    def __init__(self, file_path: str = "day_08_memory/user_profile.json"):
-        self.file_path = file_path
-        self._load_memory()
-
-    def _load_memory(self):
-        """Loads facts from the JSON file."""
-        if os.path.exists(self.file_path):
+
+    def __init__(
+        self,
+        store: Optional[FactStore] = None,
+        namespace: str = DEFAULT_NAMESPACE,
+        embeddings: Optional[Embeddings] = None,
+        top_k: int = DEFAULT_TOP_K,
+        min_score: float = DEFAULT_MIN_SCORE,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        legacy_json_path: Optional[str] = LEGACY_JSON_PATH,
+    ):
+        self.store = store or get_fact_store()
+        self.namespace = namespace
+        self.embeddings = embeddings
+        self.top_k = top_k
+        self.min_score = min_score
+        self.token_budget = token_budget
+        self._lock = threading.Lock()
+        # facts mirror the store up to _last_id; the index covers a prefix
+        # of them: one normalized row per fact, plus its token count
+        self.facts: List[str] = []
+        self._last_id = 0
+        self._epoch = self.store.epoch(namespace)
+        self._vectors: Optional[np.ndarray] = None
+        self._tokens: List[int] = []
+        self._encoding = None
+        if legacy_json_path:
+            self._import_legacy(legacy_json_path)
+
+    def _import_legacy(self, path: str):
+        """Copies facts from the old JSON file into an empty namespace."""
+        if not os.path.exists(path) or self.store.count(self.namespace):
+            return
+        try:
+            with open(path, "r") as f:
+                facts = json.load(f)
+        except json.JSONDecodeError:
+            return
+        self.store.add(self.namespace, [fact for fact in facts if isinstance(fact, str)])
+
+    def _sync(self):
+        """Catches up on facts stored since the last read; reloads after deletions."""
+        epoch = self.store.epoch(self.namespace)
+        with self._lock:
+            if epoch != self._epoch:
+                self.facts, self._last_id, self._epoch = [], 0, epoch
+                self._vectors, self._tokens = None, []
+            last_id = self._last_id
+        rows = self.store.since(self.namespace, last_id)
+        if not rows:
+            return
+        with self._lock:
+            # another thread may have applied (some of) them already
+            rows = [(i, fact) for i, fact in rows if i > self._last_id]
+            if rows:
+                self.facts = self.facts + [fact for _, fact in rows]
+                self._last_id = rows[-1][0]
+
+    # --- index ---
+
+    def _embedder(self) -> Embeddings:
+        if self.embeddings is None:
+            self.embeddings = get_embeddings()
+        return self.embeddings
+
+    def _count_tokens(self, texts: List[str]) -> List[int]:
+        if self._encoding is None:
             try:
-                with open(self.file_path, "r") as f:
-                    self.facts = json.load(f)
-            except json.JSONDecodeError:
-                self.facts = []
-        else:
-            self.facts = []
+                self._encoding = tiktoken.encoding_for_model(DEFAULT_CHAT_MODEL)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+        # +2 for the "- " bullet and newline each fact is rendered with
+        return [len(tokens) + 2 for tokens in self._encoding.encode_ordinary_batch(texts)]
+
+    @staticmethod
+    def _normalize(vectors: List[List[float]]) -> np.ndarray:
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1)
+        return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+    def _unindexed(self):
+        with self._lock:
+            start = 0 if self._vectors is None else len(self._vectors)
+            return start, self.facts[start:], self._epoch
+
+    def _extend_index(self, start: int, epoch: int, facts: List[str], vectors: List[List[float]]):
+        matrix, tokens = self._normalize(vectors), self._count_tokens(facts)
+        with self._lock:
+            # drop the batch if the memory was reloaded or another thread got there first
+            current = 0 if self._vectors is None else len(self._vectors)
+            if epoch != self._epoch or current != start:
+                return
+            self._vectors = matrix if self._vectors is None else np.vstack([self._vectors, matrix])
+            self._tokens = self._tokens + tokens
 
-    def _save_memory(self):
-        """Saves facts to the JSON file."""
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
-        with open(self.file_path, "w") as f:
-            json.dump(self.facts, f, indent=2)
+    def _ensure_index(self):
+        self._sync()
+        start, facts, epoch = self._unindexed()
+        if facts:
+            self._extend_index(start, epoch, facts, self._embedder().embed_documents(facts))
+
+    async def _aensure_index(self):
+        # the sqlite reads are local and quick, so they run inline
+        self._sync()
+        start, facts, epoch = self._unindexed()
+        if facts:
+            self._extend_index(start, epoch, facts, await self._embedder().aembed_documents(facts))
+
+    def _rank(self, query_vector: List[float], k: Optional[int]) -> List[str]:
+        k = k or self.top_k
+        with self._lock:
+            if self._vectors is None or not len(self._vectors):
+                return []
+            scores = self._vectors @ self._normalize([query_vector])[0]
+            top = np.argsort(-scores)[:k]
+            facts, tokens = self.facts, self._tokens
+
+        selected, used = [], 0
+        for i in top:
+            if scores[i] < self.min_score:
+                break
+            if used + tokens[i] > self.token_budget:
+                continue
+            selected.append(facts[i])
+            used += tokens[i]
+        return selected
+
+    # --- public api ---
+
+    def save_facts(self, facts: List[str]) -> List[str]:
+        """
+        Saves several facts in one atomic write, skipping known ones.
+        New facts are indexed on the next recall.
+
+        Returns:
+            List[str]: The facts that were new.
+        """
+        return self.store.add(self.namespace, facts)
 
     def save_fact(self, fact: str):
         """Saves a new fact if it doesn't already exist."""
-        if fact not in self.facts:
-            self.facts.append(fact)
-            self._save_memory()
+        if self.save_facts([fact]):
             print(f"💾 Saved to Semantic Memory: {fact}")
         else:
             print(f"ℹ️ Fact already known: {fact}")
 
+    async def asave_fact(self, fact: str):
+        """Async `save_fact`: the write may wait on another process's lock, so it runs in a thread."""
+        await asyncio.to_thread(self.save_fact, fact)
+
+    def forget_facts(self, facts: List[str]) -> int:
+        """Deletes facts; returns how many were stored."""
+        return self.store.forget(self.namespace, facts)
+
+    def memory_bytes(self) -> int:
+        """Estimates the memory held by the loaded facts and their index."""
+        with self._lock:
+            vectors = self._vectors.nbytes if self._vectors is not None else 0
+            return vectors + sum(sys.getsizeof(f) for f in self.facts) + 8 * (len(self.facts) + len(self._tokens))
+
     def get_all_facts(self) -> List[str]:
         """Returns all stored facts."""
-        return self.facts
+        self._sync()
+        return list(self.facts)
 
-    def get_relevant_facts(self, query: str) -> List[str]:
+    def get_relevant_facts(self, query: str, k: Optional[int] = None) -> List[str]:
         """
-        Returns relevant facts. 
-        For this simple implementation, we'll just return all facts 
-        since we don't have a vector store set up for this specific part yet.
+        Returns the facts most relevant to the query, best first.
+
+        Args:
+            query (str): The user's question.
+            k (Optional[int]): Overrides `top_k` for this call.
+
+        Returns:
+            List[str]: Up to k facts scoring at least `min_score`, whose
+            combined size fits `token_budget`.
         """
-        # In a real implementation, you'd embed the query and search the vector store.
-        return self.facts
+        self._ensure_index()
+        if not self.facts:
+            return []
+        return self._rank(self._embedder().embed_query(query), k)
+
+    async def aget_relevant_facts(self, query: str, k: Optional[int] = None) -> List[str]:
+        """Async `get_relevant_facts`: the embedding calls are awaited."""
+        await self._aensure_index()
+        if not self.facts:
+            return []
+        return self._rank(await self._embedder().aembed_query(query), k)
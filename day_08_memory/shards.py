@@ -0,0 +1,93 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from langchain_core.runnables import RunnableConfig
+from day_08_memory.fact_store import FactStore, get_fact_store
+from day_08_memory.semantic import DEFAULT_NAMESPACE, LEGACY_JSON_PATH, SemanticMemory
+
+# loaded shards nobody touched recently are dropped (oldest first) past this
+DEFAULT_MEMORY_CAP = 256 * 1024 ** 2
+
+def namespace_from_config(config: Optional[RunnableConfig]) -> str:
+    """Returns the memory namespace for a run: `configurable.user_id`, or the shared default."""
+    user_id = ((config or {}).get("configurable") or {}).get("user_id")
+    return str(user_id) if user_id else DEFAULT_NAMESPACE
+
+class MemoryShards:
+    """
+    Per-user semantic memories, loaded lazily and cached in LRU order.
+
+    Each user (namespace) gets its own `SemanticMemory` over the shared
+    fact store; it reads nothing until its first recall. Loaded shards are
+    evicted least-recently-used first once their estimated memory passes
+    `memory_cap` (their facts stay in the store, and a shard that comes
+    back just reloads). Only the default namespace imports the legacy
+    JSON profile.
+    """
+
+    def __init__(self, store: Optional[FactStore] = None, memory_cap: int = DEFAULT_MEMORY_CAP, **memory_kwargs: Any):
+        self.store = store or get_fact_store()
+        self.memory_cap = memory_cap
+        self.memory_kwargs = memory_kwargs
+        self._lock = threading.Lock()
+        self._shards: "OrderedDict[str, SemanticMemory]" = OrderedDict()
+        self._stats = {"hits": 0, "loads": 0, "evictions": 0}
+
+    def get(self, namespace: str) -> SemanticMemory:
+        """Returns the namespace's memory, creating it on first use."""
+        with self._lock:
+            memory = self._shards.get(namespace)
+            if memory is not None:
+                self._shards.move_to_end(namespace)
+                self._stats["hits"] += 1
+                return memory
+
+        legacy = LEGACY_JSON_PATH if namespace == DEFAULT_NAMESPACE else None
+        memory = SemanticMemory(self.store, namespace, legacy_json_path=legacy, **self.memory_kwargs)
+        with self._lock:
+            # another thread may have loaded it meanwhile; keep the first one
+            memory = self._shards.setdefault(namespace, memory)
+            self._shards.move_to_end(namespace)
+            self._stats["loads"] += 1
+            self._evict()
+        return memory
+
+    def for_config(self, config: Optional[RunnableConfig]) -> SemanticMemory:
+        """Returns the memory for a run's `configurable.user_id`."""
+        return self.get(namespace_from_config(config))
+
+    def _evict(self):
+        # shards grow as they're recalled from, so sizes are measured now
+        sizes = {namespace: memory.memory_bytes() for namespace, memory in self._shards.items()}
+        total = sum(sizes.values())
+        # never evict the most recent shard: it's the one being handed out
+        for namespace in list(self._shards)[:-1]:
+            if total <= self.memory_cap:
+                break
+            del self._shards[namespace]
+            total -= sizes[namespace]
+            self._stats["evictions"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Returns loaded shard count, their estimated bytes, and hit, load and eviction counts."""
+        with self._lock:
+            self._evict()
+            return {
+                "shards": len(self._shards),
+                "bytes": sum(memory.memory_bytes() for memory in self._shards.values()),
+                **self._stats,
+            }
+
+# --- shared instance ---
+
+_shards_lock = threading.Lock()
+_default_shards: Optional[MemoryShards] = None
+
+def get_memory_shards() -> MemoryShards:
+    """Returns the process-wide memory shards, creating them on first use."""
+    global _default_shards
+    with _shards_lock:
+        if _default_shards is None:
+            _default_shards = MemoryShards()
+        return _default_shards
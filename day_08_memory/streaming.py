@@ -0,0 +1,60 @@
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Tuple
+
+# nodes whose llm tokens are part of the user-facing answer
+ANSWER_NODES = ("chat",)
+
+class AnswerStream:
+    """
+    Streams the agent's answer token by token and times it.
+
+    Runs the graph with `stream_mode=["messages", "values"]`: "messages"
+    carries llm tokens as they are generated, "values" carries the state
+    after each step (so non-llm answers, like a saved memory, still come
+    through as `final_state`).
+
+    After iteration, `ttft` is the time to the first answer token (None if
+    the answer didn't come from an llm) and `total` the full run time.
+    Use `async for` with an async-checkpointed app to stream via `astream`.
+    """
+
+    def __init__(self, app, inputs: Dict[str, Any], config: Dict[str, Any]):
+        self.app = app
+        self.inputs = inputs
+        self.config = config
+        self.final_state: Optional[Dict[str, Any]] = None
+        self.ttft: Optional[float] = None
+        self.total: Optional[float] = None
+
+    def __iter__(self) -> Iterator[str]:
+        start = time.perf_counter()
+        for event in self.app.stream(self.inputs, config=self.config, stream_mode=["messages", "values"]):
+            token = self._token(event, start)
+            if token:
+                yield token
+        self.total = time.perf_counter() - start
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        start = time.perf_counter()
+        async for event in self.app.astream(self.inputs, config=self.config, stream_mode=["messages", "values"]):
+            token = self._token(event, start)
+            if token:
+                yield token
+        self.total = time.perf_counter() - start
+
+    def _token(self, event: Tuple[str, Any], start: float) -> Optional[str]:
+        mode, payload = event
+        if mode == "values":
+            self.final_state = payload
+            return None
+        chunk, metadata = payload
+        if metadata.get("langgraph_node") in ANSWER_NODES and chunk.content:
+            if self.ttft is None:
+                self.ttft = time.perf_counter() - start
+            return chunk.content
+        return None
+
+    @property
+    def answer(self) -> Optional[str]:
+        """The final answer from the graph state, once iteration is done."""
+        return (self.final_state or {}).get("answer")
@@ -1,21 +1,16 @@
 import json
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable
 from pydantic import BaseModel, Field
+from day_04_explanation.llm import get_chain, get_chat_model
 
 class EvaluationScore(BaseModel):
     score: int = Field(description="Score from 1 to 5")
     reasoning: str = Field(description="Reasoning for the score")
 
-def evaluate_response(question: str, answer: str, ground_truth: str):
-    """
-    Evaluates the answer against the ground truth using an LLM.
-    Returns a dict with score and reasoning.
-    """
-    
+def _build_judge_chain() -> Runnable:
     # Initialize the judge LLM
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
-    structured_llm = llm.with_structured_output(EvaluationScore)
+    structured_llm = get_chat_model(temperature=0).with_structured_output(EvaluationScore)
     
     prompt_template = ChatPromptTemplate.from_messages([
         ("system", "You are an expert evaluator. Compare the generated answer to the ground truth."),
@@ -34,7 +29,16 @@ def evaluate_response(question: str, answer: str, ground_truth: str):
         """)
     ])
     
-    chain = prompt_template | structured_llm
+    return prompt_template | structured_llm
+
+def evaluate_response(question: str, answer: str, ground_truth: str):
+    """
+    Evaluates the answer against the ground truth using an LLM.
+    Returns a dict with score and reasoning.
+    """
+    
+    # the judge chain is built once and shared across evaluations
+    chain = get_chain("judge", _build_judge_chain)
     
     result = chain.invoke({
         "question": question,
@@ -1,7 +1,7 @@
 import json
 import os
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
+from day_04_explanation.llm import get_chat_model
 from day_09_evaluation.evaluator import evaluate_response
 
 load_dotenv()
@@ -9,7 +9,7 @@ load_dotenv()
 # 1. Define the System Under Test (The Agent)
 # For this demo, we'll use a simple LLM call to represent our "Explanation Agent" from Day 4.
 def generate_agent_response(question: str) -> str:
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7)
+    llm = get_chat_model(temperature=0.7)
     return llm.invoke(question).content
 
 def main():
@@ -0,0 +1,157 @@
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from day_03_chunking.index_manager import IndexManager
+from day_03_chunking.pipeline import run_ingestion_pipeline
+from day_03_chunking.registry import RetrieverLease, corpus_key, get_retriever_registry
+from day_03_chunking.retriever import build_hybrid_retriever
+
+# finished jobs kept around for sessions that haven't polled them yet
+MAX_FINISHED_JOBS = 100
+
+# uploaded corpora are indexed here, not next to the day 3 index
+DEFAULT_CORPORA_DIRECTORY = os.environ.get("CORPORA_DIRECTORY", "day_10_full_app/corpora")
+
+class IndexingJob:
+    """
+    One background indexing run, polled by the Streamlit script.
+
+    Status goes queued -> running -> done | failed; while running, `stage`
+    and `progress` follow the ingestion pipeline. A finished job holds a
+    retriever lease until a session claims it.
+    """
+
+    def __init__(self, name: str):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.status = "queued"
+        self.stage = "queued"
+        self.progress: Dict[str, int] = {}
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._lease: Optional[RetrieverLease] = None
+        self._lock = threading.Lock()
+
+    def update(self, **fields):
+        with self._lock:
+            for name, value in fields.items():
+                setattr(self, name, value)
+
+    def snapshot(self) -> Dict[str, object]:
+        """Returns a consistent copy of the job's state for display."""
+        with self._lock:
+            return {
+                "id": self.id,
+                "name": self.name,
+                "status": self.status,
+                "stage": self.stage,
+                "progress": dict(self.progress),
+                "error": self.error,
+                "elapsed": (self.finished_at or time.time()) - self.created_at,
+            }
+
+    def claim(self) -> Optional[RetrieverLease]:
+        """Hands the finished retriever's lease to the caller (once)."""
+        with self._lock:
+            lease, self._lease = self._lease, None
+            return lease
+
+class IndexingJobQueue:
+    """
+    Runs indexing jobs on a small thread pool, outside the Streamlit script.
+
+    `submit` returns a job id at once. Jobs live in this process-wide
+    queue, not in the session, so a script rerun (or any widget click)
+    just polls the same job again instead of restarting the work.
+
+    Corpora persist in `index_directory` across restarts: uploading a file
+    that is already indexed there reuses its chunks and embeddings. The
+    registry deletes a corpus when it evicts it.
+    """
+
+    def __init__(self, max_workers: int = 2, index_directory: str = DEFAULT_CORPORA_DIRECTORY):
+        self.index_directory = index_directory
+        os.makedirs(index_directory, exist_ok=True)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="indexing-job")
+        self._jobs: "OrderedDict[str, IndexingJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit_file(self, path: str, name: str, content: bytes) -> str:
+        """
+        Queues indexing of an uploaded file and returns the job id.
+
+        Args:
+            path (str): A temporary copy of the file (removed when the job ends).
+            name (str): The uploaded file name, used as the chunks' source.
+                The registry key is the content alone, so an identical file
+                uploaded later under another name shares the first upload's
+                index, and its chunks keep the first name as their source.
+            content (bytes): The file content, hashed into the registry key.
+
+        Returns:
+            str: The job id to poll with `get`.
+        """
+        job = IndexingJob(name)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._forget_finished()
+        self._pool.submit(self._run, job, path, corpus_key(content))
+        return job.id
+
+    def get(self, job_id: str) -> Optional[IndexingJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _forget_finished(self):
+        finished = [j for j in self._jobs.values() if j.finished_at is not None]
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            # an unclaimed lease is released when the job is garbage collected
+            del self._jobs[job.id]
+
+    def _run(self, job: IndexingJob, path: str, key: str):
+        job.update(status="running", stage="starting")
+
+        def on_progress(stage: str, stats: Dict[str, int]):
+            job.update(stage=stage, progress=stats)
+
+        def build():
+            # one collection per corpus, so sessions never prune each other's files.
+            # stream pages through chunking and indexing so memory stays flat,
+            # keyed by the uploaded name (the first uploader's) rather than the random temp path
+            index = IndexManager(persist_directory=self.index_directory, collection_name=f"corpus_{key[:16]}")
+            try:
+                run_ingestion_pipeline(path, index, source_name=job.name, prune=True, on_progress=on_progress)
+            except BaseException:
+                # a failed build never reaches the registry, so nothing else would delete it
+                index.destroy()
+                raise
+            return build_hybrid_retriever(index), index
+
+        try:
+            # an identical corpus that's already built (or building) is shared
+            lease = get_retriever_registry().acquire(key, build)
+            job.update(_lease=lease, status="done", stage="done", finished_at=time.time())
+        except Exception as e:
+            job.update(status="failed", stage="failed", error=str(e), finished_at=time.time())
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+# --- shared instance ---
+
+_queue_lock = threading.Lock()
+_default_queue: Optional[IndexingJobQueue] = None
+
+def get_job_queue() -> IndexingJobQueue:
+    """Returns the process-wide indexing job queue, creating it on first use."""
+    global _default_queue
+    with _queue_lock:
+        if _default_queue is None:
+            _default_queue = IndexingJobQueue()
+        return _default_queue
@@ -12,24 +12,35 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 # Add the project root to sys.path so we can import from other days
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from day_08_memory.agent import app
+from day_08_memory.agent import app, retention
+from day_08_memory.streaming import AnswerStream
 from langchain_core.messages import HumanMessage, AIMessage
 
 # Page Config
 
 
 # Imports for functionality
-from day_02_reading.loaders import DocumentLoader
-from day_03_chunking.chunker import chunk_documents
-from day_03_chunking.retriever import create_hybrid_retriever
+from day_10_full_app.jobs import get_job_queue
 from day_05_quizzes.generator import generate_quiz
 from day_06_flashcards.generator import generate_flashcards
 from day_07_planning.planner import generate_study_plan
+from day_10_full_app.study_pack import generate_study_pack
 import tempfile
 
+# prune and compact the chat checkpoints in the background (once per process;
+# reruns find it already started)
+retention.start()
+
 # Session State Initialization
 if "thread_id" not in st.session_state:
     st.session_state.thread_id = str(uuid.uuid4())
+
+# semantic memory is kept per user; a session is its own anonymous user
+# until it gives a name, and goes back to that id if the name is cleared
+if "anon_user_id" not in st.session_state:
+    st.session_state.anon_user_id = str(uuid.uuid4())
+if "user_id" not in st.session_state:
+    st.session_state.user_id = st.session_state.anon_user_id
     
 if "messages" not in st.session_state:
     st.session_state.messages = []
@@ -37,26 +48,75 @@ if "messages" not in st.session_state:
 if "retriever" not in st.session_state:
     st.session_state.retriever = None
 
+if "retriever_lease" not in st.session_state:
+    st.session_state.retriever_lease = None
+
+if "indexing_job_id" not in st.session_state:
+    st.session_state.indexing_job_id = None
+
+# --- Background Indexing ---
+@st.fragment(run_every=1.0)
+def indexing_status():
+    """Polls the session's indexing job and swaps the retriever in when it's done."""
+    job = get_job_queue().get(st.session_state.indexing_job_id)
+    if job is None:
+        st.session_state.indexing_job_id = None
+        return
+
+    state = job.snapshot()
+    progress = state["progress"]
+    if state["status"] in ("queued", "running"):
+        st.info(
+            f"⏳ Indexing **{state['name']}** — {state['stage']} "
+            f"({progress.get('pages', 0)} pages loaded, {progress.get('pages_chunked', 0)} chunked, "
+            f"{progress.get('chunks', 0)} chunks indexed, {state['elapsed']:.0f}s)"
+        )
+        return
+
+    st.session_state.indexing_job_id = None
+    if state["status"] == "done":
+        lease = job.claim()
+        if lease:
+            # swap in one step; the old retriever keeps serving until now
+            old_lease = st.session_state.retriever_lease
+            st.session_state.retriever_lease = lease
+            st.session_state.retriever = lease.retriever
+            if old_lease:
+                old_lease.release()
+        st.toast(f"✅ Indexed {state['name']}!")
+    else:
+        st.toast(f"❌ Indexing failed: {state['error']}")
+    # rerun the whole app so every tab sees the new retriever
+    st.rerun()
+
 # --- Sidebar: Chat & Settings ---
 with st.sidebar:
     st.header("🧠 AI Assistant")
     
+    # 0. User: memories saved under a name are recalled in any later session.
+    # the name is taken on trust, not authenticated: anyone who types the
+    # same name shares its memories. name ids are namespaced, so they never
+    # collide with the anonymous ones
+    user_name = " ".join(st.text_input("Your name", placeholder="Remember me as...").split()).casefold()
+    st.session_state.user_id = f"name:{user_name}" if user_name else st.session_state.anon_user_id
+    
     # 1. Knowledge Base (Collapsible)
     with st.expander("📁 Knowledge Base", expanded=False):
         uploaded_file = st.file_uploader("Upload PDF/Txt", type=["pdf", "txt"])
         if uploaded_file:
-            # Save uploaded file to a temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f".{uploaded_file.name.split('.')[-1]}") as tmp_file:
-                tmp_file.write(uploaded_file.getvalue())
-                tmp_path = tmp_file.name
-            
-            if st.button("Process File"):
-                with st.spinner("Processing..."):
-                    docs = DocumentLoader.load(tmp_path)
-                    chunks = chunk_documents(docs)
-                    retriever = create_hybrid_retriever(chunks)
-                    st.session_state.retriever = retriever
-                    st.success("✅ Indexed!")
+            if st.button("Process File", disabled=st.session_state.indexing_job_id is not None):
+                # Save uploaded file to a temporary file (the job removes it when done)
+                with tempfile.NamedTemporaryFile(delete=False, suffix=f".{uploaded_file.name.split('.')[-1]}") as tmp_file:
+                    tmp_file.write(uploaded_file.getvalue())
+                    tmp_path = tmp_file.name
+
+                # index in the background; reruns just poll the job
+                st.session_state.indexing_job_id = get_job_queue().submit_file(
+                    tmp_path, uploaded_file.name, uploaded_file.getvalue()
+                )
+
+    if st.session_state.indexing_job_id:
+        indexing_status()
     
     st.divider()
 
@@ -83,7 +143,7 @@ with st.sidebar:
                 message_placeholder = st.empty()
                 full_response = ""
                 
-                config = {"configurable": {"thread_id": st.session_state.thread_id}}
+                config = {"configurable": {"thread_id": st.session_state.thread_id, "user_id": st.session_state.user_id}}
                 
                 # Retrieve context
                 context_str = None
@@ -101,16 +161,22 @@ with st.sidebar:
                     inputs["context"] = context_str
                 
                 try:
-                    with st.spinner("Thinking..."):
-                        for event in app.stream(inputs, config=config, stream_mode="values"):
-                            final_state = event
+                    # render tokens as they arrive instead of waiting for the full answer
+                    message_placeholder.markdown("_Thinking..._")
+                    stream = AnswerStream(app, inputs, config)
+                    for token in stream:
+                        full_response += token
+                        message_placeholder.markdown(full_response + "▌")
                     
-                    if final_state and "answer" in final_state:
-                        full_response = final_state["answer"]
+                    if stream.answer:
+                        full_response = stream.answer
                         message_placeholder.markdown(full_response)
                     else:
                         full_response = "I'm not sure."
                         message_placeholder.markdown(full_response)
+
+                    if stream.ttft is not None:
+                        st.caption(f"⚡ first token {stream.ttft:.2f}s · full answer {stream.total:.2f}s")
                         
 
                 except Exception as e:
@@ -122,7 +188,7 @@ with st.sidebar:
 # --- Main Area: Learning Tools ---
 st.title("🧠 AI Learning Assistant")
 
-tab1, tab2, tab3 = st.tabs(["📝 Quiz", "🗂️ Flashcards", "📅 Plan"])
+tab1, tab2, tab3, tab4 = st.tabs(["📝 Quiz", "🗂️ Flashcards", "📅 Plan", "🎒 Study Pack"])
 
 with tab1:
     st.header("Generate a Quiz")
@@ -209,3 +275,32 @@ with tab3:
                 st.caption(f"Duration: {session.total_duration_minutes} mins")
                 for item in session.items:
                     st.markdown(f"- **{item.activity}** ({item.duration_minutes}m)")
+
+with tab4:
+    st.header("Build a Study Pack")
+    st.caption("A quiz, flashcards and a plan from one retrieval, generated in parallel.")
+    col_s1, col_s2, col_s3 = st.columns([0.4, 0.3, 0.3])
+    with col_s1:
+        pack_topic = st.text_input("Topic for Pack", "LangChain")
+    with col_s2:
+        pack_duration = st.text_input("Time for Pack", "2 hours")
+    with col_s3:
+        st.write("")
+        st.write("")
+        if st.button("Build Pack", use_container_width=True):
+            with st.spinner("Building study pack..."):
+                pack = generate_study_pack(pack_topic, pack_duration, st.session_state.retriever)
+                st.session_state.current_quiz = pack.quiz
+                st.session_state.current_flashcards = pack.flashcards
+                st.session_state.current_plan = pack.plan
+                st.session_state.current_pack_timings = pack.timings
+            # rerun so the tabs above render the new artifacts
+            st.rerun()
+
+    if "current_pack_timings" in st.session_state:
+        timings = st.session_state.current_pack_timings
+        st.success(f"✅ Pack ready in {timings['total']:.1f}s — see the Quiz, Flashcards and Plan tabs.")
+        st.caption(
+            f"retrieval {timings['retrieval']:.2f}s · quiz {timings['quiz']:.2f}s · "
+            f"flashcards {timings['flashcards']:.2f}s · plan {timings['plan']:.2f}s"
+        )
@@ -0,0 +1,117 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from langchain_core.retrievers import BaseRetriever
+from pydantic import BaseModel, Field
+from day_05_quizzes.generator import agenerate_quiz, generate_quiz
+from day_05_quizzes.models import Quiz
+from day_06_flashcards.generator import agenerate_flashcards, generate_flashcards
+from day_06_flashcards.models import FlashcardSet
+from day_07_planning.models import StudyPlan
+from day_07_planning.planner import agenerate_study_plan, generate_study_plan
+
+T = TypeVar("T")
+
+class StudyPack(BaseModel):
+    """A quiz, flashcards and a study plan generated together for one topic."""
+    topic: str = Field(description="The topic of the pack")
+    quiz: Quiz
+    flashcards: FlashcardSet
+    plan: StudyPlan
+    timings: Dict[str, float] = Field(default_factory=dict, description="Seconds per stage, and in total")
+
+def _timed(generate: Callable[[], T]) -> Tuple[T, float]:
+    start = time.perf_counter()
+    result = generate()
+    return result, time.perf_counter() - start
+
+async def _atimed(generate: Callable[[], Awaitable[T]]) -> Tuple[T, float]:
+    start = time.perf_counter()
+    result = await generate()
+    return result, time.perf_counter() - start
+
+def _assemble_pack(
+    topic: str,
+    start: float,
+    retrieval: float,
+    quiz: Tuple[Quiz, float],
+    flashcards: Tuple[FlashcardSet, float],
+    plan: Tuple[StudyPlan, float],
+) -> StudyPack:
+    """Builds the pack from each generation's (result, seconds)."""
+    return StudyPack(
+        topic=topic,
+        quiz=quiz[0],
+        flashcards=flashcards[0],
+        plan=plan[0],
+        timings={
+            "retrieval": retrieval,
+            "quiz": quiz[1],
+            "flashcards": flashcards[1],
+            "plan": plan[1],
+            "total": time.perf_counter() - start,
+        },
+    )
+
+def generate_study_pack(
+    topic: str, duration: str, retriever: Optional[BaseRetriever] = None, use_cache: bool = True
+) -> StudyPack:
+    """
+    Generates a quiz, flashcards and a study plan for a topic in one go.
+
+    Context is retrieved once and shared; the three structured generations
+    then run concurrently, so the pack takes about as long as the slowest
+    of them rather than their sum.
+
+    Args:
+        topic (str): The topic to study.
+        duration (str): The time available, for the study plan.
+        retriever (Optional[BaseRetriever]): The retriever for context, if any.
+        use_cache (bool): Serve repeated requests from the response cache.
+
+    Returns:
+        StudyPack: All three artifacts, plus per-stage timings.
+    """
+    print(f"\n🎒 Generating study pack for topic: {topic} ({duration})")
+    start = time.perf_counter()
+
+    # 1. retrieve relevant chunks, once for all three artifacts
+    docs, retrieval = None, 0.0
+    if retriever:
+        print("--- Retrieving relevant context ---")
+        docs, retrieval = _timed(lambda: retriever.invoke(topic))
+        print(f"✅ Retrieved {len(docs)} chunks.")
+
+    # 2. fan the generations out; each blocks on its own llm call
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="study-pack") as pool:
+        quiz = pool.submit(_timed, lambda: generate_quiz(topic, use_cache=use_cache, docs=docs))
+        flashcards = pool.submit(_timed, lambda: generate_flashcards(topic, use_cache=use_cache, docs=docs))
+        plan = pool.submit(_timed, lambda: generate_study_plan(topic, duration, use_cache=use_cache, docs=docs))
+        quiz, flashcards, plan = quiz.result(), flashcards.result(), plan.result()
+
+    return _assemble_pack(topic, start, retrieval, quiz, flashcards, plan)
+
+async def agenerate_study_pack(
+    topic: str, duration: str, retriever: Optional[BaseRetriever] = None, use_cache: bool = True
+) -> StudyPack:
+    """Async `generate_study_pack`: the three generations run as concurrent tasks."""
+    print(f"\n🎒 Generating study pack for topic: {topic} ({duration})")
+    start = time.perf_counter()
+
+    # 1. retrieve relevant chunks, once for all three artifacts
+    docs, retrieval = None, 0.0
+    if retriever:
+        print("--- Retrieving relevant context ---")
+        docs, retrieval = await _atimed(lambda: retriever.ainvoke(topic))
+        print(f"✅ Retrieved {len(docs)} chunks.")
+
+    # 2. fan the generations out on the event loop
+    quiz, flashcards, plan = await asyncio.gather(
+        _atimed(lambda: agenerate_quiz(topic, use_cache=use_cache, docs=docs)),
+        _atimed(lambda: agenerate_flashcards(topic, use_cache=use_cache, docs=docs)),
+        _atimed(lambda: agenerate_study_plan(topic, duration, use_cache=use_cache, docs=docs)),
+    )
+
+    return _assemble_pack(topic, start, retrieval, quiz, flashcards, plan)
@@ -0,0 +1,40 @@
+import hashlib
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+from day_03_chunking.faiss_store import FaissStore
+
+class HashEmbeddings(Embeddings):
+    """Deterministic fake embeddings: a random vector seeded by the text's hash. Counts the texts embedded."""
+
+    def __init__(self, dim=32):
+        self.dim = dim
+        self.embedded = 0
+
+    def _embed(self, text):
+        self.embedded += 1
+        seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:4], "little")
+        return np.random.default_rng(seed).standard_normal(self.dim).tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+@pytest.fixture
+def make_embeddings():
+    """HashEmbeddings itself, for tests that need another dimension."""
+    return HashEmbeddings
+
+@pytest.fixture
+def embeddings(make_embeddings):
+    return make_embeddings()
+
+@pytest.fixture
+def make_faiss_store(tmp_path, embeddings):
+    """Opens a FaissStore over the test's embeddings, in `tmp_path` unless given a directory."""
+    def make(directory=None, **kwargs):
+        return FaissStore(embeddings, str(directory or tmp_path), **kwargs)
+    return make
@@ -0,0 +1,79 @@
+import sqlite3
+
+import pytest
+from langchain_core.documents import Document
+from day_03_chunking.bm25_index import MERGE_FACTOR, BM25Index
+
+WORDS = ["photosynthesis", "volcano", "tariff", "sonata", "magma", "piano", "trade", "leaves"]
+
+def make_docs(start, count):
+    # every doc shares "the", so it's a term touched by every batch
+    return [
+        Document(page_content=f"the {WORDS[i % len(WORDS)]} {WORDS[(i * 3) % len(WORDS)]} note{i}")
+        for i in range(start, start + count)
+    ]
+
+def ingest(index, batches, batch_size=10):
+    for b in range(batches):
+        docs = make_docs(b * batch_size, batch_size)
+        index.add_documents(docs, [f"doc{b * batch_size + i}" for i in range(batch_size)])
+
+def segment_rows(path, term):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT segment, doc_ids FROM postings WHERE term = ? ORDER BY segment", (term,)).fetchall()
+
+def test_batches_append_segments_instead_of_rewriting_postings(tmp_path):
+    path = str(tmp_path / "bm25.sqlite")
+    index = BM25Index(path)
+    ingest(index, MERGE_FACTOR - 1)
+    before = segment_rows(path, "the")
+    assert len(before) == MERGE_FACTOR - 1
+
+    index.add_documents(make_docs(1000, 10), [f"more{i}" for i in range(10)])
+    # a full level is merged into one segment
+    merged = segment_rows(path, "the")
+    assert len(merged) == 1
+
+    # the next batch leaves the existing postings untouched
+    index.add_documents(make_docs(2000, 10), [f"later{i}" for i in range(10)])
+    after = segment_rows(path, "the")
+    assert len(after) == 2
+    assert after[0] == merged[0]
+
+def test_segment_count_stays_logarithmic(tmp_path):
+    path = str(tmp_path / "bm25.sqlite")
+    index = BM25Index(path)
+    ingest(index, 100)
+    # at most MERGE_FACTOR - 1 segments per level
+    assert len(segment_rows(path, "the")) <= 3 * (MERGE_FACTOR - 1)
+    assert len(index) == 1000
+
+@pytest.mark.parametrize("postings_cache_size", [0, 4096])
+def test_segmented_index_scores_like_a_single_batch(tmp_path, postings_cache_size):
+    batched = BM25Index(str(tmp_path / "batched.sqlite"), postings_cache_size=postings_cache_size)
+    single = BM25Index(str(tmp_path / "single.sqlite"))
+    deleted = [f"doc{i}" for i in range(0, 300, 7)]
+
+    # warm the cache so appends have to extend cached postings
+    ingest(batched, 10)
+    batched.search("the volcano", k=5)
+    for b in range(10, 30):
+        batched.add_documents(make_docs(b * 10, 10), [f"doc{b * 10 + i}" for i in range(10)])
+    batched.delete(deleted)
+
+    docs, keys = make_docs(0, 300), [f"doc{i}" for i in range(300)]
+    kept = [(d, k) for d, k in zip(docs, keys) if k not in deleted]
+    single.add_documents([d for d, _ in kept], [k for _, k in kept])
+
+    for query in ["the volcano", "piano trade", "note17 magma", "note7"]:
+        expected = single.search(query, k=10)
+        results = batched.search(query, k=10)
+        assert [round(s, 6) for _, s in results] == [round(s, 6) for _, s in expected]
+        assert not {key for key, _ in results} & set(deleted)
+
+def test_reopened_index_reads_its_segments(tmp_path):
+    path = str(tmp_path / "bm25.sqlite")
+    ingest(BM25Index(path), 12)
+    reopened = BM25Index(path)
+    assert len(reopened) == 120
+    assert reopened.search("note42", k=1)[0][0] == "doc42"
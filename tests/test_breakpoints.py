@@ -0,0 +1,150 @@
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_experimental.text_splitter import SemanticChunker
+from day_03_chunking.breakpoints import (
+    EmbeddingsEngine,
+    HashedTfidfEngine,
+    LocalSemanticChunker,
+    adjacent_distances,
+    breakpoint_indices,
+    split_sentences,
+    window_vectors,
+)
+from day_03_chunking.chunker import chunk_documents
+
+# a fixed corpus: blocks of sentences on one topic each, every sentence
+# naming its topic exactly once, with some words of the topic's vocabulary
+TOPICS = {
+    "photosynthesis": ["chlorophyll", "leaves", "sunlight", "glucose", "stomata", "carbon"],
+    "volcano": ["magma", "eruption", "crater", "lava", "ash", "tectonic"],
+    "tariff": ["imports", "customs", "trade", "duties", "exports", "quota"],
+    "sonata": ["allegro", "piano", "movement", "cadence", "tempo", "theme"],
+}
+BLOCKS = [("photosynthesis", 9), ("volcano", 6), ("tariff", 11), ("sonata", 7), ("volcano", 8), ("tariff", 5)]
+
+def build_corpus():
+    sentences, labels = [], []
+    for block, (topic, length) in enumerate(BLOCKS):
+        vocab = TOPICS[topic]
+        for i in range(length):
+            words = [vocab[(block + i * k) % len(vocab)] for k in (1, 2, 3)]
+            sentences.append(f"The {topic} {words[0]} and {words[1]} shaped the {words[2]}.")
+            labels.append(topic)
+    return " ".join(sentences), labels
+
+class TopicCountEmbeddings(Embeddings):
+    """
+    Counts topic names. Each sentence names one topic once, so its vector is
+    one-hot and a window's vector is the sum of its sentences' vectors:
+    embedding the joined window (SemanticChunker) and summing sentence
+    vectors (LocalSemanticChunker) then agree exactly.
+    """
+
+    def _embed(self, text: str):
+        return [float(text.count(topic)) for topic in TOPICS]
+
+    def embed_documents(self, texts):
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+TEXT, LABELS = build_corpus()
+THRESHOLD_TYPES = ["percentile", "standard_deviation", "interquartile", "gradient"]
+# amounts that split this (small, evenly written) corpus; at the defaults
+# every boundary ties with the threshold and nothing is split
+CORPUS_AMOUNTS = {"percentile": 90.0, "standard_deviation": 1.5, "interquartile": 0.5, "gradient": 90.0}
+
+def reference_breakpoints(vectors: np.ndarray, buffer_size: int, threshold_type: str):
+    """The loop SemanticChunker runs, on precomputed sentence vectors."""
+    n = len(vectors)
+    windows = [vectors[max(i - buffer_size, 0):min(i + buffer_size + 1, n)].sum(axis=0) for i in range(n)]
+    distances = []
+    for a, b in zip(windows, windows[1:]):
+        distances.append(1 - float(a @ b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+    chunker = SemanticChunker(TopicCountEmbeddings(), breakpoint_threshold_type=threshold_type)
+    threshold, values = chunker._calculate_breakpoint_threshold(distances)
+    return [i for i, x in enumerate(values) if x > threshold]
+
+def boundaries(chunks):
+    """Sentence indices after which each chunk but the last ends."""
+    ends, total = [], 0
+    for chunk in chunks[:-1]:
+        total += len(split_sentences(chunk))
+        ends.append(total - 1)
+    return ends
+
+@pytest.mark.parametrize("threshold_type", THRESHOLD_TYPES)
+@pytest.mark.parametrize("buffer_size", [0, 1, 2])
+def test_vectorized_breakpoints_match_the_reference_loop(threshold_type, buffer_size):
+    rng = np.random.default_rng(7)
+    vectors = rng.random((60, 16)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    distances = adjacent_distances(window_vectors(vectors, buffer_size))
+    expected = reference_breakpoints(vectors.astype(np.float64), buffer_size, threshold_type)
+    assert breakpoint_indices(distances, threshold_type).tolist() == expected
+
+@pytest.mark.parametrize("threshold_type", THRESHOLD_TYPES)
+def test_local_chunker_matches_semantic_chunker_on_the_corpus(threshold_type):
+    embeddings, amount = TopicCountEmbeddings(), CORPUS_AMOUNTS[threshold_type]
+    previous = SemanticChunker(
+        embeddings, breakpoint_threshold_type=threshold_type, breakpoint_threshold_amount=amount
+    ).split_text(TEXT)
+    local = LocalSemanticChunker(
+        EmbeddingsEngine(embeddings), breakpoint_threshold_type=threshold_type, breakpoint_threshold_amount=amount
+    ).split_text(TEXT)
+    assert len(previous) > 1
+    assert local == previous
+
+def test_hashed_tfidf_chunks_agree_with_semantic_chunker():
+    amount = CORPUS_AMOUNTS["percentile"]
+    previous = boundaries(SemanticChunker(TopicCountEmbeddings(), breakpoint_threshold_amount=amount).split_text(TEXT))
+    chunks = LocalSemanticChunker(HashedTfidfEngine(), breakpoint_threshold_amount=amount).split_text(TEXT)
+    found = boundaries(chunks)
+
+    def near(b, targets):
+        return any(abs(b - t) <= 1 for t in targets)
+
+    # every local boundary is (next to) one the embedding-based chunker makes,
+    # and it finds at least 80% of those
+    assert previous == [i for i in range(len(LABELS) - 1) if LABELS[i] != LABELS[i + 1]]
+    assert all(near(b, previous) for b in found)
+    assert sum(near(b, found) for b in previous) >= 0.8 * len(previous)
+    # nothing is lost or reordered
+    assert "".join(chunks).replace(" ", "") == TEXT.replace(" ", "")
+
+def test_window_sums_dont_drift_on_long_documents():
+    rng = np.random.default_rng(3)
+    vectors = rng.random((200_000, 8)).astype(np.float32)
+    exact = vectors.astype(np.float64)
+    exact[1:] += vectors[:-1]
+    exact[:-1] += vectors[1:]
+    exact /= np.linalg.norm(exact, axis=1, keepdims=True)
+
+    error = np.abs(adjacent_distances(window_vectors(vectors, 1)) - adjacent_distances(exact))
+    assert error.max() < 1e-5
+
+@pytest.mark.parametrize("min_chunk_size, max_chunk_size", [(200, None), (None, 300), (150, 400)])
+def test_chunk_sizes_stay_within_limits(min_chunk_size, max_chunk_size):
+    amount = CORPUS_AMOUNTS["percentile"]
+    chunks = LocalSemanticChunker(
+        HashedTfidfEngine(), breakpoint_threshold_amount=amount,
+        min_chunk_size=min_chunk_size, max_chunk_size=max_chunk_size,
+    ).split_text(TEXT)
+    assert len(chunks) > 1
+    if min_chunk_size is not None:
+        assert all(len(c) >= min_chunk_size for c in chunks[:-1])
+    if max_chunk_size is not None:
+        assert all(len(c) <= max_chunk_size for c in chunks)
+    assert "".join(chunks).replace(" ", "") == TEXT.replace(" ", "")
+
+def test_chunk_documents_passes_size_limits_to_the_local_engine():
+    docs = [Document(page_content=TEXT, metadata={"source": "corpus.txt"})]
+    chunks = chunk_documents(docs, min_chunk_size=150, max_chunk_size=400)
+    assert len(chunks) > 1
+    assert all(len(c.page_content) <= 400 for c in chunks)
+    assert all(len(c.page_content) >= 150 for c in chunks[:-1])
+    assert all(c.metadata == {"source": "corpus.txt"} for c in chunks)
@@ -0,0 +1,113 @@
+import pytest
+from langchain_core.documents import Document
+from day_03_chunking import bulk_ingest as bulk
+from day_03_chunking import pipeline
+
+URL = "https://example.com/notes"
+
+class FakeIndex:
+    def __init__(self, directory, prefix="corpus"):
+        self.persist_directory = str(directory)
+        self.prefix = prefix
+        self.hashes = {}
+        self.ingested = []
+
+    def sources(self):
+        return dict(self.hashes)
+
+    def add_chunks(self, source, chunks, seen):
+        self.ingested.append(source)
+        return [f"{source}-{i}" for i in range(len(chunks))]
+
+    def finish_source(self, source, ids):
+        self.hashes[source] = str(len(ids))
+        return 0
+
+@pytest.fixture
+def corpus(tmp_path, monkeypatch):
+    files = []
+    for i in range(3):
+        path = tmp_path / "docs" / f"note{i}.txt"
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(f"note {i}")
+        files.append(str(path))
+    pages = {URL: "version 1"}
+
+    def iter_load_many(sources, **kwargs):
+        for source in sources:
+            text = pages[source] if source == URL else open(source).read()
+            yield source, [Document(page_content=text, metadata={"source": source})], None
+
+    monkeypatch.setattr(bulk, "iter_load_many", iter_load_many)
+    monkeypatch.setattr(pipeline, "chunk_documents", lambda docs: list(docs))
+    return files + [URL], pages
+
+def test_rerun_skips_finished_sources(tmp_path, corpus):
+    sources, _ = corpus
+    index = FakeIndex(tmp_path / "index")
+    assert bulk.bulk_ingest(sources, index)["ingested"] == 4
+
+    index.ingested.clear()
+    report = bulk.bulk_ingest(sources, index)
+    assert (report["ingested"], report["skipped"]) == (0, 4)
+    assert index.ingested == []
+
+def test_checkpoint_is_per_index(tmp_path, corpus):
+    sources, _ = corpus
+    bulk.bulk_ingest(sources, FakeIndex(tmp_path / "index", prefix="corpus"))
+
+    other = FakeIndex(tmp_path / "index", prefix="corpus-256d")
+    assert bulk.bulk_ingest(sources, other)["ingested"] == 4
+
+def test_sources_missing_from_the_index_are_reingested(tmp_path, corpus):
+    sources, _ = corpus
+    index = FakeIndex(tmp_path / "index")
+    bulk.bulk_ingest(sources, index)
+
+    # e.g. the vector store was wiped but the checkpoint file survived
+    wiped = FakeIndex(tmp_path / "index")
+    assert bulk.bulk_ingest(sources, wiped)["ingested"] == 4
+
+def test_changed_urls_are_refreshed(tmp_path, corpus):
+    sources, pages = corpus
+    index = FakeIndex(tmp_path / "index")
+    bulk.bulk_ingest(sources, index)
+
+    pages[URL] = "version 2"
+    index.ingested.clear()
+    report = bulk.bulk_ingest(sources, index)
+    assert index.ingested == [URL]
+    assert (report["ingested"], report["skipped"]) == (1, 3)
+
+def test_sources_stream_through_the_pipeline_in_batches(tmp_path, monkeypatch):
+    book = str(tmp_path / "book.txt")
+
+    def iter_load_many(sources, **kwargs):
+        for source in sources:
+            yield source, [Document(page_content=f"page {i}", metadata={}) for i in range(20)], None
+
+    monkeypatch.setattr(bulk, "iter_load_many", iter_load_many)
+    monkeypatch.setattr(pipeline, "chunk_documents", lambda docs: list(docs))
+    index = FakeIndex(tmp_path / "index")
+    report = bulk.bulk_ingest([book], index)
+
+    # 8 pages per pipeline batch
+    assert index.ingested == [book] * 3
+    assert report["chunks"] == 20
+    assert index.hashes[book] == "20"
+
+def test_pdf_workers_are_spawned(tmp_path, monkeypatch):
+    from concurrent import futures
+    from day_02_reading import bulk as loading
+
+    contexts = []
+
+    class RecordingPool(futures.ProcessPoolExecutor):
+        def __init__(self, *args, mp_context=None, **kwargs):
+            contexts.append(mp_context.get_start_method())
+            super().__init__(*args, mp_context=mp_context, **kwargs)
+
+    monkeypatch.setattr(loading, "ProcessPoolExecutor", RecordingPool)
+    (result,) = list(loading.iter_load_many([str(tmp_path / "missing.pdf")], max_processes=1))
+    assert contexts == ["spawn"]
+    assert result[1] is None and result[2] is not None
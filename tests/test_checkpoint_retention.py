@@ -0,0 +1,80 @@
+import sqlite3
+import time
+
+from langgraph.checkpoint.base import empty_checkpoint
+from day_08_memory import checkpoint_store
+from day_08_memory.checkpoint_store import CheckpointRetention, PooledSqliteSaver
+
+def test_start_waits_an_interval_before_the_first_pass(tmp_path):
+    retention = CheckpointRetention(str(tmp_path / "checkpoints.sqlite"), interval=0.2)
+    passes = []
+    retention.maintain = lambda: passes.append(time.monotonic())
+
+    started = time.monotonic()
+    retention.start()
+    try:
+        time.sleep(0.1)
+        # nothing (in particular no VACUUM) runs at startup
+        assert passes == []
+        deadline = time.monotonic() + 5
+        while not passes and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert passes and passes[0] - started >= 0.2
+    finally:
+        retention.stop()
+
+def test_stop_before_the_first_pass_runs_nothing(tmp_path):
+    retention = CheckpointRetention(str(tmp_path / "checkpoints.sqlite"), interval=60)
+    passes = []
+    retention.maintain = lambda: passes.append(1)
+    retention.start()
+    retention.stop()
+    assert passes == []
+
+def test_creating_the_saver_and_retention_touches_no_disk(tmp_path):
+    path = tmp_path / "data" / "checkpoints.sqlite"
+    retention = CheckpointRetention(str(path))
+    PooledSqliteSaver(str(path), latency=retention.latency)
+    assert not path.parent.exists()
+
+def test_a_failed_pass_doesnt_stop_the_thread(tmp_path, capsys):
+    retention = CheckpointRetention(str(tmp_path / "checkpoints.sqlite"), interval=0.05)
+    passes = []
+
+    def maintain():
+        passes.append(1)
+        if len(passes) == 1:
+            raise ValueError("bad checkpoint blob")
+
+    retention.maintain = maintain
+    retention.start()
+    try:
+        deadline = time.monotonic() + 5
+        while len(passes) < 2 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert len(passes) >= 2
+    finally:
+        retention.stop()
+    assert "ValueError: bad checkpoint blob" in capsys.readouterr().out
+
+def test_compact_reclaims_incrementally(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint_store, "VACUUM_STEP_PAGES", 8)
+    path = str(tmp_path / "checkpoints.sqlite")
+    saver = PooledSqliteSaver(path)
+    for i in range(200):
+        checkpoint = empty_checkpoint()
+        checkpoint["channel_values"] = {"notes": "x" * 2000}
+        saver.put({"configurable": {"thread_id": f"t{i}", "checkpoint_ns": ""}}, checkpoint, {"step": 0}, {})
+    for i in range(200):
+        saver.delete_thread(f"t{i}")
+    saver.close()
+
+    retention = CheckpointRetention(path)
+    with sqlite3.connect(path) as conn:
+        # the pool created the file with incremental auto-vacuum, so no full VACUUM is needed
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    assert free > 8
+    assert retention.compact() == free
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
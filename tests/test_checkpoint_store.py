@@ -0,0 +1,74 @@
+import asyncio
+
+from langgraph.checkpoint.base import empty_checkpoint
+from day_08_memory import checkpoint_store
+from day_08_memory.checkpoint_store import PooledSqliteSaver
+
+def config(thread_id, ns="", checkpoint_id=None):
+    configurable = {"thread_id": thread_id, "checkpoint_ns": ns}
+    if checkpoint_id is not None:
+        configurable["checkpoint_id"] = checkpoint_id
+    return {"configurable": configurable}
+
+def put_checkpoint(saver, thread_id, ns=""):
+    checkpoint = empty_checkpoint()
+    return saver.put(config(thread_id, ns), checkpoint, {"step": 0}, {})
+
+def committed_writes(saver, thread_id):
+    with saver.pool.connection() as conn:
+        return conn.execute(
+            "SELECT checkpoint_ns, channel FROM writes WHERE thread_id = ? ORDER BY checkpoint_ns", (thread_id,)
+        ).fetchall()
+
+def test_put_only_flushes_its_own_namespace(tmp_path):
+    saver = PooledSqliteSaver(str(tmp_path / "checkpoints.sqlite"))
+    root = put_checkpoint(saver, "t1")
+    child = put_checkpoint(saver, "t1", "child:1")
+    saver.put_writes(root, [("answer", "root")], "task-root")
+    saver.put_writes(child, [("answer", "child")], "task-child")
+
+    # the subgraph's next checkpoint commits its writes, not the parent's
+    put_checkpoint(saver, "t1", "child:1")
+    assert committed_writes(saver, "t1") == [("child:1", "answer")]
+
+    put_checkpoint(saver, "t1")
+    assert committed_writes(saver, "t1") == [("", "answer"), ("child:1", "answer")]
+    saver.close()
+
+def test_delete_thread_leaves_no_buffered_writes_behind(tmp_path):
+    saver = PooledSqliteSaver(str(tmp_path / "checkpoints.sqlite"))
+    root = put_checkpoint(saver, "t1")
+    saver.put_writes(root, [("answer", "root")], "task-root")
+    saver.delete_thread("t1")
+
+    assert saver._pending == {}
+    assert committed_writes(saver, "t1") == []
+    assert saver.get_tuple(config("t1")) is None
+    saver.close()
+
+def test_alist_streams_pages(tmp_path, monkeypatch):
+    monkeypatch.setattr(checkpoint_store, "LIST_PAGE_SIZE", 4)
+    saver = PooledSqliteSaver(str(tmp_path / "checkpoints.sqlite"))
+    for _ in range(10):
+        put_checkpoint(saver, "t1")
+    pages = []
+    list_page = saver.list
+
+    def spy(*args, **kwargs):
+        pages.append(kwargs["limit"])
+        return list_page(*args, **kwargs)
+
+    monkeypatch.setattr(saver, "list", spy)
+
+    async def collect(**kwargs):
+        return [item async for item in saver.alist(config("t1"), **kwargs)]
+
+    items = asyncio.run(collect())
+    expected = [item.config for item in list_page(config("t1"))]
+    assert [item.config for item in items] == expected
+    assert pages == [4, 4, 4]
+
+    pages.clear()
+    assert [item.config for item in asyncio.run(collect(limit=6))] == expected[:6]
+    assert pages == [4, 2]
+    saver.close()
@@ -0,0 +1,70 @@
+import numpy as np
+from langchain_core.documents import Document
+from day_03_chunking import embedding_cache
+from day_03_chunking.embedding_cache import CachedEmbeddings, EmbeddingCache, get_embeddings
+from day_03_chunking.index_manager import IndexManager
+
+TEXTS = [f"note number {i}" for i in range(20)]
+
+def test_unchanged_texts_are_embedded_once(tmp_path, embeddings):
+    path = str(tmp_path / "cache.sqlite")
+    cached = CachedEmbeddings(embeddings, "hash", EmbeddingCache(path))
+    first = cached.embed_documents(TEXTS + TEXTS[:5])
+    assert embeddings.embedded == len(TEXTS)
+
+    # a reopened cache serves every vector without calling the model
+    reopened = CachedEmbeddings(embeddings, "hash", EmbeddingCache(path))
+    # stored as float32
+    np.testing.assert_allclose(reopened.embed_documents(TEXTS), first[:len(TEXTS)], rtol=1e-6)
+    np.testing.assert_allclose(reopened.embed_query(TEXTS[3]), first[3], rtol=1e-6)
+    assert embeddings.embedded == len(TEXTS)
+    assert reopened.cache.stats()["hits"] == len(TEXTS) + 1
+
+def test_reindexing_an_unchanged_corpus_makes_no_embedding_calls(tmp_path, embeddings):
+    cache_path = str(tmp_path / "cache.sqlite")
+    docs = [Document(page_content=text, metadata={"source": f"notes{i % 2}.txt"}) for i, text in enumerate(TEXTS)]
+    index = IndexManager(str(tmp_path / "index"), "corpus", embeddings=CachedEmbeddings(embeddings, "hash", EmbeddingCache(cache_path)))
+    index.sync(docs)
+    assert embeddings.embedded == len(TEXTS)
+
+    # a fresh index over the same texts is filled from the cache
+    rebuilt = IndexManager(str(tmp_path / "rebuilt"), "corpus", embeddings=CachedEmbeddings(embeddings, "hash", EmbeddingCache(cache_path)))
+    assert rebuilt.sync(docs)["added"] == len(TEXTS)
+    assert embeddings.embedded == len(TEXTS)
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"), max_entries=3)
+    cache.put_many("m", ["a", "b", "c"], [[1.0], [2.0], [3.0]])
+    cache.get_many("m", ["a"])
+    cache.put_many("m", ["d"], [[4.0]])
+
+    assert cache.stats()["entries"] == 3
+    assert cache.get_many("m", ["a", "b", "c", "d"]) == [[1.0], None, [3.0], [4.0]]
+    # the cap holds across reopening
+    reopened = EmbeddingCache(cache.path, max_entries=3)
+    reopened.put_many("m", ["e"], [[5.0]])
+    assert reopened.stats()["entries"] == 3
+
+def test_models_and_dimensions_are_cached_separately(tmp_path, make_embeddings):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"))
+    full, short = make_embeddings(dim=32), make_embeddings(dim=8)
+    CachedEmbeddings(full, "text-embedding-3-small", cache).embed_documents(TEXTS)
+    vectors = CachedEmbeddings(short, "text-embedding-3-small@8", cache).embed_documents(TEXTS)
+
+    assert short.embedded == len(TEXTS)
+    assert {len(v) for v in vectors} == {8}
+    assert cache.get_many("text-embedding-3-large", TEXTS[:1]) == [None]
+
+def test_every_caller_shares_one_executor_and_limiter_per_model(tmp_path, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(embedding_cache, "_default_cache", EmbeddingCache(str(tmp_path / "cache.sqlite")))
+    monkeypatch.setattr(embedding_cache, "_shared_embeddings", {})
+
+    full = get_embeddings("text-embedding-3-small")
+    assert get_embeddings("text-embedding-3-small") is full
+    short = get_embeddings("text-embedding-3-small", dimensions=256)
+    other = get_embeddings("text-embedding-3-large")
+    assert short is not full and short.model == "text-embedding-3-small@256"
+    # the api's budgets are per model, whatever the dimensions
+    assert short.underlying.rate_limiter is full.underlying.rate_limiter
+    assert other.underlying.rate_limiter is not full.underlying.rate_limiter
@@ -0,0 +1,151 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from langchain_openai import OpenAIEmbeddings
+from day_03_chunking.embedding_executor import BatchedEmbeddings, RateLimiter
+
+DIMENSIONS = 8
+
+def fake_vector(text: str):
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return [b / 255 for b in digest[:DIMENSIONS]]
+
+class FakeEmbeddingServer:
+    """
+    A local http server speaking the OpenAI embeddings api, with vectors
+    derived from each input's hash. Keep-alive is on, so async clients pool
+    their connections exactly as they would against the real api.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.failures = 0  # the next n requests answer 500
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                if server.failures:
+                    server.failures -= 1
+                    self._reply(500, {"error": {"message": "try again"}})
+                    return
+                server.requests.append(body["input"])
+                self._reply(200, {
+                    "object": "list",
+                    "model": body["model"],
+                    "data": [
+                        {"object": "embedding", "index": i, "embedding": fake_vector(text)}
+                        for i, text in enumerate(body["input"])
+                    ],
+                    "usage": {"prompt_tokens": 1, "total_tokens": 1},
+                })
+
+            def _reply(self, status: int, payload: dict):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self._httpd.server_address[1]}/v1"
+        threading.Thread(target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+    def close(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+class CountingLimiter(RateLimiter):
+    def __init__(self):
+        super().__init__(requests_per_minute=10_000, tokens_per_minute=10_000_000)
+        self.acquired = 0
+
+    async def acquire(self, tokens: int):
+        self.acquired += 1
+        await super().acquire(tokens)
+
+@pytest.fixture
+def server():
+    server = FakeEmbeddingServer()
+    yield server
+    server.close()
+
+@pytest.fixture
+def embeddings(server):
+    underlying = OpenAIEmbeddings(
+        model="text-embedding-3-small",
+        api_key="sk-test",
+        base_url=server.url,
+        check_embedding_ctx_length=False,
+        max_retries=0,
+    )
+    batched = BatchedEmbeddings(underlying, max_texts_per_batch=4, rate_limiter=CountingLimiter(), base_delay=0.01)
+    # one token per word: tiktoken would download its encoding
+    batched._count_tokens = lambda texts: [len(t.split()) for t in texts]
+    return batched
+
+def texts(n: int, prefix: str = "text"):
+    return [f"{prefix} number {i}" for i in range(n)]
+
+def test_batches_respect_size_and_token_bounds(embeddings):
+    embeddings.max_tokens_per_batch = 7
+    batches = embeddings.make_batches(texts(5))
+    assert [len(batch) for _, batch, _ in batches] == [2, 2, 1]
+    assert all(n_tokens <= 7 for _, _, n_tokens in batches)
+    assert [start for start, _, _ in batches] == [0, 2, 4]
+
+def test_embed_documents_keeps_input_order(embeddings, server):
+    inputs = texts(10)
+    assert embeddings.embed_documents(inputs) == [fake_vector(t) for t in inputs]
+    assert len(server.requests) == 3
+
+def test_repeated_sync_calls_on_one_instance_need_no_retries(embeddings, server, capsys):
+    first = embeddings.embed_documents(texts(6, "first"))
+    start = time.perf_counter()
+    second = embeddings.embed_documents(texts(6, "second"))
+    elapsed = time.perf_counter() - start
+
+    assert first == [fake_vector(t) for t in texts(6, "first")]
+    assert second == [fake_vector(t) for t in texts(6, "second")]
+    # two batches per call, and nothing went through the retry path
+    assert len(server.requests) == 4
+    assert "retrying" not in capsys.readouterr().out
+    assert elapsed < 0.5
+
+def test_sync_calls_work_inside_a_running_loop(embeddings):
+    async def call():
+        return embeddings.embed_documents(texts(3))
+
+    assert asyncio.run(call()) == [fake_vector(t) for t in texts(3)]
+
+def test_failed_batches_are_retried(embeddings, server, capsys):
+    server.failures = 1
+    assert embeddings.embed_documents(texts(2)) == [fake_vector(t) for t in texts(2)]
+    assert len(server.requests) == 1
+    assert "retrying" in capsys.readouterr().out
+
+def test_embed_query_goes_through_the_rate_limiter(embeddings):
+    assert embeddings.embed_query("what is a vector") == fake_vector("what is a vector")
+    assert embeddings.rate_limiter.acquired == 1
+
+def test_rate_limiter_waits_for_the_window():
+    limiter = RateLimiter(requests_per_minute=2, tokens_per_minute=1_000, window_seconds=0.2)
+
+    async def three():
+        start = time.perf_counter()
+        for _ in range(3):
+            await limiter.acquire(1)
+        return time.perf_counter() - start
+
+    assert asyncio.run(three()) >= 0.15
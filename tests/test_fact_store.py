@@ -0,0 +1,88 @@
+import os
+import subprocess
+import sys
+import textwrap
+from concurrent.futures import ThreadPoolExecutor
+
+from day_08_memory.fact_store import FactStore
+from day_08_memory.semantic import SemanticMemory
+
+def test_repeated_facts_are_stored_once(tmp_path):
+    store = FactStore(str(tmp_path / "facts.sqlite"))
+    assert store.add("alice", ["likes chess", "likes chess ", "studies physics"]) == ["likes chess", "studies physics"]
+    assert store.add("alice", ["likes chess", "plays piano"]) == ["plays piano"]
+    # dedup is per namespace
+    assert store.add("bob", ["likes chess"]) == ["likes chess"]
+    assert store.count("alice") == 3
+    assert [fact for _, fact in store.since("alice")] == ["likes chess", "studies physics", "plays piano"]
+
+def test_concurrent_adds_from_threads(tmp_path):
+    store = FactStore(str(tmp_path / "facts.sqlite"))
+
+    def add(worker):
+        # neighbouring workers overlap on half their facts
+        return store.add("alice", [f"fact {i}" for i in range(worker * 25, worker * 25 + 50)])
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        added = [fact for facts in pool.map(add, range(8)) for fact in facts]
+    assert sorted(added) == sorted(f"fact {i}" for i in range(7 * 25 + 50))
+    assert store.count("alice") == 7 * 25 + 50
+
+def test_concurrent_adds_from_another_process(tmp_path):
+    path = str(tmp_path / "facts.sqlite")
+    store = FactStore(path)
+    script = textwrap.dedent(
+        f"""
+        from day_08_memory.fact_store import FactStore
+        store = FactStore({path!r})
+        for i in range(0, 200, 2):
+            store.add("alice", [f"fact {{i}}", f"fact {{i + 1}}"])
+        """
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    child = subprocess.Popen([sys.executable, "-c", script], cwd=root)
+    # both processes write the same facts, one transaction at a time
+    for i in range(0, 200, 2):
+        store.add("alice", [f"fact {i + 1}", f"fact {i}"])
+    assert child.wait(timeout=60) == 0
+
+    assert store.count("alice") == 200
+    assert sorted(fact for _, fact in store.since("alice")) == sorted(f"fact {i}" for i in range(200))
+
+def test_compacts_every_n_writes(tmp_path):
+    store = FactStore(str(tmp_path / "facts.sqlite"), compact_every=3)
+    compactions = []
+    compact = store.compact
+    store.compact = lambda: compactions.append(compact())
+
+    for i in range(7):
+        store.add("alice", [f"fact {i}"])
+    assert len(compactions) == 2
+
+def test_compact_reclaims_forgotten_facts(tmp_path):
+    store = FactStore(str(tmp_path / "facts.sqlite"), compact_every=10_000)
+    facts = [f"fact {i} " + "x" * 500 for i in range(2000)]
+    store.add("alice", facts)
+    store.forget("alice", facts)
+    assert store.stats()["wal_bytes"] > 0
+
+    store.compact()
+    stats = store.stats()
+    assert stats["facts"] == 0 and stats["wal_bytes"] == 0
+    assert store._conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+
+def test_forget_bumps_the_epoch_and_readers_reload(tmp_path):
+    path = str(tmp_path / "facts.sqlite")
+    store = FactStore(path)
+    reader = SemanticMemory(FactStore(path), "alice", legacy_json_path=None)
+    store.add("alice", ["likes chess", "studies physics"])
+    assert reader.get_all_facts() == ["likes chess", "studies physics"]
+
+    assert store.forget("alice", ["likes chess", "never stored"]) == 1
+    assert store.epoch("alice") == 1 and store.epoch("bob") == 0
+    # the reader notices the epoch change and reloads instead of appending
+    assert reader.get_all_facts() == ["studies physics"]
+
+    # forgetting nothing leaves the epoch alone
+    store.forget("alice", ["never stored"])
+    assert store.epoch("alice") == 1
@@ -0,0 +1,88 @@
+import pytest
+
+TEXTS = [f"note number {i}" for i in range(400)]
+
+def _saved_store(make_faiss_store, index_type):
+    store = make_faiss_store(index_type=index_type, nlist=4)
+    store.add_texts(TEXTS, ids=[str(i) for i in range(len(TEXTS))])
+    store.save()
+    resident = store.memory_bytes()
+    return resident
+
+@pytest.mark.parametrize("index_type", ["flat", "hnsw", "ivf"])
+def test_reopened_index_is_mmapped(make_faiss_store, index_type):
+    in_memory = _saved_store(make_faiss_store, index_type)
+    reopened = make_faiss_store(index_type=index_type, nlist=4)
+    assert reopened._mmapped
+    # the vector codes stay in the file; only the rest counts as resident
+    assert 0 < reopened._mapped_bytes() <= in_memory
+    assert reopened.memory_bytes() == in_memory - reopened._mapped_bytes()
+    assert reopened.similarity_search("note number 7", k=1)[0].page_content == "note number 7"
+
+def test_write_after_reopen_loads_into_memory(make_faiss_store):
+    _saved_store(make_faiss_store, "flat")
+    reopened = make_faiss_store(index_type="flat")
+    reopened.add_texts(["a new note"], ids=["new"])
+    assert not reopened._mmapped
+    assert reopened.similarity_search("a new note", k=1)[0].page_content == "a new note"
+
+def _spy_on_search(monkeypatch, store):
+    requested = []
+    search = store._index.search
+
+    def spy(x, k, **kwargs):
+        requested.append(k)
+        return search(x, k, **kwargs)
+
+    monkeypatch.setattr(store._index, "search", spy)
+    return requested
+
+def test_hnsw_tombstones_are_filtered_inside_the_search(make_faiss_store, monkeypatch):
+    store = make_faiss_store(index_type="hnsw")
+    store.add_texts(TEXTS, ids=[str(i) for i in range(len(TEXTS))])
+    deleted = [str(i) for i in range(0, len(TEXTS), 4)]
+    store.delete(deleted)
+    requested = _spy_on_search(monkeypatch, store)
+
+    results = store.similarity_search("note number 8", k=5)
+    # one candidate per requested hit, however many tombstones there are
+    assert requested == [5]
+    assert len(results) == 5
+    assert not {doc.id for doc in results} & set(deleted)
+
+def test_reopened_hnsw_keeps_filtering_tombstones(make_faiss_store, monkeypatch):
+    _saved_store(make_faiss_store, "hnsw")
+    store = make_faiss_store(index_type="hnsw")
+    deleted = [str(i) for i in range(0, len(TEXTS), 10)]
+    store.delete(deleted)
+    store.save()
+
+    reopened = make_faiss_store(index_type="hnsw")
+    # below the tombstone ratio, so save kept them in the index
+    assert reopened._index.ntotal == len(TEXTS)
+    requested = _spy_on_search(monkeypatch, reopened)
+    results = reopened.similarity_search("note number 10", k=5)
+    assert requested == [5]
+    assert len(results) == 5
+    assert not {doc.id for doc in results} & set(deleted)
+
+def test_concurrent_searches_after_deletes(make_faiss_store, embeddings):
+    from concurrent.futures import ThreadPoolExecutor
+
+    texts = [f"note number {i}" for i in range(3000)]
+    store = make_faiss_store(index_type="hnsw")
+    store.add_texts(texts, ids=[str(i) for i in range(len(texts))])
+    deleted = {str(i) for i in range(0, len(texts), 3)}
+    store.delete(list(deleted))
+    queries = embeddings.embed_documents(texts[:64])
+
+    def search(worker):
+        found = set()
+        for n in range(300):
+            found.update(doc.id for doc in store.similarity_search_by_vector(queries[(worker + n) % len(queries)], k=5))
+        return found
+
+    # every search gets its own params; sharing one crashed inside faiss
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        found = set().union(*pool.map(search, range(16)))
+    assert found and not found & deleted
@@ -0,0 +1,76 @@
+import pytest
+from langchain_core.documents import Document
+from day_03_chunking.index_manager import IndexManager
+
+def make_docs(source, count):
+    # one term per source ("note from bsource 2"), so BM25 finds exactly its chunks
+    stem = source.split(".")[0]
+    return [Document(page_content=f"note from {stem}source {i}", metadata={"source": source}) for i in range(count)]
+
+def dense_ids(index):
+    if index.dense_backend == "faiss":
+        return index.vectorstore.ids()
+    return set(index.vectorstore.get()["ids"])
+
+def sparse_ids(index, query):
+    return {key for key, _ in index.bm25.search(query, k=100)}
+
+@pytest.fixture(params=["chroma", "faiss"])
+def open_index(request, tmp_path, embeddings):
+    def open_index():
+        return IndexManager(str(tmp_path / "index"), "corpus_test", embeddings=embeddings, dense_backend=request.param)
+    return open_index
+
+def test_resyncing_the_same_docs_adds_nothing(open_index, embeddings):
+    docs = make_docs("a.txt", 5) + make_docs("b.txt", 3)
+    index = open_index()
+    assert index.sync(docs) == {"added": 8, "removed": 0, "unchanged": 0}
+    embedded = embeddings.embedded
+
+    assert index.sync(docs) == {"added": 0, "removed": 0, "unchanged": 8}
+    assert open_index().sync(docs) == {"added": 0, "removed": 0, "unchanged": 8}
+    assert embeddings.embedded == embedded
+    assert len(dense_ids(index)) == index.count() == 8
+
+def test_dropped_source_leaves_both_indexes(open_index):
+    index = open_index()
+    index.sync(make_docs("a.txt", 5) + make_docs("b.txt", 3))
+    b_ids = sparse_ids(index, "bsource")
+    assert len(b_ids) == 3
+
+    assert index.sync(make_docs("a.txt", 5)) == {"added": 0, "removed": 3, "unchanged": 5}
+    assert not sparse_ids(index, "bsource")
+    assert not dense_ids(index) & b_ids
+    assert set(index.sources()) == {"a.txt"}
+    # prune=False keeps sources that aren't passed
+    index.sync(make_docs("b.txt", 3), prune=False)
+    assert index.sync(make_docs("c.txt", 1), prune=False)["removed"] == 0
+    assert index.count() == 9
+
+def test_changed_chunk_is_replaced(open_index, embeddings):
+    index = open_index()
+    docs = make_docs("a.txt", 5)
+    index.sync(docs)
+    old_ids = dense_ids(index)
+    embedded = embeddings.embedded
+
+    docs[2] = Document(page_content="a rewritten note", metadata={"source": "a.txt"})
+    assert index.sync(docs) == {"added": 1, "removed": 1, "unchanged": 4}
+    assert embeddings.embedded == embedded + 1
+    new_ids = dense_ids(index)
+    assert len(new_ids) == 5 and len(new_ids - old_ids) == 1
+    assert sparse_ids(index, "rewritten") == new_ids - old_ids
+
+def test_reopened_faiss_index_reconciles_with_the_manifest(tmp_path, embeddings):
+    directory = str(tmp_path / "index")
+    index = IndexManager(directory, "corpus_test", embeddings=embeddings, dense_backend="faiss")
+    index.sync(make_docs("a.txt", 5))
+    ids = sorted(dense_ids(index))
+    # as if the process died between the manifest commit and the faiss save
+    index.vectorstore.delete(ids=ids[:2])
+    index.vectorstore.add_texts(["orphan chunk"], ids=["orphan"])
+    index.vectorstore.save()
+
+    reopened = IndexManager(directory, "corpus_test", embeddings=embeddings, dense_backend="faiss")
+    assert dense_ids(reopened) == set(ids)
+    assert reopened.vectorstore.similarity_search("note from asource 0", k=1)[0].page_content == "note from asource 0"
@@ -0,0 +1,56 @@
+import threading
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+from day_04_explanation import llm
+from day_04_explanation.llm import get_chain, get_chat_model, get_http_client
+
+@pytest.fixture(autouse=True)
+def fresh_registries(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    monkeypatch.setattr(llm, "_models", {})
+    monkeypatch.setattr(llm, "_chains", {})
+
+def test_chat_models_are_shared_per_settings():
+    model = get_chat_model(temperature=0)
+    assert get_chat_model(temperature=0) is model
+    assert get_chat_model(temperature=0.7) is not model
+    assert get_chat_model(temperature=0, max_tokens=100) is not model
+    assert get_chat_model(temperature=0, max_tokens=100) is get_chat_model(temperature=0, max_tokens=100)
+    # every model talks through one pooled client
+    assert model.http_client is get_http_client()
+    assert get_chat_model(temperature=0.7).http_client is get_http_client()
+
+def test_chains_are_built_once_per_name():
+    builds = []
+
+    def build(name):
+        def build_chain():
+            builds.append(name)
+            return RunnableLambda(lambda x: f"{name}: {x}")
+        return build_chain
+
+    quiz = get_chain("quiz", build("quiz"))
+    assert get_chain("quiz", build("quiz")) is quiz
+    flashcards = get_chain("flashcards", build("flashcards"))
+    assert flashcards is not quiz
+    assert builds == ["quiz", "flashcards"]
+    assert quiz.invoke("x") == "quiz: x"
+
+def test_racing_first_uses_get_one_chain():
+    barrier = threading.Barrier(8)
+    chains = []
+
+    def build_chain():
+        return RunnableLambda(lambda x: x)
+
+    def use():
+        barrier.wait()
+        chains.append(get_chain("explanation", build_chain))
+
+    threads = [threading.Thread(target=use) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(chain) for chain in chains}) == 1
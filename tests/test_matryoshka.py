@@ -0,0 +1,39 @@
+import numpy as np
+from langchain_core.documents import Document
+from day_03_chunking.index_manager import IndexManager
+from day_03_chunking.matryoshka import TruncatedEmbeddings, rerank_by_vectors, truncate_vectors
+from day_03_chunking.retriever import build_hybrid_retriever
+
+TEXTS = [f"note number {i}" for i in range(50)]
+
+def test_truncated_vectors_are_renormalized(embeddings):
+    truncated = TruncatedEmbeddings(embeddings, 8)
+    vectors = np.asarray(truncated.embed_documents(TEXTS[:5]))
+    assert vectors.shape == (5, 8)
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-6)
+
+    full = np.asarray(embeddings.embed_query(TEXTS[0]))
+    expected = full[:8] / np.linalg.norm(full[:8])
+    np.testing.assert_allclose(truncated.embed_query(TEXTS[0]), expected, rtol=1e-5)
+    # a zero vector stays zero instead of dividing by zero
+    assert truncate_vectors([[0.0, 0.0, 1.0]], 2).tolist() == [[0.0, 0.0]]
+
+def test_rerank_by_vectors_orders_by_cosine():
+    docs = [Document(page_content=t) for t in ("a", "b", "c")]
+    vectors = [[1.0, 0.0], [0.6, 0.8], [10.0, 1.0]]
+    assert [d.page_content for d in rerank_by_vectors([1.0, 0.0], docs, vectors, 2)] == ["a", "c"]
+    assert rerank_by_vectors([1.0, 0.0], [], [], 2) == []
+
+def test_full_dimension_rerank_uses_the_untruncated_embeddings(tmp_path, embeddings):
+    index = IndexManager(str(tmp_path / "index"), "corpus", embeddings=embeddings, dense_backend="faiss", embedding_dimensions=8)
+    index.sync([Document(page_content=t, metadata={"source": "notes.txt"}) for t in TEXTS])
+
+    plain = build_hybrid_retriever(index, k=3)
+    assert plain.rerank_embeddings is None
+    reranking = build_hybrid_retriever(index, k=3, full_dimension_rerank=True)
+    assert reranking.rerank_embeddings is embeddings
+    assert reranking._dense_k() == 3 * reranking.rerank_factor
+
+    # the dense leg re-orders its candidates by the full vectors
+    docs, *_ = reranking._dense_leg("note number 17")
+    assert len(docs) == 3 and docs[0].page_content == "note number 17"
@@ -0,0 +1,57 @@
+from day_08_memory.fact_store import FactStore
+from day_08_memory.semantic import DEFAULT_NAMESPACE
+from day_08_memory.shards import MemoryShards, namespace_from_config
+
+def _shards(tmp_path, embeddings, memory_cap):
+    return MemoryShards(FactStore(str(tmp_path / "facts.sqlite")), memory_cap=memory_cap, embeddings=embeddings)
+
+def _load(shards, namespace):
+    memory = shards.get(namespace)
+    memory.get_all_facts()
+    return memory
+
+def test_each_user_gets_their_own_shard(tmp_path, embeddings):
+    shards = _shards(tmp_path, embeddings, memory_cap=1 << 30)
+    alice = shards.for_config({"configurable": {"user_id": "alice"}})
+    bob = shards.for_config({"configurable": {"user_id": "bob"}})
+    alice.save_facts(["likes chess"])
+    bob.save_facts(["studies physics"])
+
+    assert alice.get_all_facts() == ["likes chess"]
+    assert bob.get_all_facts() == ["studies physics"]
+    assert shards.get("alice") is alice
+    assert namespace_from_config(None) == namespace_from_config({"configurable": {}}) == DEFAULT_NAMESPACE
+    assert shards.stats()["loads"] == 2 and shards.stats()["hits"] == 1
+
+def test_least_recently_used_shards_are_evicted(tmp_path, embeddings):
+    shards = _shards(tmp_path, embeddings, memory_cap=1 << 30)
+    for user in ("alice", "bob", "carol"):
+        shards.get(user).save_facts([f"{user} fact {i}" for i in range(50)])
+    per_shard = _load(shards, "alice").memory_bytes()
+    # room for two loaded shards
+    shards.memory_cap = 2 * per_shard + per_shard // 2
+
+    alice = _load(shards, "alice")
+    _load(shards, "bob")
+    # alice becomes the most recently used, so bob is the idle one
+    shards.get("alice")
+    _load(shards, "carol")
+    stats = shards.stats()
+    assert stats["shards"] == 2 and stats["evictions"] == 1
+    assert list(shards._shards) == ["alice", "carol"]
+    assert shards.get("alice") is alice
+
+    # an evicted shard comes back with its facts from the store, and is
+    # counted once loaded: now carol is the least recently used
+    bob = _load(shards, "bob")
+    assert bob.get_all_facts() == [f"bob fact {i}" for i in range(50)]
+    assert shards.stats()["evictions"] == 2
+    assert list(shards._shards) == ["alice", "bob"]
+
+def test_the_newest_shard_is_kept_over_the_cap(tmp_path, embeddings):
+    shards = _shards(tmp_path, embeddings, memory_cap=0)
+    shards.get("alice").save_facts(["likes chess"])
+    _load(shards, "alice")
+    memory = _load(shards, "bob")
+    assert list(shards._shards) == ["bob"]
+    assert shards.get("bob") is memory
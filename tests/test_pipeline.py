@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+from langchain_core.documents import Document
+from day_03_chunking import pipeline
+
+class FakeIndex:
+    def __init__(self, fail_after=None):
+        self.added = []
+        self.fail_after = fail_after
+
+    def add_chunks(self, name, chunks, seen):
+        if self.fail_after is not None and len(self.added) >= self.fail_after:
+            raise RuntimeError("index is down")
+        self.added.extend(chunks)
+        return [f"{name}-{len(self.added) - len(chunks) + i}" for i in range(len(chunks))]
+
+    def finish_source(self, name, ids):
+        return 0
+
+    def prune(self, keep):
+        return 0
+
+@pytest.fixture
+def pages(monkeypatch):
+    closed = threading.Event()
+
+    def iter_load(source):
+        try:
+            for i in range(200):
+                yield Document(page_content=f"page {i}", metadata={})
+        finally:
+            closed.set()
+
+    monkeypatch.setattr(pipeline.DocumentLoader, "iter_load", staticmethod(iter_load))
+    monkeypatch.setattr(pipeline, "chunk_documents", lambda batch: list(batch))
+    return closed
+
+def stage_threads():
+    return [t for t in threading.enumerate() if t.name != "MainThread" and t.is_alive()]
+
+def test_pipeline_indexes_every_page(pages):
+    index = FakeIndex()
+    stats = pipeline.run_ingestion_pipeline("doc.pdf", index, pages_per_batch=8)
+    assert stats["pages"] == stats["chunks"] == len(index.added) == 200
+    assert pages.is_set()
+
+def test_failed_indexing_stops_the_stages_and_closes_the_source(pages):
+    before = set(stage_threads())
+    with pytest.raises(RuntimeError, match="index is down"):
+        pipeline.run_ingestion_pipeline("doc.pdf", FakeIndex(fail_after=8), pages_per_batch=8)
+    assert set(stage_threads()) <= before
+    assert pages.is_set()
+
+def test_failed_chunking_reaches_the_caller(pages, monkeypatch):
+    def chunk_documents(batch):
+        raise ValueError("bad page")
+
+    monkeypatch.setattr(pipeline, "chunk_documents", chunk_documents)
+    before = set(stage_threads())
+    with pytest.raises(ValueError, match="bad page"):
+        pipeline.run_ingestion_pipeline("doc.pdf", FakeIndex(), pages_per_batch=8)
+    assert set(stage_threads()) <= before
+    assert pages.is_set()
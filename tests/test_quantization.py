@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from day_03_chunking import faiss_store
+
+TEXTS = [f"note number {i}" for i in range(400)]
+
+@pytest.fixture(autouse=True)
+def small_training_sets(monkeypatch):
+    # the real minimums take thousands of vectors to reach
+    monkeypatch.setattr(faiss_store, "QUANTIZE_MIN_TRAIN", {"sq8": 100, "pq": 300})
+
+@pytest.mark.parametrize("quantization", ["sq8", "pq"])
+@pytest.mark.parametrize("index_type", ["flat", "hnsw"])
+def test_codes_are_trained_then_added(make_faiss_store, index_type, quantization):
+    store = make_faiss_store(index_type=index_type, quantization=quantization)
+    store.add_texts(TEXTS, ids=[str(i) for i in range(len(TEXTS))])
+    assert store._is_quantized()
+    assert store._inner().is_trained and store._index.ntotal == len(TEXTS)
+
+    # quantized scores are approximate; re-ranking against the float vectors makes them exact
+    doc, score = store.similarity_search_with_score("note number 7", k=1)[0]
+    assert doc.page_content == "note number 7"
+    assert score == pytest.approx(1.0, abs=1e-5)
+
+def test_reranking_rescores_candidates_exactly(make_faiss_store, embeddings):
+    store = make_faiss_store(quantization="pq")
+    store.add_texts(TEXTS, ids=[str(i) for i in range(len(TEXTS))])
+    query = embeddings.embed_query("what about note 7")
+    vectors = np.asarray(embeddings.embed_documents(TEXTS))
+    exact = vectors @ query / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(query))
+
+    reranked = store.similarity_search_with_score_by_vector(query, k=5)
+    assert [int(doc.id) for doc, _ in reranked] == list(np.argsort(-exact)[:5])
+    np.testing.assert_allclose([s for _, s in reranked], np.sort(exact)[::-1][:5], rtol=1e-4)
+
+    store.rerank_factor = 0
+    approximate = [s for _, s in store.similarity_search_with_score_by_vector(query, k=5)]
+    assert not np.allclose(approximate, np.sort(exact)[::-1][:5], rtol=1e-4)
+
+def test_small_store_stays_float_until_it_can_train(make_faiss_store):
+    store = make_faiss_store(quantization="sq8")
+    store.add_texts(TEXTS[:50], ids=[str(i) for i in range(50)])
+    assert not store._is_quantized()
+
+    store.add_texts(TEXTS[50:150], ids=[str(i) for i in range(50, 150)])
+    store.save()
+    assert store._is_quantized() and store._index.ntotal == 150
+
+def test_reopened_quantized_index_keeps_codes_and_reranks(make_faiss_store):
+    store = make_faiss_store(index_type="hnsw", quantization="sq8")
+    store.add_texts(TEXTS, ids=[str(i) for i in range(len(TEXTS))])
+    store.save()
+
+    reopened = make_faiss_store(index_type="hnsw", quantization="sq8")
+    assert reopened._mmapped and reopened._is_quantized()
+    doc, score = reopened.similarity_search_with_score("note number 42", k=1)[0]
+    assert doc.page_content == "note number 42"
+    assert score == pytest.approx(1.0, abs=1e-5)
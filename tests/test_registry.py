@@ -0,0 +1,109 @@
+import gc
+import os
+import time
+
+import pytest
+from langchain_core.documents import Document
+from day_03_chunking.index_manager import IndexManager
+from day_03_chunking.registry import RetrieverRegistry
+
+class FakeIndex:
+    def __init__(self, size):
+        self.size = size
+        self.destroyed = False
+
+    def memory_estimate(self):
+        return self.size
+
+    def destroy(self):
+        self.destroyed = True
+
+def test_evicted_index_is_destroyed():
+    registry = RetrieverRegistry(memory_budget=150)
+    indexes = {}
+
+    def builder(key):
+        def build():
+            indexes[key] = FakeIndex(100)
+            return object(), indexes[key]
+        return build
+
+    first = registry.acquire("a", builder("a"))
+    second = registry.acquire("b", builder("b"))
+    # still referenced, so nothing is evicted over budget
+    assert not indexes["a"].destroyed
+
+    first.release()
+    assert indexes["a"].destroyed
+    assert not indexes["b"].destroyed
+    assert registry.stats()["evictions"] == 1
+
+    # the corpus coming back is built again
+    again = registry.acquire("a", builder("a"))
+    assert not indexes["a"].destroyed
+    assert registry.stats()["builds"] == 3
+    again.release()
+    second.release()
+
+def test_collected_lease_is_released_without_taking_the_lock():
+    registry = RetrieverRegistry(memory_budget=50)
+    index = FakeIndex(100)
+    lease = registry.acquire("a", lambda: (object(), index))
+
+    with registry._lock:
+        # gc on a thread that holds the lock must not deadlock
+        del lease
+        gc.collect()
+    assert not index.destroyed
+
+    # the queued release is applied by the next registry call
+    registry.release("missing")
+    assert index.destroyed
+    assert registry.stats()["refs"] == 0
+
+def test_evicted_index_is_destroyed_outside_the_lock():
+    registry = RetrieverRegistry(memory_budget=50)
+    locked_during_destroy = []
+
+    class LockCheckingIndex(FakeIndex):
+        def destroy(self):
+            locked_during_destroy.append(registry._lock.locked())
+            super().destroy()
+
+    registry.acquire("a", lambda: (object(), LockCheckingIndex(100))).release()
+    assert locked_during_destroy == [False]
+    assert "a" not in registry._building
+
+@pytest.mark.parametrize("backend", ["chroma", "faiss"])
+def test_destroy_deletes_index_files(tmp_path, embeddings, backend):
+    directory = str(tmp_path / "index")
+    index = IndexManager(directory, "corpus_test", embeddings=embeddings, dense_backend=backend)
+    index.sync([Document(page_content=f"note {i}", metadata={"source": "notes.txt"}) for i in range(5)])
+    index.destroy()
+
+    assert not [f for f in os.listdir(directory) if f.startswith(index.prefix)]
+    reopened = IndexManager(directory, "corpus_test", embeddings=embeddings, dense_backend=backend)
+    assert reopened.count() == 0
+    assert reopened.vectorstore.similarity_search("note 1", k=5) == []
+
+def test_shared_retriever_reports_timings_per_call(make_faiss_store, embeddings):
+    from concurrent.futures import ThreadPoolExecutor
+    from langchain_core.retrievers import BaseRetriever
+    from day_03_chunking.retriever import HybridRetriever, last_retrieval_timings
+
+    class SlowSparse(BaseRetriever):
+        def _get_relevant_documents(self, query, *, run_manager):
+            time.sleep(0.05 if query == "slow" else 0.0)
+            return []
+
+    store = make_faiss_store()
+    store.add_texts([f"note {i}" for i in range(10)])
+    shared = HybridRetriever(sparse_retriever=SlowSparse(), vectorstore=store, embeddings=embeddings)
+
+    def query(text):
+        shared.invoke(text)
+        return last_retrieval_timings()["sparse"]
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        slow, fast = pool.map(query, ["slow", "fast"])
+    assert slow >= 0.05 > fast
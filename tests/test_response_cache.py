@@ -0,0 +1,105 @@
+import zlib
+from collections import Counter
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+from pydantic import BaseModel
+from day_04_explanation import response_cache
+from day_04_explanation.response_cache import DEFAULT_SIMILARITY_THRESHOLD, ResponseCache, context_fingerprint, key_terms
+
+class TrigramEmbeddings(Embeddings):
+    """Hashed character trigram counts: near-identical strings score close to 1."""
+
+    def embed_query(self, text):
+        vector = np.zeros(256)
+        for gram, count in Counter(text[i:i + 3] for i in range(len(text) - 2)).items():
+            vector[zlib.crc32(gram.encode()) % 256] += count
+        return vector.tolist()
+
+    def embed_documents(self, texts):
+        return [self.embed_query(t) for t in texts]
+
+def _similarity(a, b):
+    a, b = np.asarray(a), np.asarray(b)
+    return a @ b / (np.linalg.norm(a) * np.linalg.norm(b))
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(str(tmp_path / "cache.sqlite"), embeddings=TrigramEmbeddings())
+
+def test_near_miss_topics_without_context_dont_collide(cache):
+    embeddings = TrigramEmbeddings()
+    # similar enough that a semantic lookup would serve one for the other
+    assert _similarity(embeddings.embed_query("world war i"), embeddings.embed_query("world war ii")) > DEFAULT_SIMILARITY_THRESHOLD
+
+    empty = context_fingerprint([])
+    first = cache.get_or_compute("explain", "World War I", empty, {}, lambda: "1914-1918")
+    second = cache.get_or_compute("explain", "World War II", empty, {}, lambda: "1939-1945")
+    assert (first, second) == ("1914-1918", "1939-1945")
+    # the exact prompt still hits
+    assert cache.get_or_compute("explain", "world war ii?", empty, {}, lambda: "recomputed") == "1939-1945"
+    assert cache.stats()["semantic_hits"] == 0
+    assert cache.stats()["exact_hits"] == 1
+
+def test_similar_prompts_hit_within_a_context(cache):
+    context = context_fingerprint(["The Treaty of Versailles ended the war in 1919."])
+    cache.get_or_compute("explain", "when did the war end", context, {}, lambda: "1919")
+    assert cache.get_or_compute("explain", "when did the war end then", context, {}, lambda: "recomputed") == "1919"
+    assert cache.stats()["semantic_hits"] == 1
+
+@pytest.mark.parametrize("first, second", [
+    ("Summarize the causes of World War I", "Summarize the causes of World War II"),
+    ("Summarize chapter 3 of the course textbook for me", "Summarize chapter 4 of the course textbook for me"),
+])
+def test_near_miss_topics_within_a_context_dont_collide(cache, first, second):
+    embeddings = TrigramEmbeddings()
+    assert _similarity(
+        embeddings.embed_query(first.lower()), embeddings.embed_query(second.lower())
+    ) > DEFAULT_SIMILARITY_THRESHOLD
+
+    context = context_fingerprint(["The twentieth century saw two world wars, each told in its own chapter."])
+    assert cache.get_or_compute("explain", first, context, {}, lambda: "first") == "first"
+    assert cache.get_or_compute("explain", second, context, {}, lambda: "second") == "second"
+    assert cache.stats()["semantic_hits"] == 0
+    # a rephrasing with the same numeral still hits semantically
+    assert cache.get_or_compute("explain", f"{second} now", context, {}, lambda: "recomputed") == "second"
+    assert cache.stats()["semantic_hits"] == 1
+
+def test_first_person_prompts_still_hit_semantically(cache):
+    embeddings = TrigramEmbeddings()
+    cached, asked = "could you get a summary of photosynthesis", "could I get a summary of photosynthesis"
+    assert _similarity(embeddings.embed_query(cached), embeddings.embed_query(asked.lower())) > DEFAULT_SIMILARITY_THRESHOLD
+
+    context = context_fingerprint(["Photosynthesis turns light into sugar."])
+    cache.get_or_compute("explain", cached, context, {}, lambda: "light into sugar")
+    # the pronoun "i" isn't a numeral, so it doesn't block the hit
+    assert cache.get_or_compute("explain", asked, context, {}, lambda: "recomputed") == "light into sugar"
+    assert cache.stats()["semantic_hits"] == 1
+
+@pytest.mark.parametrize("prompt, terms", [
+    ("can i get a summary of cd burning", set()),
+    ("mix the civil war notes", set()),
+    ("world war i", {"i"}),
+    ("world war ii", {"ii"}),
+    ("chapter iv and part 2", {"iv", "2"}),
+    ("summarize section xii", {"xii"}),
+])
+def test_key_terms_are_numerals(prompt, terms):
+    assert key_terms(prompt) == terms
+
+def test_json_schema_is_built_once(monkeypatch):
+    class Answer(BaseModel):
+        text: str
+
+    calls = []
+    original = Answer.model_json_schema.__func__
+
+    def counting(cls, *args, **kwargs):
+        calls.append(cls)
+        return original(cls, *args, **kwargs)
+
+    monkeypatch.setattr(Answer, "model_json_schema", classmethod(counting))
+    for _ in range(3):
+        assert response_cache._with_schema({"model": "m"}, Answer)["schema"]["title"] == "Answer"
+    assert len(calls) == 1
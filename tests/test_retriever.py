@@ -0,0 +1,85 @@
+import asyncio
+import threading
+from typing import List
+
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from day_03_chunking.retriever import HybridRetriever, last_retrieval_timings, reciprocal_rank_fusion
+
+def docs(*texts):
+    return [Document(page_content=t) for t in texts]
+
+class FixedRetriever(BaseRetriever):
+    results: List[Document] = []
+
+    def _get_relevant_documents(self, query, *, run_manager):
+        return self.results
+
+def test_fusion_weighs_each_list():
+    sparse, dense = docs("a", "b", "c"), docs("c", "d")
+
+    def order(weights):
+        return [d.page_content for d in reciprocal_rank_fusion([sparse, dense], weights)]
+
+    # c is in both lists, so it outranks a despite a's better single rank;
+    # b and d tie and keep the order they were first seen in
+    assert order([0.5, 0.5]) == ["c", "a", "b", "d"]
+    # a heavier list wins the ties and, far enough, the rest
+    assert order([0.1, 1.0]) == ["c", "d", "a", "b"]
+    assert order([1.0, 0.01]) == ["a", "b", "c", "d"]
+
+def test_fusion_merges_duplicates_by_content():
+    first = Document(page_content="same", metadata={"leg": "sparse"})
+    second = Document(page_content="same", metadata={"leg": "dense"})
+    fused = reciprocal_rank_fusion([[first], [second, *docs("other")]], [0.5, 0.5])
+    assert [d.page_content for d in fused] == ["same", "other"]
+    # the first list's copy is kept
+    assert fused[0].metadata == {"leg": "sparse"}
+
+def _retriever(make_faiss_store, embeddings, **kwargs):
+    store = make_faiss_store()
+    store.add_texts([f"note {i}" for i in range(10)])
+    return HybridRetriever(
+        sparse_retriever=FixedRetriever(results=docs("note 3")), vectorstore=store, embeddings=embeddings, **kwargs
+    )
+
+def test_query_vectors_are_cached_in_lru_order(make_faiss_store, embeddings):
+    retriever = _retriever(make_faiss_store, embeddings, query_cache_size=2)
+    before = embeddings.embedded
+
+    retriever.invoke("first")
+    retriever.invoke("first")
+    asyncio.run(retriever.ainvoke("first"))
+    assert embeddings.embedded == before + 1
+
+    retriever.invoke("second")
+    retriever.invoke("first")  # now the most recent
+    retriever.invoke("third")  # evicts "second"
+    assert embeddings.embedded == before + 3
+    retriever.invoke("first")
+    assert embeddings.embedded == before + 3
+    retriever.invoke("second")
+    assert embeddings.embedded == before + 4
+    assert list(retriever._query_cache) == ["first", "second"]
+
+def test_retrieval_timings_stay_with_their_thread_and_task(make_faiss_store, embeddings):
+    retriever = _retriever(make_faiss_store, embeddings)
+    retriever.invoke("note 1")
+    mine = last_retrieval_timings()
+    assert set(mine) == {"sparse", "dense_embed", "dense_search", "dense_rerank", "dense", "total"}
+
+    # a thread that hasn't retrieved anything sees nothing, and its calls don't leak here
+    seen = []
+    thread = threading.Thread(target=lambda: (seen.append(last_retrieval_timings()), retriever.invoke("note 2")))
+    thread.start()
+    thread.join()
+    assert seen == [None]
+    assert last_retrieval_timings() is mine
+    assert retriever.last_timings is not mine
+
+    async def task():
+        await retriever.ainvoke("note 4")
+        return last_retrieval_timings()
+
+    assert asyncio.run(task()) is not mine
+    assert last_retrieval_timings() is mine
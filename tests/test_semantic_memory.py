@@ -0,0 +1,68 @@
+import asyncio
+
+import numpy as np
+import pytest
+from day_08_memory.fact_store import FactStore
+from day_08_memory.semantic import DEFAULT_MIN_SCORE, DEFAULT_TOKEN_BUDGET, SemanticMemory
+
+class WordEncoding:
+    """Stands in for tiktoken (which downloads its vocabulary): one token per word."""
+
+    def encode_ordinary_batch(self, texts):
+        return [text.split() for text in texts]
+
+FACTS = ["likes chess", "studies physics", "plays the piano", "lives in lisbon", "has a cat", "reads sci-fi"]
+
+@pytest.fixture
+def hash_embeddings(make_embeddings):
+    # wide vectors, so unrelated facts score close to 0
+    return make_embeddings(dim=512)
+
+@pytest.fixture
+def memory(tmp_path, hash_embeddings):
+    memory = SemanticMemory(FactStore(str(tmp_path / "facts.sqlite")), "alice", embeddings=hash_embeddings, legacy_json_path=None)
+    memory._encoding = WordEncoding()
+    return memory
+
+def _query(embeddings, weights):
+    """A query vector scoring each fact roughly in proportion to its weight."""
+    query = np.zeros(len(embeddings.embed_query("")))
+    for fact, weight in weights.items():
+        vector = np.asarray(embeddings.embed_query(fact))
+        query += weight * vector / np.linalg.norm(vector)
+    return query.tolist()
+
+def test_recall_returns_the_top_k_best_first(memory, hash_embeddings):
+    memory.save_facts(FACTS)
+    memory.top_k = 3
+    memory._ensure_index()
+
+    query = _query(hash_embeddings, {"has a cat": 1.0, "likes chess": 0.8, "reads sci-fi": 0.7, "lives in lisbon": 0.6})
+    assert memory._rank(query, None) == ["has a cat", "likes chess", "reads sci-fi"]
+    assert memory._rank(query, 2) == ["has a cat", "likes chess"]
+
+    # end to end, the fact asked about verbatim ranks first
+    assert memory.get_relevant_facts("plays the piano")[0] == "plays the piano"
+    assert asyncio.run(memory.aget_relevant_facts("plays the piano")) == memory.get_relevant_facts("plays the piano")
+
+def test_recall_drops_facts_below_min_score(memory, hash_embeddings):
+    assert memory.min_score == DEFAULT_MIN_SCORE == 0.25
+    memory.save_facts(FACTS)
+    memory._ensure_index()
+
+    # scores of about 0.95 and 0.19
+    query = _query(hash_embeddings, {"studies physics": 1.0, "likes chess": 0.2})
+    assert memory._rank(query, None) == ["studies physics"]
+    assert memory.get_relevant_facts("what is the capital of peru") == []
+
+def test_recall_fits_the_token_budget(memory, hash_embeddings):
+    assert memory.token_budget == DEFAULT_TOKEN_BUDGET == 256
+    long_facts = [f"long fact {n} " + " ".join(["word"] * 97) for n in range(3)]
+    memory.save_facts(long_facts + ["has a cat"])
+    memory._ensure_index()
+    # 100 words + 2 for the bullet each
+    assert memory._tokens == [102, 102, 102, 5]
+
+    query = _query(hash_embeddings, {long_facts[0]: 1.0, long_facts[1]: 0.9, long_facts[2]: 0.8, "has a cat": 0.7})
+    # the third long fact would overflow 256 tokens; the short one after it still fits
+    assert memory._rank(query, None) == [long_facts[0], long_facts[1], "has a cat"]
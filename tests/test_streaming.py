@@ -0,0 +1,62 @@
+import asyncio
+from typing import TypedDict
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.graph import END, START, StateGraph
+from day_08_memory.streaming import AnswerStream
+
+class State(TypedDict, total=False):
+    question: str
+    intent: str
+    answer: str
+
+def fake_model(*replies):
+    return GenericFakeChatModel(messages=iter([AIMessage(content=reply) for reply in replies]))
+
+def build_app(answer_from_llm=True):
+    # the planner's llm tokens aren't part of the answer; the chat node's are
+    planner_model = fake_model("intent chat")
+    chat_model = fake_model("Paris is the capital of France")
+
+    def planner(state):
+        return {"intent": planner_model.invoke(state["question"]).content}
+
+    def chat(state):
+        if not answer_from_llm:
+            return {"answer": "Saved to memory."}
+        return {"answer": chat_model.invoke(state["question"]).content}
+
+    graph = StateGraph(State)
+    graph.add_node("planner", planner)
+    graph.add_node("chat", chat)
+    graph.add_edge(START, "planner")
+    graph.add_edge("planner", "chat")
+    graph.add_edge("chat", END)
+    return graph.compile()
+
+def test_streams_answer_tokens_in_order():
+    stream = AnswerStream(build_app(), {"question": "capital of france?"}, {})
+    tokens = list(stream)
+
+    assert "".join(tokens) == "Paris is the capital of France"
+    assert tokens[0] == "Paris" and len(tokens) > 1
+    assert stream.answer == "Paris is the capital of France"
+    assert stream.final_state["intent"] == "intent chat"
+    assert 0 < stream.ttft <= stream.total
+
+def test_async_iteration_streams_the_same_tokens():
+    async def collect():
+        stream = AnswerStream(build_app(), {"question": "capital of france?"}, {})
+        return [token async for token in stream], stream
+
+    tokens, stream = asyncio.run(collect())
+    assert "".join(tokens) == "Paris is the capital of France"
+    assert stream.answer == "Paris is the capital of France"
+    assert 0 < stream.ttft <= stream.total
+
+def test_answer_without_llm_tokens_comes_from_the_final_state():
+    stream = AnswerStream(build_app(answer_from_llm=False), {"question": "remember I like chess"}, {})
+    assert list(stream) == []
+    assert stream.answer == "Saved to memory."
+    assert stream.ttft is None and stream.total is not None
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import time
+from typing import List
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.retrievers import BaseRetriever
+from langchain_core.runnables import RunnableLambda
+from day_04_explanation import llm
+from day_05_quizzes.generator import QUIZ_TEMPLATE
+from day_05_quizzes.models import Quiz
+from day_06_flashcards.generator import FLASHCARDS_TEMPLATE
+from day_06_flashcards.models import FlashcardSet
+from day_07_planning.models import StudyPlan
+from day_07_planning.planner import STUDY_PLAN_TEMPLATE
+from day_10_full_app.study_pack import agenerate_study_pack, generate_study_pack
+
+DELAY = 0.3
+
+class CountingRetriever(BaseRetriever):
+    calls: List[str] = []
+
+    def _get_relevant_documents(self, query, *, run_manager):
+        self.calls.append(query)
+        return [Document(page_content="Photosynthesis turns light into sugar.")]
+
+class FakeStructuredModel:
+    """Stands in for `llm.with_structured_output(schema)`: waits DELAY, then returns an empty `schema`."""
+
+    def __init__(self, schema, prompts, threads):
+        self.schema, self.prompts, self.threads = schema, prompts, threads
+
+    def invoke(self, prompt):
+        self.prompts.append(prompt.to_string())
+        self.threads.add(threading.current_thread().name)
+        time.sleep(DELAY)
+        return self.schema(topic="photosynthesis", **self._fields())
+
+    async def ainvoke(self, prompt):
+        self.prompts.append(prompt.to_string())
+        self.threads.add(threading.current_thread().name)
+        await asyncio.sleep(DELAY)
+        return self.schema(topic="photosynthesis", **self._fields())
+
+    def _fields(self):
+        if self.schema is Quiz:
+            return {"questions": []}
+        if self.schema is FlashcardSet:
+            return {"cards": []}
+        return {"goal": "understand it", "sessions": []}
+
+@pytest.fixture
+def fake_chains(monkeypatch):
+    """Seeds the shared chains with the real prompts in front of fake structured models."""
+    prompts, threads = [], set()
+    chains = {}
+    for name, template, schema in [
+        ("quiz", QUIZ_TEMPLATE, Quiz),
+        ("flashcards", FLASHCARDS_TEMPLATE, FlashcardSet),
+        ("study_plan", STUDY_PLAN_TEMPLATE, StudyPlan),
+    ]:
+        model = FakeStructuredModel(schema, prompts, threads)
+        chains[name] = ChatPromptTemplate.from_template(template) | RunnableLambda(model.invoke, afunc=model.ainvoke)
+    monkeypatch.setattr(llm, "_chains", chains)
+    return prompts, threads
+
+def _check_pack(pack, prompts, retriever):
+    assert isinstance(pack.quiz, Quiz) and isinstance(pack.flashcards, FlashcardSet) and isinstance(pack.plan, StudyPlan)
+    # retrieved once, and the context reaches all three prompts
+    assert retriever.calls == ["photosynthesis"]
+    assert len(prompts) == 3 and all("light into sugar" in p for p in prompts)
+    # the generations overlap: the pack takes about as long as one of them
+    assert all(pack.timings[stage] >= DELAY for stage in ("quiz", "flashcards", "plan"))
+    assert pack.timings["total"] < 2 * DELAY
+
+def test_study_pack_generates_concurrently(fake_chains):
+    prompts, threads = fake_chains
+    retriever = CountingRetriever(calls=[])
+    pack = generate_study_pack("photosynthesis", "1 week", retriever=retriever, use_cache=False)
+
+    _check_pack(pack, prompts, retriever)
+    assert len(threads) == 3
+
+def test_async_study_pack_generates_concurrently_on_one_loop(fake_chains):
+    prompts, threads = fake_chains
+    retriever = CountingRetriever(calls=[])
+    pack = asyncio.run(agenerate_study_pack("photosynthesis", "1 week", retriever=retriever, use_cache=False))
+
+    _check_pack(pack, prompts, retriever)
+    assert threads == {threading.current_thread().name}
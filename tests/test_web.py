@@ -0,0 +1,119 @@
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from day_02_reading.web import ResponseCache, WebFetcher
+
+LAST_MODIFIED = "Wed, 01 Jan 2025 00:00:00 GMT"
+
+class PageHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        stats = self.server.stats
+        with stats["lock"]:
+            stats["requests"] += 1
+            stats["connections"].add(self.client_address)
+            stats["active"] += 1
+            stats["max_active"] = max(stats["max_active"], stats["active"])
+        try:
+            time.sleep(0.02)
+            if self.path == "/missing":
+                self._send(404, b"", {})
+                return
+            page = self.server.pages[self.path]
+            etag = f'"{page["version"]}"'
+            if self.path.startswith("/etag"):
+                validators = {"ETag": etag}
+                fresh = self.headers.get("If-None-Match") == etag
+            else:
+                validators = {"Last-Modified": LAST_MODIFIED}
+                fresh = self.headers.get("If-Modified-Since") == LAST_MODIFIED and page["version"] == 1
+            if fresh:
+                self._send(304, b"", validators)
+                return
+            with stats["lock"]:
+                stats["downloads"] += 1
+            body = f"<html lang='en'><title>{self.path}</title><body>{page['text']}</body></html>".encode()
+            self._send(200, body, {"Content-Type": "text/html", **validators})
+        finally:
+            with stats["lock"]:
+                stats["active"] -= 1
+
+    def _send(self, status, body, headers):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), PageHandler)
+    httpd.daemon_threads = True
+    httpd.pages = {f"/etag/{i}": {"version": 1, "text": f"page {i}"} for i in range(6)}
+    httpd.pages["/dated"] = {"version": 1, "text": "dated page"}
+    httpd.stats = {
+        "lock": threading.Lock(), "requests": 0, "downloads": 0,
+        "connections": set(), "active": 0, "max_active": 0,
+    }
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+def _url(server, path):
+    return f"http://127.0.0.1:{server.server_port}{path}"
+
+@pytest.fixture
+def fetcher(tmp_path):
+    return WebFetcher(cache=ResponseCache(str(tmp_path / "web_cache.sqlite")), max_per_host=2)
+
+@pytest.mark.parametrize("path", ["/etag/0", "/dated"])
+def test_unchanged_page_is_revalidated_not_downloaded(server, fetcher, path):
+    body, changed = fetcher.fetch(_url(server, path))
+    assert changed and "page" in body
+
+    again, changed = fetcher.fetch(_url(server, path))
+    assert not changed
+    assert again == body
+    assert server.stats["requests"] == 2
+    assert server.stats["downloads"] == 1
+
+    server.pages[path] = {"version": 2, "text": "updated page"}
+    body, changed = fetcher.fetch(_url(server, path))
+    assert changed and "updated page" in body
+    assert server.stats["downloads"] == 2
+
+def test_sync_fetches_reuse_one_connection(server, fetcher):
+    for i in range(6):
+        fetcher.load(_url(server, f"/etag/{i}"))
+    assert len(server.stats["connections"]) == 1
+
+def test_aload_many_caps_per_host_and_pools(server, fetcher):
+    urls = [_url(server, f"/etag/{i}") for i in range(6)]
+    results = asyncio.run(fetcher.aload_many(urls))
+
+    assert [url for url, _, _ in results] == urls
+    assert [docs[0].metadata["title"] for _, docs, _ in results] == [f"/etag/{i}" for i in range(6)]
+    assert server.stats["max_active"] <= 2
+    assert len(server.stats["connections"]) <= 2
+
+    # a second event loop revalidates from the cache
+    asyncio.run(fetcher.aload_many(urls))
+    assert server.stats["downloads"] == 6
+
+def test_aload_many_reports_errors_per_url(server, fetcher):
+    urls = [_url(server, "/etag/0"), _url(server, "/missing"), _url(server, "/etag/1")]
+    results = asyncio.run(fetcher.aload_many(urls))
+
+    assert results[0][1] and results[0][2] is None
+    assert results[1][1] is None and results[1][2] is not None
+    assert results[2][1] and results[2][2] is None